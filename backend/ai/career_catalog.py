@@ -0,0 +1,511 @@
+"""
+Career Catalog
+Careers, their skill profiles, related-role edges and comparison data,
+loaded from the database into an immutable in-memory snapshot with
+precomputed indexes. Recommenders read the current snapshot; a refresh
+builds a new one and swaps it in when the catalog version is bumped.
+"""
+
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from sqlalchemy import inspect, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from config import SessionLocal, get_settings
+from models.database import Career, CareerRelation, CatalogVersion
+from ai.skill_ontology import skill_ontology, AhoCorasick
+
+settings = get_settings()
+
+CATALOG_NAME = "careers"
+NEUTRAL_INTEREST_SCORE = 50.0  # Interest match when the user gave no interests
+
+# Used until careers are seeded into the database (see seed_careers.py)
+BUILTIN_CAREERS = [
+    {
+        "title": "Data Scientist",
+        "description": "Analyze complex data to help companies make decisions",
+        "required_skills": ["Python", "Statistics", "Machine Learning", "SQL"],
+        "average_salary": 120000,
+        "growth_rate": 35.0,
+        "keywords": ["data", "analytics", "math", "statistics", "python"],
+        "skill_profile": ["Python", "Machine Learning", "Statistics", "SQL", "Data Visualization", "Deep Learning", "Pandas", "NumPy", "Scikit-learn", "TensorFlow"],
+        "related_roles": ["ML Engineer", "Data Engineering Lead", "AI Researcher"],
+        "comparison": {
+            "salary_range": "$85,000 - $170,000",
+            "growth_outlook": "Strong",
+            "skill_match": 72,
+            "work_life_balance": 8,
+            "entry_barrier": "High",
+            "pros": ["Top-paying tech role", "Impactful insights", "Growing AI/ML demand"],
+            "cons": ["Requires strong math background", "Data cleaning is tedious"],
+            "time_to_entry": "9-18 months",
+        },
+    },
+    {
+        "title": "Software Engineer",
+        "description": "Design, develop, and maintain software applications",
+        "required_skills": ["Programming", "Algorithms", "Data Structures", "Git"],
+        "average_salary": 110000,
+        "growth_rate": 22.0,
+        "keywords": ["coding", "programming", "software", "development", "tech"],
+        "skill_profile": ["JavaScript", "Python", "Git", "REST APIs", "Database Design", "React", "Node.js", "Docker", "Testing", "Agile"],
+        "related_roles": ["Senior Engineer", "Tech Lead", "Solutions Architect"],
+        "comparison": {
+            "salary_range": "$80,000 - $170,000",
+            "growth_outlook": "Strong",
+            "skill_match": 85,
+            "work_life_balance": 7,
+            "entry_barrier": "Medium",
+            "pros": ["Excellent pay progression", "Remote-friendly", "Diverse specializations"],
+            "cons": ["Continuous learning required", "Whiteboard interview culture"],
+            "time_to_entry": "6-12 months",
+        },
+    },
+    {
+        "title": "Product Manager",
+        "description": "Define product vision and strategy",
+        "required_skills": ["Communication", "Strategy", "Data Analysis", "Leadership"],
+        "average_salary": 130000,
+        "growth_rate": 18.0,
+        "keywords": ["product", "strategy", "management", "business", "leadership"],
+        "skill_profile": ["Product Strategy", "User Research", "Data Analysis", "Communication", "Roadmap Planning", "Stakeholder Management", "Agile", "SQL", "A/B Testing"],
+        "related_roles": ["Senior PM", "Director of Product", "VP Product"],
+        "comparison": {
+            "salary_range": "$80,000 - $160,000",
+            "growth_outlook": "Moderate",
+            "skill_match": 65,
+            "work_life_balance": 7,
+            "entry_barrier": "Medium",
+            "pros": ["Leadership opportunities", "Cross-functional impact", "No coding required"],
+            "cons": ["Ambiguous success metrics", "High-pressure decisions"],
+            "time_to_entry": "3-6 months",
+        },
+    },
+    {
+        "title": "UX Designer",
+        "description": "Create user-centered designs for digital products",
+        "required_skills": ["Figma", "User Research", "Prototyping", "Design Thinking"],
+        "average_salary": 95000,
+        "growth_rate": 24.0,
+        "keywords": ["design", "user experience", "creative", "visual", "interface"],
+        "skill_profile": ["Figma", "User Research", "Prototyping", "Wireframing", "Design Systems", "Usability Testing", "Adobe XD", "Sketch", "HTML/CSS", "Interaction Design"],
+        "related_roles": ["Senior UX", "Design Lead", "Head of Design"],
+        "compare_terms": ["ux"],
+        "comparison": {
+            "salary_range": "$60,000 - $135,000",
+            "growth_outlook": "Strong",
+            "skill_match": 70,
+            "work_life_balance": 8,
+            "entry_barrier": "Low",
+            "pros": ["Creative and empathetic work", "Growing demand", "User-centered impact"],
+            "cons": ["Subjective feedback", "Requires strong portfolio"],
+            "time_to_entry": "3-6 months",
+        },
+    },
+    {
+        "title": "DevOps Engineer",
+        "description": "Automate and optimize software deployment",
+        "required_skills": ["Docker", "Kubernetes", "CI/CD", "Linux", "Cloud"],
+        "average_salary": 115000,
+        "growth_rate": 28.0,
+        "keywords": ["automation", "infrastructure", "cloud", "deployment", "systems"],
+        "related_roles": ["SRE", "Platform Engineer", "Cloud Architect"],
+        "compare_terms": ["devops"],
+        "comparison": {
+            "salary_range": "$80,000 - $165,000",
+            "growth_outlook": "Strong",
+            "skill_match": 68,
+            "work_life_balance": 6,
+            "entry_barrier": "High",
+            "pros": ["Critical infrastructure role", "High demand", "Automation-focused"],
+            "cons": ["On-call responsibilities", "Steep learning curve"],
+            "time_to_entry": "6-12 months",
+        },
+    },
+    {
+        "title": "Full Stack Developer",
+        "recommendable": False,
+        "related_roles": ["Tech Lead", "Engineering Manager", "CTO"],
+        "compare_terms": ["full stack"],
+        "comparison": {
+            "salary_range": "$70,000 - $155,000",
+            "growth_outlook": "Strong",
+            "skill_match": 80,
+            "work_life_balance": 7,
+            "entry_barrier": "Medium",
+            "pros": ["Versatile skill set", "Can build complete products", "Highly employable"],
+            "cons": ["Jack of all trades concern", "Harder to master both ends"],
+            "time_to_entry": "6-12 months",
+        },
+    },
+    {
+        "title": "Frontend Developer",
+        "recommendable": False,
+        "related_roles": ["Senior Frontend", "UI Architect", "Design Engineer"],
+        "compare_terms": ["frontend"],
+        "comparison": {
+            "salary_range": "$65,000 - $140,000",
+            "growth_outlook": "Strong",
+            "skill_match": 78,
+            "work_life_balance": 8,
+            "entry_barrier": "Low",
+            "pros": ["High demand for web apps", "Creative and visual work", "Large open-source ecosystem"],
+            "cons": ["Rapidly changing frameworks", "Browser compatibility issues"],
+            "time_to_entry": "3-6 months",
+        },
+    },
+    {
+        "title": "Backend Developer",
+        "recommendable": False,
+        "related_roles": ["Senior Backend", "Systems Architect", "Principal Engineer"],
+        "compare_terms": ["backend"],
+        "comparison": {
+            "salary_range": "$75,000 - $160,000",
+            "growth_outlook": "Strong",
+            "skill_match": 82,
+            "work_life_balance": 7,
+            "entry_barrier": "Medium",
+            "pros": ["Higher average salary", "Scalable system design", "Strong job stability"],
+            "cons": ["Less visual feedback", "Complex debugging"],
+            "time_to_entry": "6-9 months",
+        },
+    },
+    {
+        "title": "Data Analyst",
+        "recommendable": False,
+        "comparison": {
+            "salary_range": "$55,000 - $110,000",
+            "growth_outlook": "Moderate",
+            "skill_match": 75,
+            "work_life_balance": 8,
+            "entry_barrier": "Low",
+            "pros": ["Great entry to data careers", "Business impact", "SQL-focused simplicity"],
+            "cons": ["Can be repetitive", "Lower ceiling than data science"],
+            "time_to_entry": "2-4 months",
+        },
+    },
+    {
+        "title": "Machine Learning Engineer",
+        "recommendable": False,
+        "compare_terms": ["machine learning"],
+        "comparison": {
+            "salary_range": "$95,000 - $190,000",
+            "growth_outlook": "Strong",
+            "skill_match": 66,
+            "work_life_balance": 7,
+            "entry_barrier": "High",
+            "pros": ["Cutting-edge technology", "Highest salary potential", "Research opportunities"],
+            "cons": ["Heavy math prerequisites", "GPU costs for experimentation"],
+            "time_to_entry": "12-24 months",
+        },
+    },
+]
+
+
+def _normalize_career(career: Dict) -> Dict:
+    """Fill optional fields so consumers can index without .get() chains"""
+    title = career["title"]
+    return {
+        "title": title,
+        "description": career.get("description") or "",
+        "required_skills": list(career.get("required_skills") or []),
+        "average_salary": career.get("average_salary") or 0,
+        "growth_rate": career.get("growth_rate") or 0.0,
+        "keywords": list(career.get("keywords") or []),
+        "recommendable": career.get("recommendable", True),
+        "skill_profile": list(career.get("skill_profile") or []),
+        "related_roles": list(career.get("related_roles") or []),
+        "compare_terms": [t.lower() for t in (career.get("compare_terms") or [title])],
+        "comparison": career.get("comparison"),
+    }
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, via argpartition.
+    Ties keep catalog order, same as a stable sort over the full list.
+    """
+    if len(scores) <= k:
+        return np.argsort(-scores, kind="stable")
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    threshold = scores[candidates].min()
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[: k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.argsort(-scores[chosen], kind="stable")]
+
+
+class CareerCatalogIndex:
+    """Compiled, read-only form of a career catalog"""
+
+    def __init__(self, careers: List[Dict]):
+        self.careers = careers
+        self.size = len(careers)
+
+        # Required skills as ontology keys, so aliases ("JS", "ReactJS") count
+        self.skill_vocab: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, career in enumerate(careers):
+            for key in map(skill_ontology.skill_key, career["required_skills"]):
+                rows.append(row)
+                cols.append(self.skill_vocab.setdefault(key, len(self.skill_vocab)))
+        self.skill_rows = np.asarray(rows, dtype=np.int64)
+        self.skill_cols = np.asarray(cols, dtype=np.int64)
+        self.skill_totals = np.asarray([len(c["required_skills"]) for c in careers], dtype=np.float64)
+
+        # One entry per keyword occurrence
+        self.keyword_vocab: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, career in enumerate(careers):
+            for keyword in career["keywords"]:
+                rows.append(row)
+                cols.append(self.keyword_vocab.setdefault(keyword.lower(), len(self.keyword_vocab)))
+        self.keyword_rows = np.asarray(rows, dtype=np.int64)
+        self.keyword_cols = np.asarray(cols, dtype=np.int64)
+        self.keyword_totals = np.asarray([len(c["keywords"]) for c in careers], dtype=np.float64)
+
+        # "keyword in interest": one automaton pass over each interest
+        self._keyword_automaton = AhoCorasick()
+        for keyword in self.keyword_vocab:
+            if keyword:
+                self._keyword_automaton.add(keyword, keyword)
+        self._keyword_automaton.build()
+
+        # "interest in keyword": str.find over every keyword joined, offsets map hits back
+        keywords = list(self.keyword_vocab)
+        self._joined_keywords = "\x00".join(keywords)
+        lengths = np.asarray([len(k) + 1 for k in keywords], dtype=np.int64)
+        self._keyword_offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _percent_matched(self, rows: np.ndarray, cols: np.ndarray, totals: np.ndarray, hits: np.ndarray) -> np.ndarray:
+        """Sparse matrix-vector product: % of each career's entries whose column is hit"""
+        matched = np.bincount(rows, weights=hits[cols], minlength=self.size)
+        return np.divide(matched * 100, totals, out=np.zeros(self.size), where=totals > 0)
+
+    def skill_scores(self, user_skills: Sequence[str]) -> np.ndarray:
+        hits = np.zeros(len(self.skill_vocab))
+        for key in skill_ontology.skill_keys(user_skills):
+            col = self.skill_vocab.get(key)
+            if col is not None:
+                hits[col] = 1.0
+        return self._percent_matched(self.skill_rows, self.skill_cols, self.skill_totals, hits)
+
+    def _keyword_hits(self, interests: List[str]) -> np.ndarray:
+        """1.0 for every keyword that contains, or is contained in, some interest"""
+        hits = np.zeros(len(self.keyword_vocab))
+        if "" in interests:
+            hits[:] = 1.0
+            return hits
+        if "" in self.keyword_vocab:
+            hits[self.keyword_vocab[""]] = 1.0
+        for interest in interests:
+            for _, _, keyword in self._keyword_automaton.iter(interest):
+                hits[self.keyword_vocab[keyword]] = 1.0
+            positions = []
+            start = self._joined_keywords.find(interest)
+            while start != -1:
+                positions.append(start)
+                start = self._joined_keywords.find(interest, start + 1)
+            if positions:
+                hits[np.searchsorted(self._keyword_offsets, positions, side="right") - 1] = 1.0
+        return hits
+
+    def interest_scores(self, interests: Sequence[str]) -> np.ndarray:
+        if not interests:
+            return np.full(self.size, NEUTRAL_INTEREST_SCORE)
+        hits = self._keyword_hits([i.lower() for i in interests])
+        return self._percent_matched(self.keyword_rows, self.keyword_cols, self.keyword_totals, hits)
+
+
+class CatalogSnapshot:
+    """One immutable catalog version plus everything precomputed from it"""
+
+    def __init__(self, careers: List[Dict], version: int = 0, source: str = "builtin"):
+        self.version = version
+        self.source = source
+        self.careers = tuple(_normalize_career(c) for c in careers)
+        self.by_title = {c["title"]: c for c in self.careers}
+
+        self.recommender_index = CareerCatalogIndex([c for c in self.careers if c["recommendable"]])
+
+        # Gap analysis uses the detailed profile, else the core requirements
+        self.role_skills: Dict[str, List[str]] = {
+            c["title"]: c["skill_profile"] or c["required_skills"]
+            for c in self.careers
+            if c["skill_profile"] or c["required_skills"]
+        }
+        self.skill_vocabulary: List[str] = sorted({s for skills in self.role_skills.values() for s in skills})
+
+        # Fuzzy lookups scan in catalog order, first match wins
+        self._comparison_terms = [
+            (term, c["comparison"]) for c in self.careers if c["comparison"] for term in c["compare_terms"]
+        ]
+        self._related_titles = [(c["title"].lower(), c["related_roles"]) for c in self.careers if c["related_roles"]]
+
+    def __len__(self) -> int:
+        return len(self.careers)
+
+    def comparison_for(self, career: str) -> Optional[Dict]:
+        """Comparison data for a free-text career name"""
+        name = career.lower()
+        for term, data in self._comparison_terms:
+            if term in name or name in term:
+                return data
+        return None
+
+    def related_roles(self, role: str) -> List[str]:
+        """Growth-path titles for a free-text role name"""
+        name = role.lower()
+        for title, related in self._related_titles:
+            if title in name or name in title:
+                return related
+        return []
+
+
+# Columns added to careers after its first release; (column, value for existing rows)
+CATALOG_COLUMNS = [
+    ("keywords", None),
+    ("skill_profile", None),
+    ("compare_terms", None),
+    ("comparison", None),
+    ("recommendable", True),
+    ("position", 0),
+]
+
+
+def ensure_career_columns(engine: Engine):
+    """
+    Add catalog columns missing from careers tables created by the old
+    schema; create_all skips existing tables. Idempotent.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table(Career.__tablename__):
+        return
+    present = {column["name"] for column in inspector.get_columns(Career.__tablename__)}
+    missing = [(name, value) for name, value in CATALOG_COLUMNS if name not in present]
+    if not missing:
+        return
+    table = Career.__table__
+    with engine.begin() as conn:
+        for name, _ in missing:
+            column_type = table.c[name].type.compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+        backfill = {name: value for name, value in missing if value is not None}
+        if backfill:
+            conn.execute(update(table).values(**backfill))
+    print(f"✅ Added careers columns: {', '.join(name for name, _ in missing)}")
+
+
+def load_snapshot(db: Session) -> CatalogSnapshot:
+    """Build a snapshot from the careers tables, or the built-in catalog if they are empty"""
+    version = catalog_version(db)
+    rows = db.query(Career).order_by(Career.position, Career.id).all()
+    if not rows:
+        return CatalogSnapshot(BUILTIN_CAREERS, version=version, source="builtin")
+
+    related: Dict[int, List[str]] = {}
+    for relation in db.query(CareerRelation).order_by(CareerRelation.career_id, CareerRelation.position):
+        related.setdefault(relation.career_id, []).append(relation.related_title)
+
+    careers = [
+        {
+            "title": row.title,
+            "description": row.description,
+            "required_skills": row.required_skills,
+            "average_salary": row.average_salary,
+            "growth_rate": row.growth_rate,
+            "keywords": row.keywords,
+            "recommendable": row.recommendable if row.recommendable is not None else True,
+            "skill_profile": row.skill_profile,
+            "related_roles": related.get(row.id, []),
+            "compare_terms": row.compare_terms,
+            "comparison": row.comparison,
+        }
+        for row in rows
+    ]
+    return CatalogSnapshot(careers, version=version, source="database")
+
+
+def catalog_version(db: Session) -> int:
+    row = db.query(CatalogVersion).filter(CatalogVersion.name == CATALOG_NAME).first()
+    return row.version if row else 0
+
+
+def bump_catalog_version(db: Session) -> int:
+    """Mark the catalog changed; every process reloads on its next refresh check. Does not commit."""
+    row = db.query(CatalogVersion).filter(CatalogVersion.name == CATALOG_NAME).first()
+    if row is None:
+        row = CatalogVersion(name=CATALOG_NAME, version=0)
+        db.add(row)
+    row.version = (row.version or 0) + 1
+    row.updated_at = datetime.utcnow()
+    return row.version
+
+
+class CareerCatalog:
+    """Holds the current snapshot and swaps in a new one when the version changes"""
+
+    def __init__(self, session_factory=SessionLocal, refresh_interval: float = 60.0):
+        self.session_factory = session_factory
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot; read it once per request for a consistent view"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh(force=True)
+        return snapshot
+
+    def refresh(self, force: bool = False) -> CatalogSnapshot:
+        """Reload if the stored version moved (or force); the old snapshot stays valid for readers"""
+        with self._lock:
+            current = self._snapshot
+            try:
+                db = self.session_factory()
+                try:
+                    if current is not None and not force and catalog_version(db) == current.version:
+                        return current
+                    snapshot = load_snapshot(db)
+                finally:
+                    db.close()
+            except Exception as e:
+                if current is not None:
+                    print(f"⚠️  Career catalog refresh failed, keeping v{current.version}: {e}")
+                    return current
+                print(f"⚠️  Career catalog unavailable ({type(e).__name__}), using built-in careers")
+                snapshot = CatalogSnapshot(BUILTIN_CAREERS)
+            self._snapshot = snapshot
+            if current is None or current.version != snapshot.version:
+                print(f"✅ Career catalog v{snapshot.version} loaded from {snapshot.source} ({len(snapshot)} careers)")
+            return snapshot
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await asyncio.to_thread(self.refresh)
+
+    def start(self):
+        """Load now and poll the version in the background (call from the app's event loop)"""
+        self.snapshot
+        if self._task is None and self.refresh_interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+# Global singleton
+career_catalog = CareerCatalog(refresh_interval=settings.career_catalog_refresh_seconds)
@@ -0,0 +1,69 @@
+"""
+Embedding Index
+Dense, L2-normalized NumPy matrix index for cosine-similarity retrieval.
+A query is one matrix-vector product plus argpartition top-k selection.
+"""
+
+from typing import List, Sequence, Tuple
+import numpy as np
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Row-normalize a 1-D or 2-D array, leaving zero rows untouched"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class EmbeddingIndex:
+    """Matrix of normalized embeddings with a parallel id array"""
+
+    def __init__(self, ids: Sequence[str], vectors: np.ndarray):
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        self.ids = np.asarray(list(ids), dtype=object)
+        self.matrix = l2_normalize(np.atleast_2d(vectors))
+
+    @classmethod
+    def from_normalized(cls, ids: Sequence[str], matrix: np.ndarray) -> "EmbeddingIndex":
+        """Wrap an already-normalized matrix (e.g. a memory-mapped artifact) without copying it"""
+        if len(ids) != len(matrix):
+            raise ValueError(f"Got {len(ids)} ids for {len(matrix)} vectors")
+        index = cls.__new__(cls)
+        index.ids = np.asarray(list(ids), dtype=object)
+        index.matrix = matrix
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def row_positions(self, ids: Sequence[str]) -> np.ndarray:
+        """Row numbers for the given ids, in order; unknown ids raise KeyError"""
+        positions = getattr(self, "_positions", None)
+        if positions is None:
+            positions = self._positions = {item_id: i for i, item_id in enumerate(self.ids)}
+        return np.fromiter((positions[item_id] for item_id in ids), dtype=np.intp, count=len(ids))
+
+    def _top_k(self, scores: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        # argpartition is O(n); only the k winners get fully sorted
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        ordered = candidates[np.argsort(-scores[candidates])]
+        return [(self.ids[i], float(scores[i])) for i in ordered]
+
+    def search(self, query: np.ndarray, top_k: int = 3) -> List[Tuple[str, float]]:
+        """Return the top_k (id, cosine similarity) pairs for one query vector"""
+        scores = self.matrix @ l2_normalize(query)
+        return self._top_k(scores, top_k)
+
+    def search_batch(self, queries: np.ndarray, top_k: int = 3) -> List[List[Tuple[str, float]]]:
+        """Score many queries at once with a single matrix-matrix product"""
+        scores = l2_normalize(np.atleast_2d(queries)) @ self.matrix.T
+        return [self._top_k(row, top_k) for row in scores]
@@ -0,0 +1,166 @@
+"""
+Embedding Store
+Versioned, precomputed embedding artifacts on disk. Each artifact is a
+normalized float32 .npy matrix keyed by a hash of (model, source texts),
+memory-mapped at startup so workers share pages and skip re-encoding.
+The sentence transformer itself is only loaded to encode queries.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import List, Optional, Sequence
+
+import numpy as np
+from config import get_settings
+from ai.embedding_index import EmbeddingIndex, l2_normalize
+
+settings = get_settings()
+
+# Bump when the on-disk layout changes so old artifacts are ignored
+ARTIFACT_VERSION = 1
+
+ARTIFACT_DIR = settings.embedding_artifact_dir or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts", "embeddings"
+)
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder():
+    """Lazy, process-wide SentenceTransformer; None if it cannot be loaded"""
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _encoder = SentenceTransformer(settings.embedding_model)
+                except Exception as e:
+                    print(f"⚠️  Embedding store: could not load {settings.embedding_model}: {e}")
+                    _encoder = False  # Mark as failed to avoid retrying
+    return _encoder if _encoder is not False else None
+
+
+def encoder_status() -> str:
+    """Report the encoder state without triggering a model load"""
+    if _encoder is None:
+        return "not_loaded"
+    return "failed" if _encoder is False else "loaded"
+
+
+def source_hash(ids: Sequence[str], texts: Sequence[str]) -> str:
+    """Stable hash of everything that determines the artifact's contents"""
+    payload = json.dumps(
+        {
+            "version": ARTIFACT_VERSION,
+            "model": settings.embedding_model,
+            "items": [[str(i), t] for i, t in zip(ids, texts)],
+        },
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _artifact_paths(name: str, digest: str):
+    base = os.path.join(ARTIFACT_DIR, f"{name}.{digest}")
+    return f"{base}.npy", f"{base}.json"
+
+
+def _atomic_write(path: str, write):
+    """Write via a temp file + rename so concurrent workers never see partial files"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_artifact(name: str, ids: Sequence[str], texts: Sequence[str], vectors: np.ndarray) -> str:
+    """Persist normalized vectors plus an id sidecar; returns the .npy path"""
+    digest = source_hash(ids, texts)
+    npy_path, meta_path = _artifact_paths(name, digest)
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+
+    matrix = np.ascontiguousarray(l2_normalize(vectors), dtype=np.float32)
+    meta = {
+        "name": name,
+        "version": ARTIFACT_VERSION,
+        "model": settings.embedding_model,
+        "source_hash": digest,
+        "dim": int(matrix.shape[1]),
+        "ids": [str(i) for i in ids],
+    }
+    _atomic_write(npy_path, lambda f: np.save(f, matrix))
+    _atomic_write(meta_path, lambda f: f.write(json.dumps(meta).encode("utf-8")))
+    return npy_path
+
+
+def load_artifact(name: str, ids: Sequence[str], texts: Sequence[str]) -> Optional[EmbeddingIndex]:
+    """Memory-map the artifact matching the current source texts, if one exists"""
+    npy_path, meta_path = _artifact_paths(name, source_hash(ids, texts))
+    if not (os.path.exists(npy_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(npy_path, mmap_mode="r")
+        return EmbeddingIndex.from_normalized(meta["ids"], matrix)
+    except Exception as e:
+        print(f"⚠️  Embedding store: ignoring unreadable artifact {npy_path}: {e}")
+        return None
+
+
+def build_artifact(name: str, ids: Sequence[str], texts: Sequence[str]) -> Optional[str]:
+    """Encode texts with the model and write the artifact; returns its path"""
+    encoder = get_encoder()
+    if encoder is None:
+        return None
+    vectors = encoder.encode(list(texts), batch_size=64, convert_to_numpy=True)
+    return save_artifact(name, ids, texts, vectors)
+
+
+def prune_artifacts(name: str, keep: Sequence[str] = ()) -> List[str]:
+    """Delete stale versions of an artifact, keeping the given .npy paths"""
+    removed = []
+    if not os.path.isdir(ARTIFACT_DIR):
+        return removed
+    keep_bases = {os.path.splitext(os.path.abspath(p))[0] for p in keep}
+    for filename in os.listdir(ARTIFACT_DIR):
+        if not filename.startswith(f"{name}.") or not filename.endswith((".npy", ".json")):
+            continue
+        path = os.path.abspath(os.path.join(ARTIFACT_DIR, filename))
+        if os.path.splitext(path)[0] not in keep_bases:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+
+def get_or_build_index(name: str, ids: Sequence[str], texts: Sequence[str]) -> Optional[EmbeddingIndex]:
+    """
+    Load the precomputed artifact for these texts; if it is missing or stale,
+    encode once and write it so later workers and restarts can mmap it.
+    """
+    index = load_artifact(name, ids, texts)
+    if index is not None:
+        return index
+
+    print(f"⚠️  Embedding store: no artifact for '{name}', encoding {len(texts)} texts")
+    encoder = get_encoder()
+    if encoder is None:
+        return None
+    vectors = encoder.encode(list(texts), batch_size=64, convert_to_numpy=True)
+    try:
+        save_artifact(name, ids, texts, vectors)
+    except OSError as e:
+        # Read-only deploys still work, they just re-encode on every start
+        print(f"⚠️  Embedding store: could not write artifact for '{name}': {e}")
+        return EmbeddingIndex(ids, vectors)
+    return load_artifact(name, ids, texts) or EmbeddingIndex(ids, vectors)
@@ -1,46 +1,129 @@
 """
 ESCO API Client
-Fetches occupation and skill data from the European Skills/Competences, 
-Qualifications and Occupations (ESCO) classification API.
+Fetches occupation and skill data from the European Skills/Competences,
+Qualifications and Occupations (ESCO) classification API, or from a local
+snapshot built by import_esco.py when one is configured.
 """
 
-import requests
-from typing import List, Dict, Optional
-from functools import lru_cache
+import asyncio
+import copy
+import os
+import httpx
+from typing import Awaitable, Callable, List, Dict, Optional
 from config import get_settings
+from ai.esco_store import ESCOSnapshotStore
+from ai.skill_ontology import skill_ontology
+from ai.llm_cache import MemoryLRUCache
+from utils.single_flight import SingleFlight
 
 settings = get_settings()
 
 ESCO_BASE_URL = settings.esco_api_url or "https://ec.europa.eu/esco/api"
+ESCO_SNAPSHOT_PATH = settings.esco_snapshot_path or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "esco_snapshot.db"
+)
+
+EMPTY_OCCUPATION = {"title": "", "essential_skills": [], "optional_skills": [], "description": ""}
+
+
+def _open_snapshot(mode: str, path: str) -> Optional[ESCOSnapshotStore]:
+    """Open the local snapshot for "offline"/"auto" modes, if it exists"""
+    if mode == "api":
+        return None
+    if not os.path.exists(path):
+        if mode == "offline":
+            print(f"⚠️  ESCO: offline mode but no snapshot at {path} (run import_esco.py)")
+        return None
+    try:
+        store = ESCOSnapshotStore(path)
+        print(f"✅ ESCO: serving lookups from snapshot {path}")
+        return store
+    except Exception as e:
+        print(f"⚠️  ESCO: could not open snapshot {path}: {e}")
+        return None
 
 
 class ESCOClient:
-    """Client for the ESCO API v1"""
-
-    def __init__(self):
+    """
+    Async client for the ESCO API v1, answering from a local snapshot when available.
+    Live lookups share one pooled HTTP client, a TTL cache, and single-flight
+    coalescing so concurrent identical requests make one upstream call.
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        snapshot_path: str = ESCO_SNAPSHOT_PATH,
+        cache_ttl: float = 86400,
+        cache_max_entries: int = 2048,
+        max_connections: int = 20,
+        timeout: float = 10.0,
+    ):
         self.base_url = ESCO_BASE_URL
-        self.session = requests.Session()
-        self.session.headers.update({
-            "Accept": "application/json",
-            "Accept-Language": "en"
-        })
-
-    def search_occupations(self, query: str, limit: int = 5) -> List[Dict]:
-        """Search for occupations matching a query string"""
-        try:
-            resp = self.session.get(
-                f"{self.base_url}/search",
-                params={
-                    "text": query,
-                    "type": "occupation",
-                    "language": "en",
-                    "limit": limit,
-                    "full": "false"
-                },
-                timeout=10
+        self.mode = mode
+        self.cache_ttl = cache_ttl
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache = MemoryLRUCache(cache_max_entries)
+        self._flights = SingleFlight()
+        self.store = _open_snapshot(mode, snapshot_path)
+        if self.store is not None:
+            skill_ontology.attach_esco_uris(self.store.find_skill_uri)
+
+    @property
+    def offline(self) -> bool:
+        """True when no request should go to the network"""
+        return self.store is not None or self.mode == "offline"
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Accept": "application/json", "Accept-Language": "en"},
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(self.timeout),
             )
-            resp.raise_for_status()
-            data = resp.json()
+        return self._client
+
+    async def _get_json(self, path: str, params: Dict) -> Dict:
+        resp = await self._get_client().get(path, params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _cached(self, key: str, fetch: Callable[[], Awaitable]):
+        """
+        Serve from the TTL cache, else coalesce concurrent fetches of the same key.
+        Callers get their own copy, so mutating a result can't corrupt the cache.
+        """
+        value = self._cache.get(key)
+        if value is not None:
+            return copy.deepcopy(value)
+
+        async def load():
+            result = await fetch()
+            self._cache.set(key, result, self.cache_ttl)
+            return result
+
+        return copy.deepcopy(await self._flights.do(key, load))
+
+    async def search_occupations(self, query: str, limit: int = 5) -> List[Dict]:
+        """Search for occupations matching a query string"""
+        if self.offline:
+            # SQLite lookups (a LIKE scan on misses) run on a worker thread, off the event loop
+            return await asyncio.to_thread(self.store.search_occupations, query, limit) if self.store else []
+
+        async def fetch():
+            data = await self._get_json("/search", {
+                "text": query,
+                "type": "occupation",
+                "language": "en",
+                "limit": limit,
+                "full": "false"
+            })
             results = []
             for item in data.get("_embedded", {}).get("results", []):
                 results.append({
@@ -49,20 +132,46 @@ class ESCOClient:
                     "description": item.get("description", "")[:200] if item.get("description") else "",
                 })
             return results
+
+        try:
+            return await self._cached(f"occupations:{query.strip().lower()}:{limit}", fetch)
         except Exception as e:
             print(f"ESCO search error: {e}")
             return []
 
-    def get_occupation_skills(self, occupation_uri: str) -> Dict[str, List[str]]:
-        """Get essential and optional skills for an occupation URI"""
+    async def search_skills(self, query: str, limit: int = 10) -> List[Dict]:
+        """Search for skills matching a query string"""
+        if self.offline:
+            return await asyncio.to_thread(self.store.search_skills, query, limit) if self.store else []
+
+        async def fetch():
+            data = await self._get_json("/search", {
+                "text": query,
+                "type": "skill",
+                "language": "en",
+                "limit": limit,
+                "full": "false"
+            })
+            return [
+                {"name": item.get("title", ""), "uri": item.get("uri", ""), "category": "skill"}
+                for item in data.get("_embedded", {}).get("results", [])
+            ]
+
         try:
-            resp = self.session.get(
-                f"{self.base_url}/resource/occupation",
-                params={"uri": occupation_uri, "language": "en"},
-                timeout=10
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            return await self._cached(f"skills:{query.strip().lower()}:{limit}", fetch)
+        except Exception as e:
+            print(f"ESCO skill search error: {e}")
+            return []
+
+    async def get_occupation_skills(self, occupation_uri: str) -> Dict[str, List[str]]:
+        """Get essential and optional skills for an occupation URI"""
+        if self.offline:
+            if self.store:
+                return await asyncio.to_thread(self.store.get_occupation_skills, occupation_uri)
+            return dict(EMPTY_OCCUPATION)
+
+        async def fetch():
+            data = await self._get_json("/resource/occupation", {"uri": occupation_uri, "language": "en"})
 
             essential = []
             optional = []
@@ -87,26 +196,59 @@ class ESCOClient:
                 "optional_skills": optional[:10],
                 "description": (data.get("description", {}).get("en", {}).get("literal", "") or "")[:300]
             }
+
+        try:
+            return await self._cached(f"occupation:{occupation_uri}", fetch)
         except Exception as e:
             print(f"ESCO occupation detail error: {e}")
-            return {"title": "", "essential_skills": [], "optional_skills": [], "description": ""}
+            return dict(EMPTY_OCCUPATION)
 
-    def get_skills_for_role(self, role_name: str) -> Dict[str, List[str]]:
+    async def get_skills_for_role(self, role_name: str) -> Dict[str, List[str]]:
         """Convenience: search for a role and get its skills"""
-        occupations = self.search_occupations(role_name, limit=1)
+        occupations = await self.search_occupations(role_name, limit=1)
         if not occupations:
-            return {"title": role_name, "essential_skills": [], "optional_skills": [], "description": ""}
+            return {**EMPTY_OCCUPATION, "title": role_name}
 
         uri = occupations[0]["uri"]
-        return self.get_occupation_skills(uri)
+        return await self.get_occupation_skills(uri)
+
+    async def get_skills_for_roles(self, role_names: List[str]) -> Dict[str, Dict[str, List[str]]]:
+        """Bulk lookup: every role's search + detail chain runs concurrently"""
+        unique_roles = list(dict.fromkeys(role_names))
+        results = await asyncio.gather(*(self.get_skills_for_role(role) for role in unique_roles))
+        return dict(zip(unique_roles, results))
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 
 # Global singleton
-esco_client = ESCOClient()
+esco_client = ESCOClient(
+    mode=settings.esco_mode,
+    snapshot_path=ESCO_SNAPSHOT_PATH,
+    cache_ttl=settings.esco_cache_ttl_seconds,
+    max_connections=settings.esco_max_connections,
+)
+
+
+async def search_skills(query: str, limit: int = 10) -> List[Dict]:
+    """Search ESCO skills"""
+    return await esco_client.search_skills(query, limit)
+
+
+async def get_skills_for_role(role_name: str) -> Dict[str, List[str]]:
+    """Look up essential/optional skills for a role"""
+    return await esco_client.get_skills_for_role(role_name)
+
+
+async def get_skills_for_roles(role_names: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Look up essential/optional skills for many roles concurrently"""
+    return await esco_client.get_skills_for_roles(role_names)
 
 
-@lru_cache(maxsize=50)
-def get_role_skills_cached(role_name: str) -> tuple:
+async def get_role_skills_cached(role_name: str) -> tuple:
     """Cached wrapper for role skill lookups. Returns (essential, optional) tuples."""
-    data = esco_client.get_skills_for_role(role_name)
+    data = await esco_client.get_skills_for_role(role_name)
     return tuple(data.get("essential_skills", [])), tuple(data.get("optional_skills", []))
@@ -0,0 +1,310 @@
+"""
+ESCO Snapshot Store
+Local, indexed copy of ESCO occupations, skills and their relations in a
+single SQLite file. Built once by import_esco.py and opened read-only by
+every worker, so lookups need no network and all workers give the same answers.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ai.skill_ontology import normalize_skill
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE occupations (uri TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT);
+CREATE TABLE skills (uri TEXT PRIMARY KEY, title TEXT NOT NULL, description TEXT, skill_type TEXT);
+CREATE TABLE occupation_labels (label TEXT NOT NULL, uri TEXT NOT NULL, preferred INTEGER NOT NULL);
+CREATE TABLE skill_labels (label TEXT NOT NULL, uri TEXT NOT NULL, preferred INTEGER NOT NULL);
+CREATE TABLE occupation_skills (occupation_uri TEXT NOT NULL, skill_uri TEXT NOT NULL, relation TEXT NOT NULL);
+"""
+
+INDEXES = """
+CREATE INDEX ix_occupation_labels_label ON occupation_labels (label);
+CREATE INDEX ix_skill_labels_label ON skill_labels (label);
+CREATE UNIQUE INDEX ix_occupation_skills ON occupation_skills (occupation_uri, relation, skill_uri);
+"""
+
+# Same caps the live API client applies
+MAX_ESSENTIAL_SKILLS = 15
+MAX_OPTIONAL_SKILLS = 10
+
+
+def _split_labels(value) -> List[str]:
+    """ESCO CSVs pack alternative labels into one newline-separated cell"""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [v for v in value if v]
+    return [label.strip() for label in str(value).split("\n") if label.strip()]
+
+
+def _label_rows(uri: str, title: str, alt_labels: Iterable[str]) -> Iterator[Tuple[str, str, int]]:
+    seen = set()
+    for label, preferred in [(title, 1)] + [(alt, 0) for alt in alt_labels]:
+        key = normalize_skill(label)
+        if key and key not in seen:
+            seen.add(key)
+            yield key, uri, preferred
+
+
+class ESCOSnapshotStore:
+    """Read-only query layer over an imported ESCO snapshot"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    @property
+    def info(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+
+    def _search_labels(self, table: str, entity_table: str, columns: str, query: str, limit: int) -> List[tuple]:
+        """Exact and prefix hits via the label index, then substring hits if still short"""
+        key = normalize_skill(query)
+        if not key:
+            return []
+        sql = (
+            f"SELECT {columns} FROM {table} l "
+            f"JOIN {entity_table} e ON e.uri = l.uri WHERE {{where}} "
+            f"GROUP BY e.uri ORDER BY MAX(l.preferred) DESC, length(e.title) LIMIT ?"
+        )
+        rows: List[tuple] = []
+        seen = set()
+        with self._lock:
+            for where, params in [
+                ("l.label = ?", (key,)),
+                ("l.label >= ? AND l.label < ?", (key, key + "\uffff")),
+                ("l.label LIKE ? ESCAPE '\\'", ("%" + key.replace("%", "\\%").replace("_", "\\_") + "%",)),
+            ]:
+                for row in self._conn.execute(sql.format(where=where), (*params, limit)):
+                    if row[0] not in seen:
+                        seen.add(row[0])
+                        rows.append(row)
+                if len(rows) >= limit:
+                    break
+        return rows[:limit]
+
+    def search_occupations(self, query: str, limit: int = 5) -> List[Dict]:
+        rows = self._search_labels(
+            "occupation_labels", "occupations", "e.uri, e.title, e.description", query, limit
+        )
+        return [
+            {"uri": uri, "title": title, "description": (description or "")[:200]}
+            for uri, title, description in rows
+        ]
+
+    def search_skills(self, query: str, limit: int = 10) -> List[Dict]:
+        rows = self._search_labels(
+            "skill_labels", "skills", "e.uri, e.title, e.skill_type", query, limit
+        )
+        return [
+            {"name": title, "uri": uri, "category": skill_type or "skill"}
+            for uri, title, skill_type in rows
+        ]
+
+    def find_skill_uri(self, name: str) -> Optional[str]:
+        """URI of the skill whose preferred or alternative label matches exactly"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uri FROM skill_labels WHERE label = ? ORDER BY preferred DESC LIMIT 1",
+                (normalize_skill(name),),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_occupation_skills(self, occupation_uri: str) -> Dict[str, List[str]]:
+        with self._lock:
+            occupation = self._conn.execute(
+                "SELECT title, description FROM occupations WHERE uri = ?", (occupation_uri,)
+            ).fetchone()
+            if occupation is None:
+                return {"title": "", "essential_skills": [], "optional_skills": [], "description": ""}
+            rows = self._conn.execute(
+                "SELECT r.relation, s.title FROM occupation_skills r "
+                "JOIN skills s ON s.uri = r.skill_uri WHERE r.occupation_uri = ? ORDER BY s.title",
+                (occupation_uri,),
+            ).fetchall()
+
+        essential = [title for relation, title in rows if relation == "essential"]
+        optional = [title for relation, title in rows if relation == "optional"]
+        return {
+            "title": occupation[0],
+            "essential_skills": essential[:MAX_ESSENTIAL_SKILLS],
+            "optional_skills": optional[:MAX_OPTIONAL_SKILLS],
+            "description": (occupation[1] or "")[:300],
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ═══════════════════════════════════════════════════════════
+# IMPORT
+# ═══════════════════════════════════════════════════════════
+
+class ESCOSnapshotWriter:
+    """Builds a snapshot into a temp file and swaps it into place on commit"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        os.close(fd)
+        self.conn = sqlite3.connect(self.tmp_path)
+        self.conn.executescript(SCHEMA)
+        self.counts = {"occupations": 0, "skills": 0, "relations": 0}
+
+    def add_occupation(self, uri: str, title: str, description: str = "", alt_labels: Iterable[str] = ()):
+        if not uri or not title:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO occupations (uri, title, description) VALUES (?, ?, ?)",
+            (uri, title, description or ""),
+        )
+        self.conn.executemany(
+            "INSERT INTO occupation_labels (label, uri, preferred) VALUES (?, ?, ?)",
+            _label_rows(uri, title, alt_labels),
+        )
+        self.counts["occupations"] += 1
+
+    def add_skill(self, uri: str, title: str, description: str = "", skill_type: str = "", alt_labels: Iterable[str] = ()):
+        if not uri or not title:
+            return
+        self.conn.execute(
+            "INSERT OR REPLACE INTO skills (uri, title, description, skill_type) VALUES (?, ?, ?, ?)",
+            (uri, title, description or "", skill_type or ""),
+        )
+        self.conn.executemany(
+            "INSERT INTO skill_labels (label, uri, preferred) VALUES (?, ?, ?)",
+            _label_rows(uri, title, alt_labels),
+        )
+        self.counts["skills"] += 1
+
+    def ensure_skill(self, uri: str, title: str):
+        """Add a skill known only by reference unless it was already imported"""
+        if uri and not self.conn.execute("SELECT 1 FROM skills WHERE uri = ?", (uri,)).fetchone():
+            self.add_skill(uri, title)
+
+    def add_relation(self, occupation_uri: str, skill_uri: str, relation: str):
+        relation = (relation or "").lower()
+        if not occupation_uri or not skill_uri or relation not in ("essential", "optional"):
+            return
+        self.conn.execute(
+            "INSERT OR IGNORE INTO occupation_skills (occupation_uri, skill_uri, relation) VALUES (?, ?, ?)",
+            (occupation_uri, skill_uri, relation),
+        )
+        self.counts["relations"] += 1
+
+    def commit(self, source: str) -> Dict[str, int]:
+        self.conn.executescript(INDEXES)
+        self.conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [
+                ("source", source),
+                ("imported_at", datetime.utcnow().isoformat()),
+                *[(name, str(count)) for name, count in self.counts.items()],
+            ],
+        )
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        self.conn.close()
+        os.replace(self.tmp_path, self.path)
+        return dict(self.counts)
+
+    def abort(self):
+        self.conn.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def _find_csv(directory: str, prefix: str) -> Optional[str]:
+    for filename in sorted(os.listdir(directory)):
+        if filename.lower().startswith(prefix.lower()) and filename.lower().endswith(".csv"):
+            return os.path.join(directory, filename)
+    return None
+
+
+def import_csv_dump(directory: str, path: str) -> Dict[str, int]:
+    """
+    Import the official ESCO CSV download (occupations_en.csv, skills_en.csv,
+    occupationSkillRelations_en.csv) from a directory.
+    """
+    files = {
+        "occupations": _find_csv(directory, "occupations_"),
+        "skills": _find_csv(directory, "skills_"),
+        "relations": _find_csv(directory, "occupationSkillRelations"),
+    }
+    missing = [name for name, file in files.items() if file is None]
+    if missing:
+        raise FileNotFoundError(f"ESCO dump in {directory} is missing: {', '.join(missing)}")
+
+    writer = ESCOSnapshotWriter(path)
+    try:
+        for row in _read_csv(files["occupations"]):
+            writer.add_occupation(
+                row.get("conceptUri"), row.get("preferredLabel"),
+                row.get("description") or row.get("definition"), _split_labels(row.get("altLabels")),
+            )
+        for row in _read_csv(files["skills"]):
+            writer.add_skill(
+                row.get("conceptUri"), row.get("preferredLabel"),
+                row.get("description") or row.get("definition"), row.get("skillType"),
+                _split_labels(row.get("altLabels")),
+            )
+        for row in _read_csv(files["relations"]):
+            writer.add_relation(row.get("occupationUri"), row.get("skillUri"), row.get("relationType"))
+        return writer.commit(source=os.path.abspath(directory))
+    except Exception:
+        writer.abort()
+        raise
+
+
+def import_json_dump(json_path: str, path: str) -> Dict[str, int]:
+    """
+    Import a JSON snapshot shaped like:
+    {"skills": [{"uri", "title", "description", "skill_type", "alt_labels"}],
+     "occupations": [{"uri", "title", "description", "alt_labels",
+                      "essential_skills": [uri | {"uri", "title"}], "optional_skills": [...]}]}
+    Skills referenced only by an occupation are created from their {"uri", "title"}.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    writer = ESCOSnapshotWriter(path)
+    try:
+        for skill in data.get("skills", []):
+            writer.add_skill(
+                skill.get("uri"), skill.get("title"), skill.get("description"),
+                skill.get("skill_type"), _split_labels(skill.get("alt_labels")),
+            )
+        for occupation in data.get("occupations", []):
+            uri = occupation.get("uri")
+            writer.add_occupation(
+                uri, occupation.get("title"), occupation.get("description"),
+                _split_labels(occupation.get("alt_labels")),
+            )
+            for relation in ("essential", "optional"):
+                for skill in occupation.get(f"{relation}_skills", []):
+                    if isinstance(skill, dict):
+                        writer.ensure_skill(skill.get("uri"), skill.get("title"))
+                        skill = skill.get("uri")
+                    writer.add_relation(uri, skill, relation)
+        return writer.commit(source=os.path.abspath(json_path))
+    except Exception:
+        writer.abort()
+        raise
@@ -4,26 +4,21 @@ Converts non-traditional experience into professional skills and resume bullets
 """
 
 from typing import Dict, List
-from openai import OpenAI
-from config import get_settings
+from ai.llm_gateway import llm_gateway
 import json
 import re
 
-settings = get_settings()
 
-
-def translate_experience(raw_experience: str) -> Dict:
+async def translate_experience(raw_experience: str) -> Dict:
     """
     Translate non-traditional experience into professional format.
 
     Input: free text like "Ran a YouTube channel with 10K subscribers"
     Output: skills, resume bullets, matching job roles
     """
-    if not settings.openai_api_key:
+    if not llm_gateway.available:
         return _fallback_translation(raw_experience)
 
-    client = OpenAI(api_key=settings.openai_api_key)
-
     prompt = f"""You are a career advisor. A student describes a non-traditional experience below.
 Translate it into professional terms.
 
@@ -49,15 +44,11 @@ Return ONLY valid JSON:
 }}"""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a career advisor who translates life experience into professional value. Return only valid JSON."},
-                {"role": "user", "content": prompt},
-            ],
+        content = await llm_gateway.complete(
+            prompt,
+            system="You are a career advisor who translates life experience into professional value. Return only valid JSON.",
             temperature=0.7,
         )
-        content = response.choices[0].message.content
         json_match = re.search(r'\{.*\}', content, re.DOTALL)
         if json_match:
             return json.loads(json_match.group())
@@ -3,10 +3,26 @@ Ghost Job Detector & Scam Shield
 Analyzes job postings for red flags and provides trust scores
 """
 
+import asyncio
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 from datetime import datetime, timedelta
 
+# Batches at least this large are fanned out across worker processes
+PROCESS_POOL_THRESHOLD = 2000
+PROCESS_CHUNK_SIZE = 1000
+
+
+def _compile_phrases(categories: Dict[str, List[str]]):
+    """One alternation regex over every phrase, plus a phrase -> category map"""
+    phrase_category = {}
+    for category, phrases in categories.items():
+        for phrase in phrases:
+            phrase_category.setdefault(phrase.lower(), category)
+    # Longest first so overlapping phrases prefer the more specific one
+    alternation = "|".join(re.escape(p) for p in sorted(phrase_category, key=len, reverse=True))
+    return re.compile(alternation), phrase_category
+
 
 class GhostJobDetector:
     """Detects fake job postings and scams using rule-based analysis"""
@@ -16,8 +32,28 @@ class GhostJobDetector:
     VAGUE_WORDS = ['flexible', 'easy money', 'work from home entrepreneur', 'unlimited earning']
     SCAM_INDICATORS = ['send money', 'pay upfront', 'wire transfer', 'western union', 'gift card']
     URGENCY_WORDS = ['urgent', 'immediate hire', 'start today', 'limited spots']
+    UNREALISTIC_PERKS = [
+        'unlimited vacation',
+        'work 2 hours',
+        'no experience required',
+        'make $10000',
+        'passive income',
+        'get rich'
+    ]
+    ENTRY_LEVEL_TERMS = ['entry', 'junior', 'associate', 'intern']
+    
+    # Compiled once; every posting is scanned in a single pass per field
+    _SALARY_RE = re.compile(SUSPICIOUS_SALARY_PATTERN, re.IGNORECASE)
+    _EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+    _EXPERIENCE_RE = re.compile(r'(?:5|7|10)\+?\s*years', re.IGNORECASE)
+    _ENTRY_LEVEL_RE = re.compile("|".join(ENTRY_LEVEL_TERMS))
+    _PHRASE_RE, _PHRASE_CATEGORY = _compile_phrases({
+        "scam": SCAM_INDICATORS,
+        "urgency": URGENCY_WORDS,
+        "perk": UNREALISTIC_PERKS,
+    })
     
-    def analyze_job_posting(self, job_data: Dict) -> Dict:
+    def analyze_job_posting(self, job_data: Dict, timestamp: Optional[str] = None) -> Dict:
         """
         Analyze a job posting and return trust score + red flags
         
@@ -46,12 +82,16 @@ class GhostJobDetector:
         trust_score = 100
         recommendations = []
         
-        title = job_data.get("title", "").lower()
-        description = job_data.get("description", "").lower()
-        salary = job_data.get("salary", "").lower()
-        company = job_data.get("company", "")
+        title = (job_data.get("title") or "").lower()
+        description = (job_data.get("description") or "").lower()
+        salary = (job_data.get("salary") or "").lower()
+        company = job_data.get("company") or ""
         company_verified = job_data.get("company_verified", False)
         
+        # Single pass over each field for every phrase list
+        title_hits = self._scan_phrases(title)
+        description_hits = self._scan_phrases(description)
+        
         # Check 1: Unrealistic salary
         if self._check_unrealistic_salary(salary, description):
             red_flags.append("Unrealistic or suspiciously high salary mentioned")
@@ -71,14 +111,14 @@ class GhostJobDetector:
             recommendations.append("Search company on LinkedIn and verify their website")
         
         # Check 4: Scam language
-        scam_count = self._check_scam_language(description, title)
+        scam_count = len(title_hits["scam"] | description_hits["scam"])
         if scam_count > 0:
             red_flags.append(f"Contains {scam_count} potential scam indicators")
             trust_score -= (scam_count * 15)
             recommendations.append("NEVER send money or personal financial info during application")
         
         # Check 5: High pressure tactics
-        if self._check_urgency_tactics(description, title):
+        if title_hits["urgency"] or description_hits["urgency"]:
             red_flags.append("Uses high-pressure or urgency tactics")
             trust_score -= 15
             recommendations.append("Legitimate companies rarely rush hiring decisions")
@@ -96,7 +136,7 @@ class GhostJobDetector:
             recommendations.append("This might be a 'ghost job' - apply but keep searching")
         
         # Check 8: Too good to be true perks
-        if self._check_unrealistic_perks(description):
+        if description_hits["perk"]:
             red_flags.append("Promises unusually generous perks or benefits")
             trust_score -= 15
             recommendations.append("If it sounds too good to be true, it probably is")
@@ -121,67 +161,42 @@ class GhostJobDetector:
             "risk_level": risk_level,
             "red_flags": red_flags,
             "recommendations": recommendations,
-            "analysis_timestamp": datetime.now().isoformat()
+            "analysis_timestamp": timestamp or datetime.now().isoformat()
         }
     
+    def _scan_phrases(self, text: str) -> Dict[str, Set[str]]:
+        """Distinct scam/urgency/perk phrases found in already-lowercased text"""
+        hits = {"scam": set(), "urgency": set(), "perk": set()}
+        for match in self._PHRASE_RE.finditer(text):
+            phrase = match.group()
+            hits[self._PHRASE_CATEGORY[phrase]].add(phrase)
+        return hits
+    
     def _check_unrealistic_salary(self, salary: str, description: str) -> bool:
         """Check for unrealistic salary claims"""
-        combined = f"{salary} {description}"
-        return bool(re.search(self.SUSPICIOUS_SALARY_PATTERN, combined, re.IGNORECASE))
-    
-    def _check_scam_language(self, description: str, title: str) -> int:
-        """Count scam indicators in text"""
-        combined = f"{description} {title}".lower()
-        count = 0
-        for indicator in self.SCAM_INDICATORS:
-            if indicator in combined:
-                count += 1
-        return count
-    
-    def _check_urgency_tactics(self, description: str, title: str) -> bool:
-        """Check for high-pressure urgency tactics"""
-        combined = f"{description} {title}".lower()
-        return any(word in combined for word in self.URGENCY_WORDS)
+        return bool(self._SALARY_RE.search(salary) or self._SALARY_RE.search(description))
     
     def _has_proper_contact(self, description: str, company: str) -> bool:
         """Check if posting has proper contact information"""
-        # Look for email patterns
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        has_email = bool(re.search(email_pattern, description))
+        has_email = bool(self._EMAIL_RE.search(description))
         has_company = bool(company and len(company) > 2)
         return has_email or has_company
     
     def _check_experience_inflation(self, title: str, description: str) -> bool:
         """Check for entry-level jobs requiring too much experience"""
-        is_entry_level = any(term in title.lower() for term in ['entry', 'junior', 'associate', 'intern'])
-        if not is_entry_level:
+        if not self._ENTRY_LEVEL_RE.search(title):
             return False
-        
-        # Look for excessive experience requirements
-        experience_patterns = [r'5\+?\s*years', r'7\+?\s*years', r'10\+?\s*years']
-        for pattern in experience_patterns:
-            if re.search(pattern, description, re.IGNORECASE):
-                return True
-        return False
+        return bool(self._EXPERIENCE_RE.search(description))
     
-    def _check_unrealistic_perks(self, description: str) -> bool:
-        """Check for too-good-to-be-true perks"""
-        unrealistic_perks = [
-            'unlimited vacation',
-            'work 2 hours',
-            'no experience required',
-            'make $10000',
-            'passive income',
-            'get rich'
-        ]
-        desc_lower = description.lower()
-        return any(perk in desc_lower for perk in unrealistic_perks)
+    def analyze_many(self, job_listings: List[Dict]) -> List[Dict]:
+        """Analyze postings in input order, sharing one timestamp"""
+        timestamp = datetime.now().isoformat()
+        return [self.analyze_job_posting(job, timestamp) for job in job_listings]
     
     def batch_analyze(self, job_listings: List[Dict]) -> List[Dict]:
         """Analyze multiple job postings at once"""
         results = []
-        for job in job_listings:
-            analysis = self.analyze_job_posting(job)
+        for job, analysis in zip(job_listings, self.analyze_many(job_listings)):
             analysis['job_title'] = job.get('title', 'Unknown')
             analysis['company'] = job.get('company', 'Unknown')
             results.append(analysis)
@@ -201,3 +216,29 @@ def verify_job_posting(job_data: Dict) -> Dict:
 def analyze_multiple_jobs(job_listings: List[Dict]) -> List[Dict]:
     """Analyze multiple job postings"""
     return detector.batch_analyze(job_listings)
+
+
+def _analyze_chunk(job_listings: List[Dict]) -> List[Dict]:
+    """Process-pool entry point (must be module level to pickle)"""
+    return detector.analyze_many(job_listings)
+
+
+async def verify_job_postings_bulk(job_listings: List[Dict]) -> List[Dict]:
+    """
+    Analyze many postings without blocking the event loop, in input order.
+    Small batches run on a thread; large ones are chunked across a process pool.
+    """
+    # Imported here so pool workers, which import this module, don't load config
+    from utils.process_pool import get_process_pool, pool_size
+
+    loop = asyncio.get_running_loop()
+    if len(job_listings) < PROCESS_POOL_THRESHOLD or pool_size() < 2:
+        return await loop.run_in_executor(None, _analyze_chunk, job_listings)
+
+    pool = get_process_pool()
+    chunks = [
+        job_listings[i:i + PROCESS_CHUNK_SIZE]
+        for i in range(0, len(job_listings), PROCESS_CHUNK_SIZE)
+    ]
+    results = await asyncio.gather(*(loop.run_in_executor(pool, _analyze_chunk, chunk) for chunk in chunks))
+    return [analysis for chunk_results in results for analysis in chunk_results]
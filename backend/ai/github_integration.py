@@ -7,10 +7,12 @@ import httpx
 from typing import Dict, List, Optional
 import json
 import re
+from ai.skill_ontology import skill_ontology
 
 GITHUB_API = "https://api.github.com"
 
-# Language to skill mapping
+# Language to skill mapping (names resolve through the shared skill ontology;
+# repo topics and descriptions are matched against the ontology directly)
 LANGUAGE_SKILLS = {
     "Python": ["Python", "Backend Development"],
     "JavaScript": ["JavaScript", "Web Development"],
@@ -33,33 +35,6 @@ LANGUAGE_SKILLS = {
     "HCL": ["Terraform", "Infrastructure as Code"],
 }
 
-# Topic/keyword to skill mapping
-TOPIC_SKILLS = {
-    "machine-learning": "Machine Learning",
-    "deep-learning": "Deep Learning",
-    "data-science": "Data Science",
-    "web-development": "Web Development",
-    "react": "React",
-    "nextjs": "Next.js",
-    "vue": "Vue.js",
-    "angular": "Angular",
-    "django": "Django",
-    "flask": "Flask",
-    "fastapi": "FastAPI",
-    "docker": "Docker",
-    "kubernetes": "Kubernetes",
-    "aws": "AWS",
-    "azure": "Azure",
-    "gcp": "Google Cloud",
-    "devops": "DevOps",
-    "api": "API Development",
-    "database": "Database Management",
-    "testing": "Software Testing",
-    "ci-cd": "CI/CD",
-    "blockchain": "Blockchain",
-    "mobile": "Mobile Development",
-}
-
 
 async def fetch_github_profile(username: str) -> Optional[Dict]:
     """Fetch GitHub user profile and repos"""
@@ -98,7 +73,7 @@ async def fetch_github_profile(username: str) -> Optional[Dict]:
 
 def extract_skills_from_repos(repos: List[Dict]) -> Dict:
     """Extract skills from GitHub repositories"""
-    skills = set()
+    skills = []
     languages = {}
     projects = []
 
@@ -110,17 +85,15 @@ def extract_skills_from_repos(repos: List[Dict]) -> Dict:
         if lang:
             languages[lang] = languages.get(lang, 0) + 1
             if lang in LANGUAGE_SKILLS:
-                skills.update(LANGUAGE_SKILLS[lang])
+                skills.extend(LANGUAGE_SKILLS[lang])
 
         topics = repo.get("topics", [])
         for topic in topics:
-            if topic in TOPIC_SKILLS:
-                skills.add(TOPIC_SKILLS[topic])
+            skill_id = skill_ontology.resolve(topic)
+            if skill_id:
+                skills.append(skill_ontology.name_of(skill_id))
 
-        desc = (repo.get("description") or "").lower()
-        for keyword, skill in TOPIC_SKILLS.items():
-            if keyword.replace("-", " ") in desc or keyword in desc:
-                skills.add(skill)
+        skills.extend(skill_ontology.extract_names(repo.get("description") or ""))
 
         if repo.get("stargazers_count", 0) > 0 or not repo.get("fork"):
             projects.append({
@@ -135,7 +108,7 @@ def extract_skills_from_repos(repos: List[Dict]) -> Dict:
     top_languages = sorted(languages.items(), key=lambda x: x[1], reverse=True)[:10]
 
     return {
-        "skills": sorted(list(skills)),
+        "skills": sorted(skill_ontology.canonicalize(skills)),
         "top_languages": [{"language": l, "repos": c} for l, c in top_languages],
         "projects": projects[:15],
         "total_repos_analyzed": len([r for r in repos if not r.get("fork")]),
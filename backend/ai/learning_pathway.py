@@ -4,15 +4,12 @@ Creates personalized learning roadmaps for bridging skill gaps
 """
 
 from typing import Dict, List
-from openai import OpenAI
-from config import get_settings
+from ai.llm_gateway import llm_gateway
 import json
 import re
 
-settings = get_settings()
 
-
-def generate_learning_path(
+async def generate_learning_path(
     missing_skills: List[str],
     target_role: str,
     current_level: str = "beginner",
@@ -23,11 +20,9 @@ def generate_learning_path(
     
     Returns list of learning steps with resources.
     """
-    if not settings.openai_api_key:
+    if not llm_gateway.available:
         return _fallback_path(missing_skills, target_role)
 
-    client = OpenAI(api_key=settings.openai_api_key)
-
     prompt = f"""Create a personalized learning roadmap for a student targeting a {target_role} role.
 
 Missing skills to learn: {', '.join(missing_skills[:8])}
@@ -57,15 +52,11 @@ For each skill, provide a learning step. Return ONLY a JSON array:
 Order by priority (high first). Limit to {min(len(missing_skills), 8)} steps."""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a learning path advisor. Return only valid JSON arrays."},
-                {"role": "user", "content": prompt},
-            ],
+        content = await llm_gateway.complete(
+            prompt,
+            system="You are a learning path advisor. Return only valid JSON arrays.",
             temperature=0.7,
         )
-        content = response.choices[0].message.content
         json_match = re.search(r'\[.*\]', content, re.DOTALL)
         if json_match:
             return json.loads(json_match.group())
@@ -0,0 +1,249 @@
+"""
+LLM Response Cache
+Content-addressed cache for chat completions, keyed by a hash of
+(model, temperature, normalized prompt). Bounded in-memory LRU tier
+with an optional on-disk SQLite tier shared across workers.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from config import get_settings
+
+settings = get_settings()
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(text: str) -> str:
+    """Collapse whitespace so reformatted prompts share a cache entry"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def make_cache_key(
+    model: str, temperature: float, messages: List[Dict[str, str]], response_format: Optional[Dict] = None
+) -> str:
+    """Hash (model, temperature, normalized messages[, response format]) into a stable key"""
+    key = {
+        "model": model,
+        "temperature": round(float(temperature), 3),
+        "messages": [[m.get("role", ""), normalize_prompt(m.get("content", ""))] for m in messages],
+    }
+    if response_format:
+        key["response_format"] = json.dumps(response_format, sort_keys=True)
+    payload = json.dumps(key, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Interface for a cache tier"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        """(value, expires_at) when the tier knows its expiry, else (value, None)"""
+        value = self.get(key)
+        return (value, None) if value is not None else None
+
+
+class MemoryLRUCache(CacheBackend):
+    """Bounded in-process LRU with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk tier so every worker process shares generated responses"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, Optional[float]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0], row[1]
+
+    def set(self, key: str, value: str, ttl: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+class LLMResponseCache:
+    """Two-tier cache (memory, then optional disk) with hit/miss counters"""
+
+    def __init__(self, memory: CacheBackend, disk: Optional[CacheBackend] = None):
+        self.memory = memory
+        self.disk = disk
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._pending_writes = set()
+
+    def get(self, key: str, ttl: float) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            value = self._promote(self.disk.get_entry(key), key, ttl)
+            if value is not None:
+                return value
+        self.misses += 1
+        return None
+
+    def _promote(self, entry: Optional[Tuple[str, Optional[float]]], key: str, ttl: float) -> Optional[str]:
+        """Copy a disk hit into memory for the remainder of its TTL window"""
+        if entry is None:
+            return None
+        value, expires_at = entry
+        remaining = ttl if expires_at is None else min(ttl, expires_at - time.time())
+        if remaining > 0:
+            self.memory.set(key, value, remaining)
+        self.hits += 1
+        self.disk_hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: float):
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            self.disk.set(key, value, ttl)
+
+    async def aget(self, key: str, ttl: float) -> Optional[str]:
+        """get() for async callers; the disk tier is read on a worker thread"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            value = self._promote(await asyncio.to_thread(self.disk.get_entry, key), key, ttl)
+            if value is not None:
+                return value
+        self.misses += 1
+        return None
+
+    async def aset(self, key: str, value: str, ttl: float):
+        """set() for async callers; the disk write runs in the background, off the request path"""
+        self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.disk.set, key, value, ttl))
+            self._pending_writes.add(task)
+            task.add_done_callback(self._write_done)
+
+    def _write_done(self, task: asyncio.Task):
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️  LLM cache: disk write failed ({type(task.exception()).__name__}: {task.exception()})")
+
+    async def drain(self):
+        """Wait for background disk writes; call on shutdown"""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "memory_entries": len(self.memory) if hasattr(self.memory, "__len__") else None,
+            "disk_enabled": self.disk is not None,
+        }
+
+
+def _build_cache() -> LLMResponseCache:
+    disk = None
+    if settings.llm_cache_sqlite_path:
+        try:
+            disk = SQLiteCache(settings.llm_cache_sqlite_path)
+        except Exception as e:
+            print(f"⚠️  LLM cache: SQLite tier disabled ({type(e).__name__}: {e})")
+    return LLMResponseCache(MemoryLRUCache(settings.llm_cache_max_entries), disk)
+
+
+# Global singleton
+llm_cache = _build_cache()
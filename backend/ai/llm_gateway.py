@@ -0,0 +1,209 @@
+"""
+LLM Gateway
+Process-wide async OpenAI client shared by every AI module.
+Pools HTTP connections, caps concurrency per model, and retries
+transient failures with exponential backoff.
+"""
+
+import asyncio
+import random
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+from config import get_settings
+from ai.llm_cache import llm_cache, make_cache_key
+
+settings = get_settings()
+
+DEFAULT_MODEL = settings.llm_default_model
+
+# Errors worth retrying — everything else (auth, bad request) fails fast
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, RateLimitError, InternalServerError)
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when no API key is configured"""
+
+
+class LLMGateway:
+    """Shared async chat-completion client with pooling, limits and retries"""
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        max_connections: int = 50,
+        model_concurrency: int = 16,
+        backoff_base: float = 0.5,
+    ):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_connections = max_connections
+        self.model_concurrency = model_concurrency
+        self.backoff_base = backoff_base
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self) -> AsyncOpenAI:
+        """Lazily build the pooled client so import time stays cheap"""
+        if not self.available:
+            raise LLMUnavailableError("OpenAI API key is not configured")
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(self.timeout),
+            )
+            # Retries are handled here so they share the per-model semaphore
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=http_client,
+                max_retries=0,
+            )
+        return self._client
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._semaphores:
+            self._semaphores[model] = asyncio.Semaphore(self.model_concurrency)
+        return self._semaphores[model]
+
+    async def _backoff(self, attempt: int):
+        delay = self.backoff_base * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        response_format: Optional[Dict] = None,
+        validate: Optional[Callable[[str], Any]] = None,
+    ) -> str:
+        """
+        Run a chat completion and return the message content.
+        Pass cache_ttl (seconds) to serve identical prompts from the response cache,
+        and response_format (e.g. a json_schema) for structured output.
+        With validate (the caller's parser), a reply is cached only if it parses
+        without raising, so one malformed reply isn't replayed for the whole TTL.
+        """
+        cache_key = None
+        if cache_ttl:
+            cache_key = make_cache_key(model, temperature, messages, response_format)
+            cached = await llm_cache.aget(cache_key, cache_ttl)
+            if cached is not None:
+                return cached
+
+        client = self._get_client()
+        params = {"model": model, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        if response_format is not None:
+            params["response_format"] = response_format
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore(model):
+                    response = await client.chat.completions.create(
+                        **params, timeout=timeout or self.timeout
+                    )
+                content = response.choices[0].message.content or ""
+                if cache_key and content and self._valid(content, validate):
+                    await llm_cache.aset(cache_key, content, cache_ttl)
+                return content
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                print(f"LLM gateway retry {attempt + 1}/{self.max_retries} ({type(e).__name__})")
+                await self._backoff(attempt)
+
+    @staticmethod
+    def _valid(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        if validate is None:
+            return True
+        try:
+            validate(content)
+            return True
+        except Exception as e:
+            print(f"LLM gateway: not caching reply that failed validation ({type(e).__name__}: {e})")
+            return False
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive.
+        Retries only happen before the first token has been sent.
+        """
+        client = self._get_client()
+        params = {"model": model, "messages": messages, "temperature": temperature, "stream": True}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+
+        for attempt in range(self.max_retries + 1):
+            started = False
+            try:
+                async with self._semaphore(model):
+                    stream = await client.chat.completions.create(
+                        **params, timeout=timeout or self.timeout
+                    )
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            started = True
+                            yield chunk.choices[0].delta.content
+                return
+            except RETRYABLE_ERRORS as e:
+                if started or attempt >= self.max_retries:
+                    raise
+                print(f"LLM gateway stream retry {attempt + 1}/{self.max_retries} ({type(e).__name__})")
+                await self._backoff(attempt)
+
+    async def complete(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        **kwargs,
+    ) -> str:
+        """Convenience wrapper for a single-turn prompt"""
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+        return await self.chat(messages, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+# Global singleton
+llm_gateway = LLMGateway(
+    api_key=settings.openai_api_key,
+    timeout=settings.llm_timeout_seconds,
+    max_retries=settings.llm_max_retries,
+    max_connections=settings.llm_max_connections,
+    model_concurrency=settings.llm_model_concurrency,
+)
@@ -1,33 +1,32 @@
 """
-AI Orchestrator - LangChain-powered Career Counseling
+AI Orchestrator - Career Counseling
 Handles intelligent routing and conversation management
 """
 
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage
-from config import get_settings
-from typing import Dict, List, Optional
+from ai.llm_gateway import llm_gateway
+from typing import AsyncIterator, Dict, List, Optional
 import json
+import re
 
-settings = get_settings()
+# Response cache TTLs (seconds) for prompts that repeat across users
+ROADMAP_CACHE_TTL = 24 * 3600
+SCHOLARSHIP_CACHE_TTL = 24 * 3600
+SIDE_HUSTLE_CACHE_TTL = 12 * 3600
+
+
+def parse_json_array(content: str) -> List:
+    """The JSON array in an LLM reply (prose or code fences around it are ignored); raises ValueError"""
+    match = re.search(r'\[.*\]', content, re.DOTALL)
+    if not match:
+        raise ValueError("reply has no JSON array")
+    return json.loads(match.group())
 
 
 class CareerCounselorOrchestrator:
     """Main AI orchestrator for career guidance conversations"""
     
     def __init__(self):
-        self.llm = None
-        try:
-            if settings.openai_api_key:
-                self.llm = ChatOpenAI(
-                    model="gpt-4o-mini",
-                    temperature=0.7,
-                    api_key=settings.openai_api_key
-                )
-        except Exception as e:
-            print(f"Warning: Could not initialize OpenAI LLM: {e}")
-            self.llm = None
+        self.llm = llm_gateway if llm_gateway.available else None
         
     def create_career_counselor_chain(self, atlas_card: Dict):
         """Create a conversation chain with context from Atlas Card"""
@@ -37,8 +36,7 @@ class CareerCounselorOrchestrator:
         # Build context from Atlas Card
         context = self._build_context(atlas_card)
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""You are Atlas AI, a career guidance counselor helping students find clarity in their career journey.
+        system_prompt = f"""You are Atlas AI, a career guidance counselor helping students find clarity in their career journey.
 
 User Context:
 {context}
@@ -50,12 +48,9 @@ Your role:
 - Be encouraging, insightful, and conversational
 - Keep responses concise (2-3 paragraphs max)
 
-Remember: You're transforming confusion to clarity."""),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "{input}")
-        ])
+Remember: You're transforming confusion to clarity."""
         
-        return {"prompt": prompt, "llm": self.llm, "history": []}
+        return {"system_prompt": system_prompt, "llm": self.llm, "history": []}
     
     def _build_context(self, atlas_card: Dict) -> str:
         """Build context string from Atlas Card"""
@@ -91,8 +86,7 @@ Remember: You're transforming confusion to clarity."""),
         """Initialize a soft skills role-play scenario"""
         context = self._build_context(atlas_card)
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", f"""You are Atlas AI, a soft skills coach. You are conducting a role-play simulation with a student.
+        system_prompt = f"""You are Atlas AI, a soft skills coach. You are conducting a role-play simulation with a student.
 
 Scenario: {scenario}
 
@@ -103,16 +97,13 @@ Your objective:
 - Adopt the character required for the scenario (e.g., manager, client, teammate)
 - Push the student to demonstrate soft skills (communication, empathy, logic)
 - After the user speaks 3-4 times, pause the role-play and provide a brief 'Coach's Feedback' on their performance.
-- Be realistic and professional."""),
-            MessagesPlaceholder(variable_name="history"),
-            ("human", "{input}")
-        ])
+- Be realistic and professional."""
         
         if not self.llm:
             return None
-        return {"prompt": prompt, "llm": self.llm, "history": []}
+        return {"system_prompt": system_prompt, "llm": self.llm, "history": []}
 
-    def generate_career_roadmap(self, target_role: str, current_skills: List[str]):
+    async def generate_career_roadmap(self, target_role: str, current_skills: List[str]):
         """Generate a detailed step-by-step career roadmap"""
         prompt = f"""Target Role: {target_role}
 Current Skills: {', '.join(current_skills)}
@@ -129,8 +120,8 @@ Return as a JSON list of objects."""
             return json.dumps(self._fallback_roadmap(target_role, current_skills))
 
         try:
-            response = self.llm.invoke(prompt)
-            return response.content
+            return await self.llm.complete(prompt, temperature=0.7, cache_ttl=ROADMAP_CACHE_TTL,
+                                           validate=parse_json_array)
         except Exception as e:
             print(f"OpenAI Error in generate_career_roadmap: {e}")
             return json.dumps(self._fallback_roadmap(target_role, current_skills))
@@ -144,7 +135,7 @@ Return as a JSON list of objects."""
             {"step": 4, "goal": f"Apply for {target_role} positions", "skills_to_learn": ["Interview prep", "Resume optimization"], "resource_type": "Mock interviews & job boards", "estimated_timeline": "4-8 weeks"},
         ]
 
-    def get_career_recommendations(self, atlas_card: Dict, preferences: Optional[Dict] = None) -> List[Dict]:
+    async def get_career_recommendations(self, atlas_card: Dict, preferences: Optional[Dict] = None) -> List[Dict]:
         """Generate AI-powered career recommendations"""
         
         context = self._build_context(atlas_card)
@@ -169,9 +160,9 @@ Format as JSON array."""
             return self._fallback_recommendations(atlas_card)
 
         try:
-            response = self.llm.invoke(prompt)
+            content = await self.llm.complete(prompt, temperature=0.7)
             # Parse AI response into structured format
-            return self._parse_career_recommendations(response.content)
+            return self._parse_career_recommendations(content)
         except Exception as e:
             print(f"Error in get_career_recommendations: {e}")
             return self._fallback_recommendations(atlas_card)
@@ -231,7 +222,7 @@ Format as JSON array."""
         """Fallback recommendations if AI fails"""
         return self._parse_career_recommendations("")
 
-    def get_scholarships(self, major: str, location: str = "") -> List[Dict]:
+    async def get_scholarships(self, major: str, location: str = "") -> List[Dict]:
         """Find relevant scholarships based on major and location"""
         prompt = f"""As Atlas AI, find 5 diverse scholarship or financial aid opportunities for a student majoring in {major}.
         
@@ -256,10 +247,9 @@ Format as JSON array."""
             return self._fallback_scholarships()
 
         try:
-            response = self.llm.invoke(prompt)
-            import re
-            json_match = re.search(r'\[.*\]', response.content, re.DOTALL)
-            return json.loads(json_match.group()) if json_match else []
+            content = await self.llm.complete(prompt, temperature=0.7, cache_ttl=SCHOLARSHIP_CACHE_TTL,
+                                              validate=parse_json_array)
+            return parse_json_array(content)
         except Exception as e:
             print(f"OpenAI API Error in get_scholarships: {e}")
             return self._fallback_scholarships()
@@ -274,7 +264,7 @@ Format as JSON array."""
             {"name": "State Merit Scholarship", "provider": "State Department of Education", "category": "Government", "amount": "$2,500 - $5,000", "deadline": "March 31, 2026", "description": "Merit-based scholarship for in-state students with strong academic records and community involvement.", "link": "#"},
         ]
 
-    def get_side_hustle_ideas(self, skills: List[str], interests: List[str]) -> List[Dict]:
+    async def get_side_hustle_ideas(self, skills: List[str], interests: List[str]) -> List[Dict]:
         """Incubate side hustle ideas based on user's Skill DNA"""
         skills_str = ", ".join(skills)
         interests_str = ", ".join(interests)
@@ -294,10 +284,9 @@ Format as JSON array."""
             return self._fallback_side_hustles(skills)
 
         try:
-            response = self.llm.invoke(prompt)
-            import re
-            json_match = re.search(r'\[.*\]', response.content, re.DOTALL)
-            return json.loads(json_match.group()) if json_match else []
+            content = await self.llm.complete(prompt, temperature=0.7, cache_ttl=SIDE_HUSTLE_CACHE_TTL,
+                                              validate=parse_json_array)
+            return parse_json_array(content)
         except Exception as e:
             print(f"OpenAI API Error in get_side_hustle_ideas: {e}")
             return self._fallback_side_hustles(skills)
@@ -319,30 +308,52 @@ Format as JSON array."""
 orchestrator = CareerCounselorOrchestrator()
 
 
-def chat_with_counselor(message: str, atlas_card: Dict, conversation_history: Optional[List] = None) -> str:
+def _build_counselor_messages(system_prompt: str, message: str, conversation_history: Optional[List]) -> List[Dict]:
+    """Build the chat message list from the system prompt and prior turns"""
+    messages = [{"role": "system", "content": system_prompt}]
+    if conversation_history:
+        for msg in conversation_history:
+            if msg.get("role") in ("user", "assistant"):
+                messages.append({"role": msg["role"], "content": msg.get("content", "")})
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+async def chat_with_counselor(message: str, atlas_card: Dict, conversation_history: Optional[List] = None) -> str:
     """Main chat interface for career counseling with context and memory"""
     try:
         chain_data = orchestrator.create_career_counselor_chain(atlas_card)
         if not chain_data:
             return _fallback_counselor_response(message)
         
-        # Build message history
-        history = []
-        if conversation_history:
-            for msg in conversation_history:
-                if msg.get("role") == "user":
-                    history.append(HumanMessage(content=msg.get("content", "")))
-                elif msg.get("role") == "assistant":
-                    history.append(AIMessage(content=msg.get("content", "")))
-        
-        formatted = chain_data["prompt"].format_messages(history=history, input=message)
-        response = chain_data["llm"].invoke(formatted)
-        return response.content
+        messages = _build_counselor_messages(chain_data["system_prompt"], message, conversation_history)
+        return await chain_data["llm"].chat(messages, temperature=0.7)
     except Exception as e:
         print(f"Chat error: {e}")
         return _fallback_counselor_response(message)
 
 
+async def stream_chat_with_counselor(message: str, atlas_card: Dict, conversation_history: Optional[List] = None) -> AsyncIterator[str]:
+    """Streaming variant of chat_with_counselor — yields text chunks as they arrive"""
+    chain_data = orchestrator.create_career_counselor_chain(atlas_card)
+    if not chain_data:
+        yield _fallback_counselor_response(message)
+        return
+    
+    messages = _build_counselor_messages(chain_data["system_prompt"], message, conversation_history)
+    started = False
+    try:
+        async for chunk in chain_data["llm"].stream_chat(messages, temperature=0.7):
+            started = True
+            yield chunk
+    except Exception as e:
+        print(f"Chat stream error: {e}")
+        # Only fall back if nothing has been sent yet — never splice two answers
+        if started:
+            raise
+        yield _fallback_counselor_response(message)
+
+
 def _fallback_counselor_response(message: str) -> str:
     """Provide a helpful response when AI is unavailable"""
     msg_lower = message.lower()
@@ -355,6 +366,6 @@ def _fallback_counselor_response(message: str) -> str:
     return "That's a great question! While my AI-powered response is currently limited, here are some general tips: 1) Focus on building a strong portfolio of projects, 2) Network through LinkedIn and local meetups, 3) Use your university's career services, 4) Explore our dashboard features like Skill Gap Analyzer, Career Compare, and Learning Path for personalized guidance. Feel free to ask me anything else!"
 
 
-def get_ai_career_recommendations(atlas_card: Dict, preferences: Optional[Dict] = None) -> List[Dict]:
+async def get_ai_career_recommendations(atlas_card: Dict, preferences: Optional[Dict] = None) -> List[Dict]:
     """Get AI-powered career recommendations"""
-    return orchestrator.get_career_recommendations(atlas_card, preferences)
+    return await orchestrator.get_career_recommendations(atlas_card, preferences)
@@ -3,13 +3,17 @@ Custom ML Platform Guide - RAG-based chatbot for navigating Atlas AI
 Uses sentence embeddings + intent classification + GPT-4o-mini
 """
 
-from typing import List, Dict, Tuple, Optional
-import numpy as np
+from typing import AsyncIterator, List, Dict, Tuple, Optional
 from datetime import datetime
+import asyncio
 import json
-from config import get_settings
+import threading
+from ai.llm_gateway import llm_gateway
+from ai.embedding_index import EmbeddingIndex
+from ai import embedding_store
 
-settings = get_settings()
+# Name of the precomputed feature-embedding artifact (see build_embeddings.py)
+FEATURE_ARTIFACT = "platform_guide_features"
 
 
 # ═══════════════════════════════════════════════════════════
@@ -283,9 +287,10 @@ class PlatformGuideML:
     
     def __init__(self):
         self.knowledge_base = ATLAS_KNOWLEDGE_BASE
-        self.embedder = None
-        self.feature_embeddings = None
+        self.features_by_id = {f["id"]: f for f in self.knowledge_base}
+        self.feature_index: Optional[EmbeddingIndex] = None
         self.llm_client = None
+        self._init_lock = threading.Lock()
         
         # Initialize embedder
         # self._init_embedder()
@@ -293,43 +298,51 @@ class PlatformGuideML:
         # Initialize OpenAI client if available
         # self._init_llm()
     
+    @property
+    def embedder(self):
+        """Query encoder, loaded on first use and shared with other modules"""
+        return embedding_store.get_encoder()
+    
     def ensure_initialized(self):
-        """Lazy load models if not already loaded"""
-        if not self.embedder and not hasattr(self, '_embedder_failed'):
-            print("🚀 Loading Platform Guide ML models...")
-            self._init_embedder()
-            self._init_llm()
-            if not self.embedder:
-                self._embedder_failed = True
+        """Lazy load models if not already loaded (blocking; use ainitialize from async code)"""
+        if self.feature_index is not None or hasattr(self, '_embedder_failed'):
+            return
+        with self._init_lock:
+            if self.feature_index is None and not hasattr(self, '_embedder_failed'):
+                print("🚀 Loading Platform Guide ML models...")
+                self._init_embedder()
+                self._init_llm()
+                if self.feature_index is None:
+                    self._embedder_failed = True
+    
+    async def ainitialize(self):
+        """ensure_initialized on a worker thread, so a cold start doesn't stall the event loop"""
+        await asyncio.to_thread(self.ensure_initialized)
+    
+    def feature_artifact_source(self) -> Tuple[List[str], List[str]]:
+        """Ids and texts that the feature-embedding artifact is built from"""
+        ids = [feature['id'] for feature in self.knowledge_base]
+        texts = [self._feature_text(feature) for feature in self.knowledge_base]
+        return ids, texts
     
     def _init_embedder(self):
-        """Initialize sentence transformer for semantic search"""
+        """Load precomputed feature embeddings; the model is only loaded to encode queries"""
         try:
-            from sentence_transformers import SentenceTransformer
-            self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            # Pre-compute embeddings for all features
-            self.feature_embeddings = {}
-            for feature in self.knowledge_base:
-                # Combine all searchable text
-                text = f"{feature['name']} {feature['description']} {' '.join(feature['keywords'])} {' '.join(feature['use_cases'])}"
-                embedding = self.embedder.encode(text)
-                self.feature_embeddings[feature['id']] = embedding
-            
-            print("✅ Platform Guide ML: Embeddings initialized")
+            ids, texts = self.feature_artifact_source()
+            self.feature_index = embedding_store.get_or_build_index(FEATURE_ARTIFACT, ids, texts)
+            if self.feature_index is not None:
+                print("✅ Platform Guide ML: Embeddings initialized")
         except Exception as e:
             print(f"⚠️  Platform Guide ML: Could not load embeddings: {e}")
-            self.embedder = None
+            self.feature_index = None
     
     def _init_llm(self):
-        """Initialize OpenAI client for conversational responses"""
-        try:
-            if settings.openai_api_key:
-                from openai import OpenAI
-                self.llm_client = OpenAI(api_key=settings.openai_api_key)
-                print("✅ Platform Guide ML: LLM initialized")
-        except Exception as e:
-            print(f"⚠️  Platform Guide ML: LLM not available: {e}")
+        """Attach the shared LLM gateway for conversational responses"""
+        if llm_gateway.available:
+            self.llm_client = llm_gateway
+            print("✅ Platform Guide ML: LLM initialized")
+        else:
+            print("⚠️  Platform Guide ML: LLM not available: no API key configured")
             self.llm_client = None
     
     def classify_intent(self, message: str) -> Optional[str]:
@@ -342,29 +355,41 @@ class PlatformGuideML:
                     return intent
         return None
     
+    @staticmethod
+    def _feature_text(feature: Dict) -> str:
+        """Combine all searchable text for a feature"""
+        return f"{feature['name']} {feature['description']} {' '.join(feature['keywords'])} {' '.join(feature['use_cases'])}"
+    
     def retrieve_relevant_features(self, query: str, top_k: int = 3) -> List[Dict]:
         """RAG: Retrieve most relevant features using semantic search"""
         self.ensure_initialized()
         
-        if not self.embedder or not self.feature_embeddings:
+        if self.feature_index is None or self.embedder is None:
             # Fallback to keyword matching
             return self._keyword_search(query, top_k)
         
-        # Encode query
-        query_embedding = self.embedder.encode(query)
+        # One matrix-vector product against the normalized feature matrix
+        hits = self.feature_index.search(self.embedder.encode(query), top_k)
+        return [self.features_by_id[feature_id] for feature_id, _ in hits]
+    
+    def retrieve_relevant_features_batch(self, queries: List[str], top_k: int = 3) -> List[List[Dict]]:
+        """Batch retrieval: encode all queries together and score them in one product"""
+        self.ensure_initialized()
         
-        # Calculate cosine similarity with all features
-        similarities = []
-        for feature_id, feature_embedding in self.feature_embeddings.items():
-            similarity = np.dot(query_embedding, feature_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(feature_embedding)
-            )
-            feature = next(f for f in self.knowledge_base if f['id'] == feature_id)
-            similarities.append((similarity, feature))
+        if not queries:
+            return []
+        if self.feature_index is None or self.embedder is None:
+            return [self._keyword_search(query, top_k) for query in queries]
         
-        # Sort by similarity and return top K
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        return [feature for _, feature in similarities[:top_k]]
+        results = self.feature_index.search_batch(self.embedder.encode(queries), top_k)
+        return [[self.features_by_id[feature_id] for feature_id, _ in hits] for hits in results]
+    
+    async def aretrieve_relevant_features(self, query: str, top_k: int = 3) -> List[Dict]:
+        """retrieve_relevant_features on a worker thread (query encoding is blocking)"""
+        return await asyncio.to_thread(self.retrieve_relevant_features, query, top_k)
+    
+    async def aretrieve_relevant_features_batch(self, queries: List[str], top_k: int = 3) -> List[List[Dict]]:
+        return await asyncio.to_thread(self.retrieve_relevant_features_batch, queries, top_k)
     
     def _keyword_search(self, query: str, top_k: int) -> List[Dict]:
         """Fallback keyword-based search"""
@@ -391,9 +416,9 @@ class PlatformGuideML:
         matches.sort(key=lambda x: x[0], reverse=True)
         return [feature for _, feature in matches[:top_k]]
     
-    def generate_response(self, message: str, conversation_history: List[Dict] = None) -> Dict:
+    async def generate_response(self, message: str, conversation_history: List[Dict] = None) -> Dict:
         """Main method: Generate intelligent response using ML pipeline"""
-        self.ensure_initialized()
+        await self.ainitialize()
         
         # Step 1: Check for direct intent patterns
         intent = self.classify_intent(message)
@@ -407,15 +432,53 @@ class PlatformGuideML:
             }
         
         # Step 2: Retrieve relevant features using RAG
-        relevant_features = self.retrieve_relevant_features(message, top_k=3)
+        relevant_features = await self.aretrieve_relevant_features(message, top_k=3)
         
         # Step 3: Generate response using LLM if available
         if self.llm_client and relevant_features:
-            response_text = self._generate_llm_response(message, relevant_features, conversation_history)
+            response_text = await self._generate_llm_response(message, relevant_features, conversation_history)
         else:
             # Fallback to template-based response
             response_text = self._generate_template_response(message, relevant_features)
         
+        return {"response": response_text, **self._build_feature_metadata(relevant_features)}
+    
+    async def stream_response(self, message: str, conversation_history: List[Dict] = None) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Streaming variant of generate_response.
+        Yields ("meta", {...intent/features/action}) first, then ("token", {"token": ...}) chunks.
+        """
+        await self.ainitialize()
+        
+        intent = self.classify_intent(message)
+        if intent and intent in INTENT_PATTERNS:
+            yield "meta", {"intent": intent, "relevant_features": [], "confidence": 1.0, "action": None}
+            yield "token", {"token": INTENT_PATTERNS[intent]["response"]}
+            return
+        
+        relevant_features = await self.aretrieve_relevant_features(message, top_k=3)
+        yield "meta", self._build_feature_metadata(relevant_features)
+        
+        if self.llm_client and relevant_features:
+            started = False
+            try:
+                async for chunk in self.llm_client.stream_chat(
+                    self._build_llm_messages(message, relevant_features, conversation_history),
+                    max_tokens=150,
+                    temperature=0.7
+                ):
+                    started = True
+                    yield "token", {"token": chunk}
+                return
+            except Exception as e:
+                print(f"LLM stream error: {e}")
+                if started:
+                    raise
+        
+        yield "token", {"token": self._generate_template_response(message, relevant_features)}
+    
+    def _build_feature_metadata(self, relevant_features: List[Dict]) -> Dict:
+        """Intent, confidence and navigation action for a feature query"""
         # Determine action (redirect to feature)
         action = None
         if relevant_features and len(relevant_features) == 1:
@@ -427,7 +490,6 @@ class PlatformGuideML:
             }
         
         return {
-            "response": response_text,
             "intent": "feature_query",
             "relevant_features": [
                 {
@@ -442,20 +504,19 @@ class PlatformGuideML:
             "action": action
         }
     
-    def _generate_llm_response(self, message: str, features: List[Dict], history: List[Dict]) -> str:
-        """Use GPT-4o-mini to generate natural response"""
-        try:
-            # Build context from relevant features
-            features_context = "\n\n".join([
-                f"**{f['name']}** ({f['route']})\n{f['description']}"
-                for f in features
-            ])
-            
-            # Build conversation history
-            messages = [
-                {
-                    "role": "system",
-                    "content": f"""You are the Atlas AI Platform Guide. Your job is to help users navigate the platform and find the right features.
+    def _build_llm_messages(self, message: str, features: List[Dict], history: List[Dict]) -> List[Dict]:
+        """Build the chat messages for the guide LLM from retrieved features"""
+        # Build context from relevant features
+        features_context = "\n\n".join([
+            f"**{f['name']}** ({f['route']})\n{f['description']}"
+            for f in features
+        ])
+        
+        # Build conversation history
+        messages = [
+            {
+                "role": "system",
+                "content": f"""You are the Atlas AI Platform Guide. Your job is to help users navigate the platform and find the right features.
 
 Available features context:
 {features_context}
@@ -466,24 +527,27 @@ Guidelines:
 - Provide clear next steps
 - Keep responses under 100 words
 - Use emojis sparingly for friendliness"""
-                }
-            ]
-            
-            # Add history if provided
-            if history:
-                for msg in history[-4:]:  # Last 4 messages
-                    messages.append({"role": msg["role"], "content": msg["content"]})
-            
-            messages.append({"role": "user", "content": message})
-            
-            response = self.llm_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
+            }
+        ]
+        
+        # Add history if provided
+        if history:
+            for msg in history[-4:]:  # Last 4 messages
+                messages.append({"role": msg["role"], "content": msg["content"]})
+        
+        messages.append({"role": "user", "content": message})
+        return messages
+    
+    async def _generate_llm_response(self, message: str, features: List[Dict], history: List[Dict]) -> str:
+        """Use GPT-4o-mini to generate natural response"""
+        try:
+            content = await self.llm_client.chat(
+                self._build_llm_messages(message, features, history),
                 max_tokens=150,
                 temperature=0.7
             )
             
-            return response.choices[0].message.content.strip()
+            return content.strip()
         
         except Exception as e:
             print(f"LLM generation error: {e}")
@@ -3,10 +3,11 @@ Project Recommendation System
 Suggests career-aligned portfolio projects using GitHub API and AI
 """
 
-import requests
+import asyncio
+import httpx
 from typing import List, Dict, Optional
 from config import get_settings
-from openai import OpenAI
+from ai.llm_gateway import llm_gateway
 
 settings = get_settings()
 
@@ -17,9 +18,24 @@ class ProjectRecommender:
     def __init__(self):
         self.github_token = settings.github_token
         self.github_api_base = "https://api.github.com"
-        self.openai_client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        self.llm = llm_gateway if llm_gateway.available else None
+        self._client: Optional[httpx.AsyncClient] = None
     
-    def recommend_projects(
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared GitHub client, so searches reuse pooled connections"""
+        if self._client is None:
+            headers = {}
+            if self.github_token:
+                headers['Authorization'] = f'token {self.github_token}'
+            self._client = httpx.AsyncClient(base_url=self.github_api_base, headers=headers, timeout=10)
+        return self._client
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def recommend_projects(
         self, 
         skills: List[str], 
         target_role: str, 
@@ -41,19 +57,19 @@ class ProjectRecommender:
         recommendations = []
         
         # Strategy 1: AI-generated custom project ideas
-        if self.openai_client:
-            ai_projects = self._generate_ai_project_ideas(skills, target_role, difficulty, count=3)
-            recommendations.extend(ai_projects)
-        
         # Strategy 2: GitHub trending repositories
-        github_projects = self._fetch_github_projects(target_role, difficulty, count=3)
-        recommendations.extend(github_projects)
+        # Both are network-bound, so run them concurrently
+        tasks = [self._fetch_github_projects(target_role, difficulty, count=3)]
+        if self.llm:
+            tasks.insert(0, self._generate_ai_project_ideas(skills, target_role, difficulty, count=3))
+        for projects in await asyncio.gather(*tasks):
+            recommendations.extend(projects)
         
         # Deduplicate and limit to requested count
         unique_projects = self._deduplicate_projects(recommendations)
         return unique_projects[:count]
     
-    def _generate_ai_project_ideas(
+    async def _generate_ai_project_ideas(
         self, 
         skills: List[str], 
         target_role: str, 
@@ -84,17 +100,12 @@ For each project, provide:
 
 Format as JSON array with keys: title, description, technologies, time_estimate, value_proposition"""
 
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a career advisor specializing in portfolio development."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = await self.llm.complete(
+                prompt,
+                system="You are a career advisor specializing in portfolio development.",
                 temperature=0.8
             )
             
-            content = response.choices[0].message.content
-            
             # Try to parse JSON from response
             import json
             import re
@@ -114,7 +125,7 @@ Format as JSON array with keys: title, description, technologies, time_estimate,
         # Fallback to curated project ideas
         return self._get_fallback_projects(target_role, difficulty, count)
     
-    def _fetch_github_projects(
+    async def _fetch_github_projects(
         self, 
         target_role: str, 
         difficulty: str,
@@ -125,22 +136,19 @@ Format as JSON array with keys: title, description, technologies, time_estimate,
             # Build search query based on role and difficulty
             search_terms = self._get_search_terms(target_role, difficulty)
             
-            headers = {}
-            if self.github_token:
-                headers['Authorization'] = f'token {self.github_token}'
-            
             projects = []
-            for term in search_terms[:2]:  # Search top 2 relevant terms
-                url = f"{self.github_api_base}/search/repositories"
-                params = {
+            client = self._get_client()
+            responses = await asyncio.gather(*[
+                client.get("/search/repositories", params={
                     'q': f'{term} {difficulty} tutorial OR project',
                     'sort': 'stars',
                     'order': 'desc',
                     'per_page': 3
-                }
-                
-                response = requests.get(url, params=params, headers=headers, timeout=10)
-                
+                })
+                for term in search_terms[:2]  # Search top 2 relevant terms
+            ])
+            
+            for response in responses:
                 if response.status_code == 200:
                     repos = response.json().get('items', [])
                     for repo in repos[:2]:  # Take top 2 from each search
@@ -291,11 +299,11 @@ Format as JSON array with keys: title, description, technologies, time_estimate,
 recommender = ProjectRecommender()
 
 
-def get_project_recommendations(
+async def get_project_recommendations(
     skills: List[str], 
     target_role: str, 
     difficulty: str = "beginner",
     count: int = 5
 ) -> List[Dict]:
     """Main function to get project recommendations"""
-    return recommender.recommend_projects(skills, target_role, difficulty, count)
+    return await recommender.recommend_projects(skills, target_role, difficulty, count)
@@ -0,0 +1,206 @@
+"""
+Bulk Resume Parsing
+Parses a cohort of resumes (multipart files and/or ZIP archives) in one
+request: duplicates are dropped by content hash, extraction and the
+regex/ontology parse run per file in the shared process pool, and LLM
+structuring runs under a per-batch concurrency limit.
+"""
+
+import asyncio
+import os
+import time
+import zipfile
+from typing import AsyncIterator, Dict, List, Tuple
+
+from config import get_settings
+from ai.llm_gateway import llm_gateway
+from ai.resume_parser import (
+    EXTRACT_GRACE, EXTRACT_TIMEOUT, MAX_PAGES, MAX_UPLOAD_BYTES, UPLOAD_CHUNK_BYTES,
+    ResumeTooLarge, SpooledUpload, extract_document, file_kind, spool_upload, structure_with_llm,
+)
+from utils.process_pool import get_process_pool, pool_size
+
+settings = get_settings()
+
+BATCH_MAX_FILES = settings.resume_batch_max_files
+BATCH_MAX_BYTES = settings.resume_batch_max_upload_mb * 1024 * 1024
+LLM_CONCURRENCY = settings.resume_batch_llm_concurrency
+
+
+def _failed(name: str, error: str) -> Dict:
+    return {"type": "result", "file": name, "status": "failed", "error": error}
+
+
+def _expand_zip(archive: SpooledUpload, budget: int) -> Tuple[List[SpooledUpload], List[Dict]]:
+    """Resumes inside a ZIP, each capped at the single-upload limit and all within budget bytes"""
+    members, rejected = [], []
+    try:
+        with archive.open() as stream, zipfile.ZipFile(stream) as zf:
+            for info in zf.infolist():
+                base = os.path.basename(info.filename)
+                if info.is_dir() or not base or base.startswith(".") or info.filename.startswith("__MACOSX/"):
+                    continue
+                name = f"{archive.filename}/{info.filename}"
+                try:
+                    file_kind(base)
+                except ValueError as e:
+                    rejected.append(_failed(name, str(e)))
+                    continue
+
+                # Sizes in the ZIP header can lie, so the limits are enforced while reading
+                member = SpooledUpload(name)
+                try:
+                    with zf.open(info) as src:
+                        while True:
+                            chunk = src.read(UPLOAD_CHUNK_BYTES)
+                            if not chunk:
+                                break
+                            if member.size + len(chunk) > MAX_UPLOAD_BYTES:
+                                raise ValueError(f"Resume is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+                            budget -= len(chunk)
+                            if budget < 0:
+                                raise ResumeTooLarge("Batch is larger than the upload limit")
+                            member.write(chunk)
+                    member.finish()
+                except ResumeTooLarge:
+                    member.close()
+                    raise
+                except (ValueError, RuntimeError, zipfile.BadZipFile) as e:
+                    member.close()
+                    rejected.append(_failed(name, str(e)))
+                    continue
+                members.append(member)
+    except zipfile.BadZipFile:
+        for member in members:
+            member.close()
+        return [], [_failed(archive.filename, "Not a valid ZIP archive")]
+    except BaseException:
+        for member in members:
+            member.close()
+        raise
+    return members, rejected
+
+
+async def collect_uploads(uploads) -> Tuple[List[SpooledUpload], List[Dict]]:
+    """
+    Spool every upload (expanding ZIPs) and drop duplicate content.
+    Returns (unique resumes, result lines for files that were skipped).
+    Raises ResumeTooLarge when the batch as a whole is over its limits.
+    """
+    spools: List[SpooledUpload] = []
+    rejected: List[Dict] = []
+    seen: Dict[str, str] = {}  # sha256 -> first file with that content
+    total = 0
+    try:
+        for upload in uploads:
+            name = upload.filename or ""
+            if name.lower().endswith(".zip"):
+                archive = await spool_upload(upload, BATCH_MAX_BYTES)
+                try:
+                    members, skipped = await asyncio.to_thread(_expand_zip, archive, BATCH_MAX_BYTES - total)
+                finally:
+                    archive.close()
+                rejected.extend(skipped)
+            else:
+                try:
+                    file_kind(name)
+                    members = [await spool_upload(upload)]
+                except ValueError as e:
+                    rejected.append(_failed(name, str(e)))
+                    continue
+
+            for member in members:
+                total += member.size
+                if member.sha256 in seen:
+                    rejected.append({"type": "result", "file": member.filename, "status": "duplicate",
+                                     "duplicate_of": seen[member.sha256]})
+                    member.close()
+                    continue
+                seen[member.sha256] = member.filename
+                spools.append(member)
+            if total > BATCH_MAX_BYTES:
+                raise ResumeTooLarge(f"Batch is larger than {BATCH_MAX_BYTES // (1024 * 1024)} MB")
+            if len(spools) > BATCH_MAX_FILES:
+                raise ResumeTooLarge(f"Batch has more than {BATCH_MAX_FILES} resumes")
+    except BaseException:
+        for spool in spools:
+            spool.close()
+        raise
+    return spools, rejected
+
+
+def _hold_until_done(future: asyncio.Future, slots: asyncio.Semaphore):
+    """Keep a worker slot taken until the pool job really ends, not just until we stop waiting"""
+    def release(done: asyncio.Future):
+        slots.release()
+        if not done.cancelled():
+            done.exception()  # retrieved, so abandoned failures aren't logged as unhandled
+    future.add_done_callback(release)
+
+
+async def _parse_one(spool: SpooledUpload, extract_slots: asyncio.Semaphore,
+                     llm_slots: asyncio.Semaphore) -> Dict:
+    line = {"type": "result", "file": spool.filename, "sha256": spool.sha256}
+    loop = asyncio.get_running_loop()
+    try:
+        # Submitted only while a worker is free, so the deadline measures extraction, not queueing.
+        # The worker itself stops between pages at the deadline; the wait adds a little grace.
+        await extract_slots.acquire()
+        try:
+            future = loop.run_in_executor(get_process_pool(), extract_document, spool.source(),
+                                          file_kind(spool.filename), MAX_PAGES, time.time() + EXTRACT_TIMEOUT)
+        except BaseException:
+            extract_slots.release()
+            raise
+        _hold_until_done(future, extract_slots)
+        document = await asyncio.wait_for(asyncio.shield(future), EXTRACT_TIMEOUT + EXTRACT_GRACE)
+        if not document["text"].strip():
+            return {**line, "status": "failed", "error": "No text found (scanned resume?)"}
+
+        parsed, source = document["fallback"], "fallback"
+        if llm_gateway.available:
+            async with llm_slots:
+                structured = await structure_with_llm(document["text"])
+            if structured is not None:
+                parsed, source = structured, "llm"
+        return {
+            **line,
+            "status": "parsed",
+            "source": source,
+            "pages": document["pages"],
+            "truncated": document["truncated"],
+            "parsed": parsed,
+        }
+    except asyncio.TimeoutError:
+        return {**line, "status": "failed", "error": "Timed out extracting text"}
+    except Exception as e:
+        return {**line, "status": "failed", "error": str(e) or type(e).__name__}
+
+
+async def parse_batch(spools: List[SpooledUpload], rejected: List[Dict]) -> AsyncIterator[Dict]:
+    """Result lines as each resume finishes, then a summary line. Closes the spools."""
+    started = time.perf_counter()
+    counts = {"parsed": 0, "failed": 0, "duplicate": 0}
+    extract_slots = asyncio.Semaphore(pool_size())
+    llm_slots = asyncio.Semaphore(LLM_CONCURRENCY)
+    tasks = [asyncio.ensure_future(_parse_one(spool, extract_slots, llm_slots)) for spool in spools]
+    try:
+        for line in rejected:
+            counts[line["status"]] += 1
+            yield line
+        for finished in asyncio.as_completed(tasks):
+            line = await finished
+            counts[line["status"]] += 1
+            yield line
+    finally:
+        # Client gone or batch done: stop pending work and remove temp files
+        for task in tasks:
+            task.cancel()
+        for spool in spools:
+            spool.close()
+    yield {
+        "type": "summary",
+        "files": len(spools) + len(rejected),
+        **counts,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
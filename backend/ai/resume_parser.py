@@ -1,19 +1,156 @@
 """
 Resume Parser
-Extracts structured data from uploaded PDF/DOCX resumes using NLP + GPT
+Extracts structured data from uploaded PDF/DOCX resumes using NLP + GPT.
+Uploads are spooled to disk past a small threshold, long PDFs are split
+across a process pool page-range by page-range, and only the relevant
+sections of long resumes are sent to the LLM.
 """
 
+import asyncio
+import hashlib
 import io
-from typing import Dict, Optional
+import os
+import tempfile
+import time
+from typing import BinaryIO, Dict, List, Optional
 from PyPDF2 import PdfReader
 from docx import Document as DocxDocument
-from openai import OpenAI
 from config import get_settings
+from ai.llm_gateway import llm_gateway
+from ai.skill_ontology import skill_ontology
+from utils.process_pool import get_process_pool, pool_size
 import json
 import re
 
 settings = get_settings()
 
+MAX_UPLOAD_BYTES = settings.resume_max_upload_mb * 1024 * 1024
+MAX_PAGES = settings.resume_max_pages
+EXTRACT_TIMEOUT = settings.resume_extract_timeout_seconds
+LLM_MAX_CHARS = settings.resume_llm_max_chars
+
+SPOOL_MEMORY_BYTES = 1024 * 1024  # larger uploads go to a temp file
+UPLOAD_CHUNK_BYTES = 64 * 1024
+PARALLEL_MIN_PAGES = 8  # shorter PDFs extract faster on one thread than across processes
+PAGES_PER_TASK = 4
+EXTRACT_GRACE = 2.0  # workers stop at the deadline; allow one last page and the pool round trip
+
+# Heading text (lowercase, letters only) -> section
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "about me",
+                "about", "objective", "career objective"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships", "internship experience",
+                   "relevant experience"],
+    "education": ["education", "academic background", "academics", "education and training",
+                  "educational qualifications", "qualifications"],
+    "projects": ["projects", "personal projects", "academic projects", "selected projects", "key projects"],
+    "skills": ["skills", "technical skills", "core competencies", "technologies", "tools",
+               "skills and tools", "tech stack", "key skills"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "courses"],
+    "other": ["awards", "achievements", "honors", "publications", "volunteering", "volunteer experience",
+              "languages", "interests", "hobbies", "references", "activities", "leadership",
+              "extracurricular activities"],
+}
+_HEADING_INDEX = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Sections worth sending to the LLM, in prompt order ("header" is the text before any heading)
+LLM_SECTIONS = ("header", "summary", "experience", "education", "projects", "skills", "certifications")
+
+
+class ResumeTooLarge(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class SpooledUpload:
+    """Upload bytes kept in memory up to a threshold, then written to a temp file"""
+
+    def __init__(self, filename: str, max_memory: int = SPOOL_MEMORY_BYTES):
+        self.filename = filename
+        self.size = 0
+        self.path: Optional[str] = None  # set once the upload is on disk
+        self._max_memory = max_memory
+        self._buffer: Optional[io.BytesIO] = io.BytesIO()
+        self._file = None
+        self._digest = hashlib.sha256()
+
+    def write(self, chunk: bytes):
+        if self._file is None and self.size + len(chunk) > self._max_memory:
+            suffix = os.path.splitext(self.filename)[1]
+            self._file = tempfile.NamedTemporaryFile(prefix="resume_", suffix=suffix, delete=False)
+            self.path = self._file.name
+            self._file.write(self._buffer.getvalue())
+            self._buffer = None
+        (self._file or self._buffer).write(chunk)
+        self._digest.update(chunk)
+        self.size += len(chunk)
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def finish(self):
+        if self._file is not None:
+            self._file.close()
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb") if self.path else io.BytesIO(self._buffer.getvalue())
+
+    def source(self):
+        """Path, or the bytes of an in-memory upload; picklable for the process pool"""
+        return self.path or self._buffer.getvalue()
+
+    def close(self):
+        self.finish()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._buffer = None
+
+    @classmethod
+    def from_bytes(cls, filename: str, data: bytes) -> "SpooledUpload":
+        spool = cls(filename)
+        spool.write(data)
+        spool.finish()
+        return spool
+
+
+async def spool_upload(upload, max_bytes: int = MAX_UPLOAD_BYTES) -> SpooledUpload:
+    """
+    Copy an UploadFile in fixed-size chunks, rejecting it once it passes max_bytes.
+    The copy is deliberate: Starlette spills to an anonymous TemporaryFile that
+    pool workers can't reopen by path, and the copy hashes the content for
+    batch dedup in the same pass. The request body limit bounds its size.
+    """
+    spool = SpooledUpload(upload.filename or "")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            if spool.size + len(chunk) > max_bytes:
+                raise ResumeTooLarge(f"Resume is larger than {max_bytes // (1024 * 1024)} MB")
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.finish()
+    return spool
+
+
+def file_kind(filename: str) -> str:
+    lower = (filename or "").lower()
+    if lower.endswith(".pdf"):
+        return "pdf"
+    if lower.endswith(".docx"):
+        return "docx"
+    if lower.endswith(".doc"):
+        # Legacy binary Word files aren't zip packages; python-docx can't open them
+        raise ValueError(f"Legacy .doc files are not supported: {filename}. Please save it as DOCX or PDF.")
+    raise ValueError(f"Unsupported file type: {filename}. Please upload PDF or DOCX.")
+
 
 def extract_text_from_pdf(file_bytes: bytes) -> str:
     """Extract text content from a PDF file"""
@@ -28,28 +165,189 @@ def extract_text_from_pdf(file_bytes: bytes) -> str:
 
 def extract_text_from_docx(file_bytes: bytes) -> str:
     """Extract text content from a DOCX file"""
-    doc = DocxDocument(io.BytesIO(file_bytes))
-    return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+    return _docx_text(io.BytesIO(file_bytes))
 
 
 def extract_text(file_bytes: bytes, filename: str) -> str:
     """Extract text from either PDF or DOCX"""
-    lower = filename.lower()
-    if lower.endswith(".pdf"):
+    if file_kind(filename) == "pdf":
         return extract_text_from_pdf(file_bytes)
-    elif lower.endswith(".docx") or lower.endswith(".doc"):
-        return extract_text_from_docx(file_bytes)
+    return extract_text_from_docx(file_bytes)
+
+
+def _docx_text(source) -> str:
+    doc = DocxDocument(source)
+    return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+
+
+def _pdf_page_count(source) -> int:
+    return len(PdfReader(source).pages)
+
+
+def _extract_pdf_pages(source, start: int, stop: int, deadline: Optional[float] = None) -> List[str]:
+    """
+    Text of pages [start, stop), stopping early once time.time() passes deadline;
+    process-pool entry point (must be module level to pickle). source is a path,
+    the file's bytes, or an open stream.
+    """
+    reader = PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+    texts = []
+    for i in range(start, stop):
+        if deadline is not None and time.time() > deadline:
+            break
+        texts.append(reader.pages[i].extract_text() or "")
+    return texts
+
+
+def extract_document(source, kind: str, max_pages: int = MAX_PAGES, deadline: Optional[float] = None) -> Dict:
+    """
+    Whole-document text plus the regex/ontology parse in one call; the
+    process-pool entry point for batches, where parallelism is per file.
+    PDFs stop between pages once time.time() passes deadline, so a slow file
+    frees its worker with the pages read so far.
+    """
+    stream = open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+    with stream:
+        if kind == "pdf":
+            reader = PdfReader(stream)
+            page_count = len(reader.pages)
+            texts = _extract_pdf_pages(stream, 0, min(page_count, max_pages), deadline)
+            pages = len(texts)
+            if page_count and not pages:
+                raise TimeoutError("Timed out extracting text")
+            text = "\n".join(t for t in texts if t)
+        else:
+            text = _docx_text(stream)
+            page_count = pages = None
+    return {
+        "text": text,
+        "pages": page_count,
+        "pages_extracted": pages,
+        "truncated": pages is not None and pages < page_count,
+        "fallback": _fallback_parse(text),
+    }
+
+
+async def _extract_pdf(spool: SpooledUpload) -> Dict:
+    loop = asyncio.get_running_loop()
+    with spool.open() as stream:
+        try:
+            page_count = await asyncio.to_thread(_pdf_page_count, stream)
+        except Exception as e:
+            raise ValueError(f"Could not read PDF: {e}")
+    pages = min(page_count, MAX_PAGES)
+
+    deadline = time.time() + EXTRACT_TIMEOUT
+    if pages >= PARALLEL_MIN_PAGES and pool_size() >= 2:
+        # Spilled uploads are reopened from disk by each worker; smaller ones (most
+        # text resumes, a few hundred KB) are sent as bytes
+        pool = get_process_pool()
+        source = spool.source()
+        futures = [
+            loop.run_in_executor(pool, _extract_pdf_pages, source, start,
+                                 min(start + PAGES_PER_TASK, pages), deadline)
+            for start in range(0, pages, PAGES_PER_TASK)
+        ]
+        done, pending = await asyncio.wait(futures, timeout=EXTRACT_TIMEOUT + EXTRACT_GRACE)
     else:
-        raise ValueError(f"Unsupported file type: {filename}. Please upload PDF or DOCX.")
+        with spool.open() as stream:
+            futures = [loop.run_in_executor(None, _extract_pdf_pages, stream, 0, pages, deadline)]
+            done, pending = await asyncio.wait(futures, timeout=EXTRACT_TIMEOUT + EXTRACT_GRACE)
+    for future in pending:
+        future.cancel()
+
+    texts, extracted = [], 0
+    for future in futures:
+        if future in done and future.exception() is None:
+            page_texts = future.result()
+            extracted += len(page_texts)
+            texts.extend(text for text in page_texts if text)
+    if not extracted and pages:
+        timed_out = pending or time.time() > deadline
+        raise ValueError("Timed out extracting text from PDF" if timed_out else "Could not extract text from PDF")
+    return {
+        "text": "\n".join(texts),
+        "pages": page_count,
+        "pages_extracted": extracted,
+        "truncated": extracted < page_count,
+    }
+
+
+async def extract_resume_text(spool: SpooledUpload) -> Dict:
+    """{"text", "pages", "pages_extracted", "truncated"} within the page and time caps"""
+    if file_kind(spool.filename) == "pdf":
+        return await _extract_pdf(spool)
+    with spool.open() as stream:
+        try:
+            text = await asyncio.wait_for(asyncio.to_thread(_docx_text, stream), EXTRACT_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise ValueError("Timed out extracting text from DOCX")
+    return {"text": text, "pages": None, "pages_extracted": None, "truncated": False}
+
 
+def _heading_section(line: str) -> Optional[str]:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 40:
+        return None
+    key = re.sub(r"[^a-z ]", " ", stripped.lower().replace("&", " and "))
+    return _HEADING_INDEX.get(" ".join(key.split()))
 
-def parse_resume_with_ai(text: str) -> Dict:
+
+def split_sections(text: str) -> Dict[str, str]:
+    """Section name -> text, using common resume headings; text before the first heading is "header" """
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+    for line in text.splitlines():
+        section = _heading_section(line)
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+
+def select_for_llm(text: str, sections: Dict[str, str], max_chars: int = LLM_MAX_CHARS) -> str:
+    """
+    Relevant sections within max_chars. Short sections are kept whole and
+    their unused share goes to the longer ones.
+    """
+    relevant = {name: sections[name] for name in LLM_SECTIONS if name in sections}
+    if len(relevant) <= 1:
+        return text[:max_chars]  # no recognizable headings
+
+    allotted = {}
+    remaining = max_chars - sum(len(f"## {name.upper()}\n\n\n") for name in relevant)
+    for index, name in enumerate(sorted(relevant, key=lambda n: len(relevant[n]))):
+        share = remaining // (len(relevant) - index)
+        allotted[name] = relevant[name][:share]
+        remaining -= len(allotted[name])
+    return "\n\n".join(f"## {name.upper()}\n{allotted[name]}" for name in LLM_SECTIONS if name in allotted)
+
+
+def _merge_skills(parsed: Dict, text: str) -> Dict:
+    """Add ontology skills found anywhere in the text, so long resumes don't lose them"""
+    skills = [s for s in parsed.get("skills") or [] if isinstance(s, str)]
+    seen = {s.lower() for s in skills}
+    for name in skill_ontology.extract_names(text):
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            skills.append(name)
+    parsed["skills"] = skills
+    return parsed
+
+
+async def parse_resume_with_ai(text: str, sections: Optional[Dict[str, str]] = None) -> Dict:
     """Use GPT to extract structured data from resume text"""
-    if not settings.openai_api_key:
+    if not llm_gateway.available:
         return _fallback_parse(text)
+    parsed = await structure_with_llm(text, sections)
+    return parsed if parsed is not None else _fallback_parse(text)
 
-    client = OpenAI(api_key=settings.openai_api_key)
 
+async def structure_with_llm(text: str, sections: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+    """The LLM's structured parse, or None if it fails"""
+    resume_text = select_for_llm(text, sections if sections is not None else split_sections(text))
     prompt = f"""Extract structured information from this resume text. Return ONLY valid JSON with these fields:
 
 {{
@@ -73,26 +371,44 @@ def parse_resume_with_ai(text: str) -> Dict:
 }}
 
 Resume text:
-{text[:4000]}"""
+{resume_text}"""
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a resume parser. Return ONLY valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.1
+        content = await llm_gateway.complete(
+            prompt,
+            system="You are a resume parser. Return ONLY valid JSON.",
+            temperature=0.1,
+            response_format={"type": "json_object"},
         )
-        content = response.choices[0].message.content
         # Extract JSON from possible markdown code blocks
         json_match = re.search(r'\{.*\}', content, re.DOTALL)
-        if json_match:
-            return json.loads(json_match.group())
-        return json.loads(content)
+        parsed = json.loads(json_match.group()) if json_match else json.loads(content)
+        return _merge_skills(parsed, text)
     except Exception as e:
         print(f"AI resume parsing failed: {e}")
-        return _fallback_parse(text)
+        return None
+
+
+async def ingest_resume(spool: SpooledUpload) -> Dict:
+    """Extract, section and parse a spooled resume, with per-stage timings"""
+    started = time.perf_counter()
+    extracted = await extract_resume_text(spool)
+    extract_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    sections = split_sections(extracted["text"])
+    stage = time.perf_counter()
+    parsed = await parse_resume_with_ai(extracted["text"], sections)
+    return {
+        "parsed": parsed,
+        "pages": extracted["pages"],
+        "pages_extracted": extracted["pages_extracted"],
+        "truncated": extracted["truncated"],
+        "sections": list(sections),
+        "timings_ms": {
+            "extract": extract_ms,
+            "parse": round((time.perf_counter() - stage) * 1000, 1),
+        },
+    }
 
 
 def _fallback_parse(text: str) -> Dict:
@@ -102,14 +418,8 @@ def _fallback_parse(text: str) -> Dict:
     linkedin_match = re.search(r'linkedin\.com/in/[\w-]+', text)
     github_match = re.search(r'github\.com/[\w-]+', text)
 
-    # Simple skill extraction by keyword matching
-    common_skills = [
-        "Python", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "Java",
-        "C++", "Docker", "Kubernetes", "AWS", "Git", "HTML", "CSS", "Machine Learning",
-        "Data Analysis", "TensorFlow", "PyTorch", "MongoDB", "PostgreSQL", "REST API",
-        "Agile", "Scrum", "Figma", "Adobe", "Communication", "Leadership", "Teamwork"
-    ]
-    found_skills = [s for s in common_skills if s.lower() in text.lower()]
+    # Single-pass skill extraction against the shared ontology
+    found_skills = skill_ontology.extract_names(text)
 
     return {
         "full_name": None,
@@ -3,18 +3,57 @@ AI-powered Learning Roadmap Generator
 Generates personalized learning paths with milestones, resources, and timelines
 """
 
-import os
-from typing import List, Dict, Any, Optional
+import asyncio
+import json
+import re
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from openai import OpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from config import get_settings
+from ai.llm_gateway import llm_gateway
+from ai.roadmap_templates import DOMAIN_TEMPLATE_GOALS, RoadmapTemplateStore, has_template
 
-_settings = get_settings()
+settings = get_settings()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=_settings.openai_api_key) if _settings.openai_api_key else None
+# Roadmap structures depend only on (goal, level, learning style), so cache them
+STRUCTURE_CACHE_TTL = 7 * 24 * 3600
+
+# Callers wait at most this long for the LLM before getting the fallback roadmap
+ROADMAP_LATENCY_BUDGET = settings.roadmap_latency_budget_seconds
+ROADMAP_LLM_TIMEOUT = settings.roadmap_llm_timeout_seconds
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+# Structured output: the model must return exactly this shape
+STRUCTURE_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "roadmap_structure",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["phases"],
+            "properties": {
+                "phases": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "required": ["title", "duration_weeks", "skills", "outcomes", "prerequisites"],
+                        "properties": {
+                            "title": {"type": "string"},
+                            "duration_weeks": {"type": "integer"},
+                            "skills": _STRING_LIST,
+                            "outcomes": _STRING_LIST,
+                            "prerequisites": _STRING_LIST,
+                        },
+                    },
+                },
+            },
+        },
+    },
+}
 
 # Skill difficulty mapping (learning time in weeks)
 SKILL_LEARNING_TIME = {
@@ -116,22 +155,33 @@ CAREER_DOMAINS = {
 }
 
 
+def _parse_structure(content: str) -> Dict[str, Any]:
+    """LLM structure JSON; raises ValueError when it has no phases"""
+    structure = json.loads(content)
+    if not isinstance(structure, dict) or not structure.get("phases"):
+        raise ValueError("structure has no phases")
+    return structure
+
+
+# Template goals ("UI/UX Designer") keyed like CAREER_DOMAINS ("ui_ux_designer")
+def _goal_key(career_goal: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", career_goal.lower()).strip("_")
+
+
+TEMPLATE_GOAL_DOMAINS = {_goal_key(goal): domain for domain, goal in DOMAIN_TEMPLATE_GOALS.items()}
+
+
 class RoadmapGenerator:
     """Generate personalized learning roadmaps with AI"""
     
     def __init__(self):
-        self.llm = None
-        try:
-            if _settings.openai_api_key:
-                self.llm = ChatOpenAI(
-                    model="gpt-4o-mini",
-                    temperature=0.7,
-                    api_key=_settings.openai_api_key
-                )
-        except Exception as e:
-            print(f"Warning: Could not initialize ChatOpenAI: {e}")
+        self.llm = llm_gateway if llm_gateway.available else None
+        self.templates = RoadmapTemplateStore(self._generate_structure)
+        self._background: Set[asyncio.Task] = set()
+        self._stage_totals: Dict[str, float] = {}
+        self._counts = {"generated": 0, "llm": 0, "template": 0, "fallback": 0, "budget_exceeded": 0, "llm_late": 0}
         
-    def generate_roadmap(
+    async def generate_roadmap(
         self,
         career_goal: str,
         current_level: str = "beginner",
@@ -139,7 +189,7 @@ class RoadmapGenerator:
         preferences: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
-        Generate a complete learning roadmap
+        Generate a complete learning roadmap, waiting as long as the LLM takes
         
         Args:
             career_goal: Target career or skill (e.g., "Data Scientist", "Python Developer")
@@ -150,24 +200,118 @@ class RoadmapGenerator:
         Returns:
             Complete roadmap with phases, milestones, resources, timeline
         """
+        roadmap, _ = await self.generate_roadmap_within(
+            career_goal, current_level, time_commitment, preferences, budget_seconds=None
+        )
+        return roadmap
+    
+    async def generate_roadmap_within(
+        self,
+        career_goal: str,
+        current_level: str = "beginner",
+        time_commitment: str = "moderate",
+        preferences: Optional[Dict[str, Any]] = None,
+        budget_seconds: Optional[float] = ROADMAP_LATENCY_BUDGET,
+    ) -> Tuple[Dict[str, Any], Optional[asyncio.Task]]:
+        """
+        Generate a roadmap within a latency budget.
+        If the LLM structure isn't ready in time, returns the deterministic
+        fallback roadmap plus a task that resolves to the LLM roadmap (or None).
+        """
         preferences = preferences or {}
-        
-        # Determine domain and timeline
+        started = time.perf_counter()
+        
+        # Common goals reuse a precompiled structure; only the per-user transforms run
+        domain = self._template_domain(career_goal)
+        if has_template(domain, current_level):
+            structure = self.templates.cached(domain, current_level)
+            if structure is not None:
+                timings = {"structure": _ms(started)}
+                return self._assemble(career_goal, current_level, time_commitment, preferences,
+                                      structure, "template", timings, started), None
+        
+        if not self.llm:
+            structure = self._get_fallback_structure(career_goal, current_level)
+            timings = {"structure": _ms(started)}
+            return self._assemble(career_goal, current_level, time_commitment, preferences,
+                                  structure, "fallback", timings, started), None
+        
+        structure_task = asyncio.ensure_future(self._structure_for(career_goal, domain, current_level, preferences))
+        try:
+            structure = await asyncio.wait_for(asyncio.shield(structure_task), budget_seconds)
+        except asyncio.TimeoutError:
+            self._counts["budget_exceeded"] += 1
+            structure = self._get_fallback_structure(career_goal, current_level)
+            timings = {"structure": _ms(started)}
+            roadmap = self._assemble(career_goal, current_level, time_commitment, preferences,
+                                     structure, "fallback_budget", timings, started)
+            roadmap["metadata"]["upgrade_pending"] = True
+            upgrade = self.run_in_background(self._finish_upgrade(
+                structure_task, career_goal, current_level, time_commitment, preferences, started
+            ))
+            return roadmap, upgrade
+        
+        source = "llm" if structure is not None else "fallback"
+        if structure is None:
+            structure = self._get_fallback_structure(career_goal, current_level)
+        timings = {"structure": _ms(started)}
+        return self._assemble(career_goal, current_level, time_commitment, preferences,
+                              structure, source, timings, started), None
+    
+    async def _structure_for(
+        self,
+        career_goal: str,
+        domain: Optional[str],
+        current_level: str,
+        preferences: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """Template structure for exact template goals (compiled on first use), otherwise a per-goal one"""
+        if has_template(domain, current_level):
+            return await self.templates.get_structure(domain, current_level)
+        return await self._generate_structure(career_goal, current_level, preferences)
+    
+    async def _finish_upgrade(
+        self,
+        structure_task: asyncio.Future,
+        career_goal: str,
+        current_level: str,
+        time_commitment: str,
+        preferences: Dict[str, Any],
+        started: float,
+    ) -> Optional[Dict[str, Any]]:
+        """The LLM roadmap once the structure call that missed the budget completes"""
+        structure = await structure_task
+        if structure is None:
+            return None
+        timings = {"structure": _ms(started)}
+        return self._assemble(career_goal, current_level, time_commitment, preferences,
+                              structure, "llm_upgrade", timings, started)
+    
+    def _assemble(
+        self,
+        career_goal: str,
+        current_level: str,
+        time_commitment: str,
+        preferences: Dict[str, Any],
+        structure: Dict[str, Any],
+        source: str,
+        timings: Dict[str, float],
+        started: float,
+    ) -> Dict[str, Any]:
+        """Phases, milestones and resources around a structure, with stage timings"""
+        stage = time.perf_counter()
         domain = self._get_domain(career_goal)
         total_weeks = self._calculate_timeline(domain, current_level, time_commitment)
-        
-        # Generate AI-powered roadmap structure
-        roadmap_structure = self._generate_structure(career_goal, current_level, preferences)
-        
-        # Generate detailed phases with milestones
         phases = self._generate_phases(
             career_goal,
             current_level,
-            roadmap_structure,
+            structure,
             total_weeks
         )
+        timings["phases"] = _ms(stage)
         
         # Add resources to each phase
+        stage = time.perf_counter()
         for phase in phases:
             phase["resources"] = self._generate_resources(
                 phase["title"],
@@ -176,6 +320,9 @@ class RoadmapGenerator:
                 preferences.get("budget", "free"),
                 domain
             )
+        timings["resources"] = _ms(stage)
+        timings["total"] = _ms(started)
+        self._record(source, timings)
         
         return {
             "career_goal": career_goal,
@@ -188,10 +335,59 @@ class RoadmapGenerator:
                 "generated_at": datetime.now().isoformat(),
                 "domain": domain,
                 "total_phases": len(phases),
-                "total_skills": sum(len(p["skills"]) for p in phases)
+                "total_skills": sum(len(p["skills"]) for p in phases),
+                "structure_source": source,  # template, llm, llm_upgrade, fallback, fallback_budget
+                "timings_ms": timings,
             }
         }
     
+    def _record(self, source: str, timings: Dict[str, float]):
+        self._counts["generated"] += 1
+        if source == "llm_upgrade":
+            self._counts["llm_late"] += 1
+        elif source in self._counts:
+            self._counts[source] += 1
+        for name, value in timings.items():
+            self._stage_totals[name] = self._stage_totals.get(name, 0.0) + value
+    
+    def stats(self) -> Dict[str, Any]:
+        generated = self._counts["generated"]
+        return {
+            **self._counts,
+            "budget_seconds": ROADMAP_LATENCY_BUDGET,
+            "templates": self.templates.stats(),
+            "pending_upgrades": len(self._background),
+            "avg_ms": {
+                name: round(total / generated, 1) for name, total in self._stage_totals.items()
+            } if generated else {},
+        }
+    
+    def template_catalog(self) -> List[Dict[str, Any]]:
+        """Featured templates, with durations at a moderate time commitment"""
+        return self.templates.featured(lambda domain, level: self._calculate_timeline(domain, level, "moderate"))
+    
+    def run_in_background(self, coro) -> asyncio.Task:
+        """Keep a reference to fire-and-forget work so it isn't garbage collected"""
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+    
+    async def aclose(self):
+        """Cancel upgrades still waiting on the LLM"""
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+    
+    def _template_domain(self, career_goal: str) -> Optional[str]:
+        """
+        Domain whose shared template serves this goal, only on an exact match with a
+        CAREER_DOMAINS key or a template goal. Anything else gets its own structure,
+        since the fuzzy _get_domain would hand e.g. "Guitar Instructor" a design roadmap.
+        """
+        goal = _goal_key(career_goal)
+        return CAREER_DOMAINS.get(goal) or TEMPLATE_GOAL_DOMAINS.get(goal)
+    
     def _get_domain(self, career_goal: str) -> str:
         """Map career goal to domain category"""
         career_lower = career_goal.lower().replace(" ", "_")
@@ -236,13 +432,13 @@ class RoadmapGenerator:
         completion = datetime.now() + timedelta(weeks=weeks)
         return completion.strftime("%B %Y")
     
-    def _generate_structure(
+    async def _generate_structure(
         self,
         career_goal: str,
         current_level: str,
         preferences: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Use AI to generate roadmap structure"""
+    ) -> Optional[Dict[str, Any]]:
+        """Use AI to generate roadmap structure; None if the call or its output fails"""
         prompt = f"""Generate a learning roadmap structure for someone who wants to become a {career_goal}.
 
 Current Level: {current_level}
@@ -253,46 +449,23 @@ Create a structured learning path with 4-6 phases. Each phase should have:
 2. Core skills to learn in that phase
 3. Key outcomes/competencies
 4. Prerequisites (if any)
-
-Return ONLY a JSON object with this structure:
-{{
-  "phases": [
-    {{
-      "title": "Foundation Phase",
-      "duration_weeks": 4,
-      "skills": ["skill1", "skill2"],
-      "outcomes": ["outcome1", "outcome2"],
-      "prerequisites": []
-    }}
-  ]
-}}
 """
-        
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert learning path designer. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
+            content = await self.llm.complete(
+                prompt,
+                system="You are an expert learning path designer.",
                 temperature=0.7,
-                max_tokens=1500
+                max_tokens=1500,
+                timeout=ROADMAP_LLM_TIMEOUT,
+                cache_ttl=STRUCTURE_CACHE_TTL,
+                response_format=STRUCTURE_RESPONSE_FORMAT,
+                validate=_parse_structure,
             )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON from markdown code blocks if present
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            import json
-            return json.loads(content)
+            return _parse_structure(content)
             
         except Exception as e:
             print(f"Error generating structure: {e}")
-            return self._get_fallback_structure(career_goal, current_level)
+            return None
     
     def _get_fallback_structure(self, career_goal: str, level: str) -> Dict[str, Any]:
         """Fallback structure if AI generation fails"""
@@ -582,5 +755,9 @@ Return ONLY a JSON object with this structure:
         }
 
 
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
 # Global instance
 roadmap_generator = RoadmapGenerator()
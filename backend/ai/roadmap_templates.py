@@ -0,0 +1,141 @@
+"""
+Roadmap Template Store
+One canonical LLM roadmap structure per (career domain, level), compiled
+offline (build_roadmap_templates.py) or on first use and kept in the
+roadmap_templates table. Per-user timeline, milestones and resources are
+applied to it at request time, so common goals skip the LLM entirely.
+"""
+
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from config import AsyncSessionLocal
+from models.database import RoadmapTemplate
+from utils.single_flight import SingleFlight
+
+TEMPLATE_LEVELS = ("beginner", "intermediate", "advanced")
+
+# Goal the canonical structure for each domain is generated for
+DOMAIN_TEMPLATE_GOALS = {
+    "programming": "Software Engineer",
+    "data_science": "Data Scientist",
+    "design": "UI/UX Designer",
+    "business": "Product Manager",
+    "marketing": "Digital Marketer",
+    "cloud": "Cloud Solutions Architect",
+    "devops": "DevOps Engineer",
+    "ai_ml": "Machine Learning Engineer",
+    "web_dev": "Full Stack Web Developer",
+    "mobile_dev": "Mobile App Developer",
+    "cybersecurity": "Cybersecurity Analyst",
+    "blockchain": "Blockchain Developer",
+    "game_dev": "Game Developer",
+}
+
+# Templates featured on /api/roadmap/templates
+FEATURED_TEMPLATES = [
+    {"id": "fullstack_web", "domain": "web_dev", "level": "beginner", "popular": True,
+     "title": "Full Stack Web Developer", "description": "Master frontend and backend development"},
+    {"id": "data_scientist", "domain": "data_science", "level": "beginner", "popular": True,
+     "title": "Data Scientist", "description": "Learn data analysis, ML, and statistics"},
+    {"id": "ml_engineer", "domain": "ai_ml", "level": "intermediate", "popular": True,
+     "title": "Machine Learning Engineer", "description": "Build and deploy ML models"},
+    {"id": "cloud_architect", "domain": "cloud", "level": "intermediate", "popular": False,
+     "title": "Cloud Solutions Architect", "description": "Design and implement cloud infrastructure"},
+    {"id": "devops_engineer", "domain": "devops", "level": "intermediate", "popular": False,
+     "title": "DevOps Engineer", "description": "CI/CD, automation, and infrastructure"},
+    {"id": "mobile_dev", "domain": "mobile_dev", "level": "beginner", "popular": False,
+     "title": "Mobile App Developer", "description": "Build iOS and Android applications"},
+]
+
+StructureBuilder = Callable[[str, str, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def template_key(domain: str, level: str) -> str:
+    return f"{domain}:{level}"
+
+
+def has_template(domain: Optional[str], level: str) -> bool:
+    """Goals outside the known domains keep their own per-goal structure"""
+    return domain in DOMAIN_TEMPLATE_GOALS and level in TEMPLATE_LEVELS
+
+
+class RoadmapTemplateStore:
+    """Memory → roadmap_templates table → LLM, with one compile per key at a time"""
+
+    def __init__(self, build_structure: StructureBuilder):
+        self._build_structure = build_structure
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._flights = SingleFlight()
+        self._hits = 0
+        self._misses = 0
+
+    def cached(self, domain: str, level: str) -> Optional[Dict[str, Any]]:
+        structure = self._templates.get(template_key(domain, level))
+        if structure is not None:
+            self._hits += 1
+        return structure
+
+    async def load(self) -> int:
+        """Pull every compiled template into memory; call once at startup"""
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(select(RoadmapTemplate))).scalars().all()
+        for row in rows:
+            self._templates[row.key] = row.structure
+        return len(rows)
+
+    async def get_structure(self, domain: str, level: str) -> Optional[Dict[str, Any]]:
+        """The canonical structure, compiling it on first use; None if the LLM can't provide one"""
+        key = template_key(domain, level)
+        structure = self._templates.get(key)
+        if structure is not None:
+            return structure
+        self._misses += 1
+        return await self._flights.do(key, lambda: self._load_or_compile(domain, level))
+
+    async def compile(self, domain: str, level: str) -> Optional[Dict[str, Any]]:
+        """Regenerate and store one template regardless of what's cached"""
+        structure = await self._build_structure(DOMAIN_TEMPLATE_GOALS[domain], level, {})
+        if structure is None:
+            return None
+        async with AsyncSessionLocal() as db:
+            row = await db.get(RoadmapTemplate, template_key(domain, level))
+            if row is None:
+                row = RoadmapTemplate(key=template_key(domain, level), domain=domain, level=level)
+                db.add(row)
+            row.career_goal = DOMAIN_TEMPLATE_GOALS[domain]
+            row.structure = structure
+            row.updated_at = datetime.utcnow()
+            await db.commit()
+        self._templates[template_key(domain, level)] = structure
+        return structure
+
+    async def _load_or_compile(self, domain: str, level: str) -> Optional[Dict[str, Any]]:
+        # Another process may have compiled it already
+        async with AsyncSessionLocal() as db:
+            row = await db.get(RoadmapTemplate, template_key(domain, level))
+        if row is not None:
+            self._templates[row.key] = row.structure
+            return row.structure
+        return await self.compile(domain, level)
+
+    def featured(self, duration_weeks: Callable[[str, str], int]) -> List[Dict[str, Any]]:
+        """Featured templates with their compiled phase titles, if any"""
+        templates = []
+        for entry in FEATURED_TEMPLATES:
+            structure = self._templates.get(template_key(entry["domain"], entry["level"]))
+            templates.append({
+                **entry,
+                "duration_weeks": duration_weeks(entry["domain"], entry["level"]),
+                "compiled": structure is not None,
+                "phases": [p.get("title") for p in structure["phases"]] if structure else [],
+            })
+        return templates
+
+    def all_keys(self) -> List[Tuple[str, str]]:
+        return [(domain, level) for domain in DOMAIN_TEMPLATE_GOALS for level in TEMPLATE_LEVELS]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"compiled": len(self._templates), "hits": self._hits, "misses": self._misses}
@@ -1,56 +1,74 @@
 from typing import List, Dict, Optional
 import numpy as np
 from models.schemas import SkillGapAnalysis
+from ai.embedding_index import EmbeddingIndex
+from ai import embedding_store
+from ai.skill_matcher import SkillMatcher
+from ai.career_catalog import CatalogSnapshot, career_catalog
+
+# Name of the precomputed skill-embedding artifact (see build_embeddings.py)
+SKILL_ARTIFACT = "skill_vocabulary"
 
 class SkillGapAnalyzer:
     def __init__(self):
-        self._embedder: Optional[any] = None
-        
-        # Mock data for demo (replace with ESCO/O*NET API calls)
-        self.role_skills = {
-            "Data Scientist": [
-                "Python", "Machine Learning", "Statistics", "SQL", "Data Visualization",
-                "Deep Learning", "Pandas", "NumPy", "Scikit-learn", "TensorFlow"
-            ],
-            "Software Engineer": [
-                "JavaScript", "Python", "Git", "REST APIs", "Database Design",
-                "React", "Node.js", "Docker", "Testing", "Agile"
-            ],
-            "Product Manager": [
-                "Product Strategy", "User Research", "Data Analysis", "Communication",
-                "Roadmap Planning", "Stakeholder Management", "Agile", "SQL", "A/B Testing"
-            ],
-            "UX Designer": [
-                "Figma", "User Research", "Prototyping", "Wireframing", "Design Systems",
-                "Usability Testing", "Adobe XD", "Sketch", "HTML/CSS", "Interaction Design"
-            ]
-        }
+        # Matcher and embedding index follow the catalog snapshot they were built from
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._skill_index: Optional[EmbeddingIndex] = None
+        self._skill_index_failed = False
+        self.matcher: Optional[SkillMatcher] = None
     
     @property
     def embedder(self):
-        """Lazy-load the sentence transformer model only when needed"""
-        if self._embedder is None:
-            try:
-                from sentence_transformers import SentenceTransformer
-                self._embedder = SentenceTransformer('all-MiniLM-L6-v2')
-            except Exception as e:
-                print(f"Warning: Could not load SentenceTransformer model: {e}")
-                print("Skill gap analysis will use basic string matching instead.")
-                self._embedder = False  # Mark as failed to avoid retrying
-        return self._embedder if self._embedder is not False else None
+        """Shared sentence transformer, loaded only when a query needs encoding"""
+        return embedding_store.get_encoder()
+    
+    @property
+    def role_skills(self) -> Dict[str, List[str]]:
+        """Role title -> required skills, from the career catalog"""
+        return career_catalog.snapshot.role_skills
+    
+    def skill_vocabulary(self) -> List[str]:
+        """Every distinct skill named by a role, in a stable order"""
+        return career_catalog.snapshot.skill_vocabulary
+    
+    def _sync_catalog(self, snapshot: CatalogSnapshot):
+        """Rebuild the matcher (and drop the embedding index) when the catalog changed"""
+        if snapshot is self._snapshot:
+            return
+        self._snapshot = snapshot
+        self._skill_index = None
+        self._skill_index_failed = False
+        self.matcher = SkillMatcher(
+            snapshot.skill_vocabulary,
+            index_provider=lambda: self.skill_index,
+            encoder_provider=lambda: self.embedder,
+        )
+    
+    @property
+    def skill_index(self) -> Optional[EmbeddingIndex]:
+        """Precomputed skill embeddings, memory-mapped from the build artifact"""
+        if self._skill_index is None and not self._skill_index_failed:
+            vocabulary = self._snapshot.skill_vocabulary if self._snapshot else self.skill_vocabulary()
+            self._skill_index = embedding_store.get_or_build_index(SKILL_ARTIFACT, vocabulary, vocabulary)
+            if self._skill_index is None:
+                print("Warning: Skill embeddings unavailable, skill gap analysis will use basic string matching.")
+                self._skill_index_failed = True
+        return self._skill_index
     
     def analyze_gap(self, user_skills: List[str], target_role: str) -> SkillGapAnalysis:
+        snapshot = career_catalog.snapshot
+        self._sync_catalog(snapshot)
+        
         # Get required skills for role
-        required_skills = self.role_skills.get(target_role, [])
+        required_skills = snapshot.role_skills.get(target_role, [])
         
-        # Normalize skill names (lowercase, strip)
-        user_skills_normalized = [s.lower().strip() for s in user_skills]
-        required_skills_normalized = [s.lower().strip() for s in required_skills]
+        # Alias lookup, then one batched similarity pass for the rest
+        matched = self.matcher.match(user_skills, required_skills)
         
         # Find missing skills
         missing = []
         for skill in required_skills:
-            if skill.lower().strip() not in user_skills_normalized:
+            if skill not in matched:
                 missing.append({
                     "name": skill,
                     "priority": "high" if skill in required_skills[:5] else "medium",
@@ -69,6 +87,7 @@ class SkillGapAnalyzer:
             current_skills=user_skills,
             required_skills=required_skills,
             missing_skills=missing,
+            matched_skills=[{"name": name, **info} for name, info in matched.items()],
             match_percentage=round(match_percentage, 2),
             recommendations=recommendations
         )
@@ -0,0 +1,85 @@
+"""
+Skill Matcher
+Matches free-form user skills to canonical skill names in two passes:
+skill-ontology id lookup first, then one batched embedding similarity
+against the cached canonical skill matrix for whatever is left over.
+"""
+
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+from ai.embedding_index import EmbeddingIndex, l2_normalize
+from ai.skill_ontology import SkillOntology, skill_ontology
+
+# Cosine similarity above which an embedding match counts as having the skill
+DEFAULT_SIMILARITY_THRESHOLD = 0.75
+
+
+class SkillMatcher:
+    """Alias + embedding matcher over a fixed set of canonical skills"""
+
+    def __init__(
+        self,
+        canonical_skills: Sequence[str],
+        ontology: SkillOntology = skill_ontology,
+        index_provider: Optional[Callable[[], Optional[EmbeddingIndex]]] = None,
+        encoder_provider: Optional[Callable[[], object]] = None,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ):
+        self.canonical_skills = list(canonical_skills)
+        self.ontology = ontology
+        self.index_provider = index_provider
+        self.encoder_provider = encoder_provider
+        self.threshold = threshold
+
+    def match(self, user_skills: Sequence[str], required_skills: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Decide which required skills the user already covers.
+
+        Returns {required_skill: {"matched_by", "method", "score"}} for every
+        covered skill; required skills absent from the result are missing.
+        """
+        required = list(dict.fromkeys(required_skills))
+        required_by_key = {self.ontology.skill_key(skill): skill for skill in required}
+        matches: Dict[str, Dict] = {}
+
+        # Pass 1: ontology id / alias lookup
+        leftovers = []
+        for skill in dict.fromkeys(user_skills):
+            required_skill = required_by_key.get(self.ontology.skill_key(skill))
+            if required_skill is not None:
+                matches.setdefault(required_skill, {"matched_by": skill, "method": "alias", "score": 1.0})
+            else:
+                # Known skills stay in: "TensorFlow" can still cover "Deep Learning" semantically
+                leftovers.append(skill)
+
+        unmatched = [skill for skill in required if skill not in matches]
+        if not leftovers or not unmatched:
+            return matches
+
+        # Pass 2: one batched encode of every user skill without an alias match against the cached matrix
+        index = self.index_provider() if self.index_provider else None
+        encoder = self.encoder_provider() if self.encoder_provider and index is not None else None
+        if encoder is None:
+            return matches
+
+        try:
+            required_matrix = index.matrix[index.row_positions(unmatched)]
+        except KeyError:
+            # Required skill outside the precomputed vocabulary
+            return matches
+
+        user_matrix = l2_normalize(encoder.encode(leftovers, convert_to_numpy=True))
+        similarities = user_matrix @ required_matrix.T  # (leftovers, unmatched)
+        best_rows = similarities.argmax(axis=0)
+        best_scores = similarities[best_rows, np.arange(len(unmatched))]
+
+        for col, skill in enumerate(unmatched):
+            score = float(best_scores[col])
+            if score >= self.threshold:
+                matches[skill] = {
+                    "matched_by": leftovers[best_rows[col]],
+                    "method": "semantic",
+                    "score": round(score, 3),
+                }
+        return matches
@@ -0,0 +1,289 @@
+"""
+Skill Ontology
+Single in-memory catalogue of canonical skills (ids, aliases, categories,
+ESCO URIs). Names resolve through one hash index; skills are extracted
+from free text in a single pass with an Aho–Corasick automaton.
+"""
+
+import re
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+# Canonical skills. "esco_uri" is filled in from an ESCO snapshot when available.
+SKILL_ONTOLOGY = [
+    # Programming languages
+    {"id": "python", "name": "Python", "category": "Programming Language", "aliases": ["python3", "python 3", "py"]},
+    {"id": "javascript", "name": "JavaScript", "category": "Programming Language", "aliases": ["js", "es6", "ecmascript", "javascript es6"]},
+    {"id": "typescript", "name": "TypeScript", "category": "Programming Language", "aliases": ["ts"]},
+    {"id": "java", "name": "Java", "category": "Programming Language", "aliases": []},
+    {"id": "cpp", "name": "C++", "category": "Programming Language", "aliases": ["cpp", "cplusplus"]},
+    {"id": "csharp", "name": "C#", "category": "Programming Language", "aliases": ["c sharp", "csharp"]},
+    {"id": "go", "name": "Go", "category": "Programming Language", "aliases": ["golang"]},
+    {"id": "rust", "name": "Rust", "category": "Programming Language", "aliases": []},
+    {"id": "ruby", "name": "Ruby", "category": "Programming Language", "aliases": []},
+    {"id": "php", "name": "PHP", "category": "Programming Language", "aliases": []},
+    {"id": "swift", "name": "Swift", "category": "Programming Language", "aliases": []},
+    {"id": "kotlin", "name": "Kotlin", "category": "Programming Language", "aliases": []},
+    {"id": "r", "name": "R", "category": "Programming Language", "aliases": ["r programming", "rlang"]},
+    {"id": "sql", "name": "SQL", "category": "Programming Language", "aliases": ["structured query language", "sql queries"]},
+    {"id": "html_css", "name": "HTML/CSS", "category": "Programming Language", "aliases": ["html", "css", "html5", "css3", "html css"]},
+    {"id": "shell_scripting", "name": "Shell Scripting", "category": "Programming Language", "aliases": ["shell", "bash", "bash scripting"]},
+
+    # Frameworks and libraries
+    {"id": "react", "name": "React", "category": "Framework", "aliases": ["reactjs", "react js", "react.js"]},
+    {"id": "nextjs", "name": "Next.js", "category": "Framework", "aliases": ["nextjs", "next js"]},
+    {"id": "vuejs", "name": "Vue.js", "category": "Framework", "aliases": ["vue", "vuejs"]},
+    {"id": "angular", "name": "Angular", "category": "Framework", "aliases": ["angularjs"]},
+    {"id": "nodejs", "name": "Node.js", "category": "Framework", "aliases": ["node", "nodejs", "node js"]},
+    {"id": "django", "name": "Django", "category": "Framework", "aliases": []},
+    {"id": "flask", "name": "Flask", "category": "Framework", "aliases": []},
+    {"id": "fastapi", "name": "FastAPI", "category": "Framework", "aliases": []},
+    {"id": "dotnet", "name": ".NET Development", "category": "Framework", "aliases": [".net", "dotnet"]},
+    {"id": "pandas", "name": "Pandas", "category": "Framework", "aliases": []},
+    {"id": "numpy", "name": "NumPy", "category": "Framework", "aliases": []},
+    {"id": "scikit_learn", "name": "Scikit-learn", "category": "Framework", "aliases": ["sklearn", "scikit learn"]},
+    {"id": "tensorflow", "name": "TensorFlow", "category": "Framework", "aliases": ["tf", "tensorflow 2", "keras"]},
+    {"id": "pytorch", "name": "PyTorch", "category": "Framework", "aliases": ["torch"]},
+
+    # Data and AI
+    {"id": "machine_learning", "name": "Machine Learning", "category": "Data & AI", "aliases": ["ml"]},
+    {"id": "deep_learning", "name": "Deep Learning", "category": "Data & AI", "aliases": ["dl", "neural networks"]},
+    {"id": "data_science", "name": "Data Science", "category": "Data & AI", "aliases": []},
+    {"id": "data_analysis", "name": "Data Analysis", "category": "Data & AI", "aliases": ["data analytics"]},
+    {"id": "data_visualization", "name": "Data Visualization", "category": "Data & AI", "aliases": ["data viz", "dataviz", "data visualisation"]},
+    {"id": "statistics", "name": "Statistics", "category": "Data & AI", "aliases": ["stats", "statistical analysis"]},
+    {"id": "ab_testing", "name": "A/B Testing", "category": "Data & AI", "aliases": ["ab testing", "split testing", "experimentation"]},
+
+    # Databases
+    {"id": "postgresql", "name": "PostgreSQL", "category": "Database", "aliases": ["postgres"]},
+    {"id": "mongodb", "name": "MongoDB", "category": "Database", "aliases": ["mongo"]},
+    {"id": "database_design", "name": "Database Design", "category": "Database", "aliases": ["data modeling", "data modelling", "schema design"]},
+    {"id": "database_management", "name": "Database Management", "category": "Database", "aliases": ["database", "databases", "dbms"]},
+
+    # DevOps and cloud
+    {"id": "git", "name": "Git", "category": "DevOps & Cloud", "aliases": ["github", "gitlab", "git/github", "version control"]},
+    {"id": "docker", "name": "Docker", "category": "DevOps & Cloud", "aliases": ["dockerfile", "docker containers", "containerization"]},
+    {"id": "kubernetes", "name": "Kubernetes", "category": "DevOps & Cloud", "aliases": ["k8s"]},
+    {"id": "ci_cd", "name": "CI/CD", "category": "DevOps & Cloud", "aliases": ["ci cd", "cicd", "continuous integration"]},
+    {"id": "linux", "name": "Linux", "category": "DevOps & Cloud", "aliases": []},
+    {"id": "cloud", "name": "Cloud", "category": "DevOps & Cloud", "aliases": ["cloud computing"]},
+    {"id": "aws", "name": "AWS", "category": "DevOps & Cloud", "aliases": ["amazon web services"]},
+    {"id": "azure", "name": "Azure", "category": "DevOps & Cloud", "aliases": ["microsoft azure"]},
+    {"id": "gcp", "name": "Google Cloud", "category": "DevOps & Cloud", "aliases": ["gcp", "google cloud platform"]},
+    {"id": "devops", "name": "DevOps", "category": "DevOps & Cloud", "aliases": []},
+    {"id": "terraform", "name": "Terraform", "category": "DevOps & Cloud", "aliases": []},
+    {"id": "infrastructure_as_code", "name": "Infrastructure as Code", "category": "DevOps & Cloud", "aliases": ["iac"]},
+
+    # Software engineering
+    {"id": "programming", "name": "Programming", "category": "Engineering", "aliases": ["coding"]},
+    {"id": "algorithms", "name": "Algorithms", "category": "Engineering", "aliases": []},
+    {"id": "data_structures", "name": "Data Structures", "category": "Engineering", "aliases": []},
+    {"id": "oop", "name": "Object-Oriented Programming", "category": "Engineering", "aliases": ["oop", "object oriented design"]},
+    {"id": "rest_apis", "name": "REST APIs", "category": "Engineering", "aliases": ["rest", "rest api", "restful", "restful apis"]},
+    {"id": "api_development", "name": "API Development", "category": "Engineering", "aliases": ["api", "apis", "api design"]},
+    {"id": "backend_development", "name": "Backend Development", "category": "Engineering", "aliases": ["backend", "back end"]},
+    {"id": "frontend_development", "name": "Frontend Development", "category": "Engineering", "aliases": ["frontend", "front end"]},
+    {"id": "web_development", "name": "Web Development", "category": "Engineering", "aliases": ["web dev"]},
+    {"id": "systems_programming", "name": "Systems Programming", "category": "Engineering", "aliases": []},
+    {"id": "ios_development", "name": "iOS Development", "category": "Engineering", "aliases": ["ios"]},
+    {"id": "android_development", "name": "Android Development", "category": "Engineering", "aliases": ["android"]},
+    {"id": "mobile_development", "name": "Mobile Development", "category": "Engineering", "aliases": ["mobile", "mobile apps"]},
+    {"id": "software_testing", "name": "Testing", "category": "Engineering", "aliases": ["software testing", "unit testing", "automated testing"]},
+    {"id": "blockchain", "name": "Blockchain", "category": "Engineering", "aliases": []},
+
+    # Design
+    {"id": "figma", "name": "Figma", "category": "Design", "aliases": []},
+    {"id": "adobe_xd", "name": "Adobe XD", "category": "Design", "aliases": ["xd"]},
+    {"id": "adobe_creative_suite", "name": "Adobe", "category": "Design", "aliases": ["adobe creative suite", "photoshop", "illustrator"]},
+    {"id": "sketch", "name": "Sketch", "category": "Design", "aliases": []},
+    {"id": "user_research", "name": "User Research", "category": "Design", "aliases": ["ux research", "user interviews"]},
+    {"id": "usability_testing", "name": "Usability Testing", "category": "Design", "aliases": ["user testing"]},
+    {"id": "prototyping", "name": "Prototyping", "category": "Design", "aliases": ["prototypes", "rapid prototyping"]},
+    {"id": "wireframing", "name": "Wireframing", "category": "Design", "aliases": ["wireframes"]},
+    {"id": "design_systems", "name": "Design Systems", "category": "Design", "aliases": []},
+    {"id": "interaction_design", "name": "Interaction Design", "category": "Design", "aliases": ["ixd"]},
+    {"id": "design_thinking", "name": "Design Thinking", "category": "Design", "aliases": []},
+
+    # Product and process
+    {"id": "product_strategy", "name": "Product Strategy", "category": "Product", "aliases": ["product vision"]},
+    {"id": "strategy", "name": "Strategy", "category": "Product", "aliases": ["strategic planning"]},
+    {"id": "roadmap_planning", "name": "Roadmap Planning", "category": "Product", "aliases": ["roadmapping", "product roadmap"]},
+    {"id": "stakeholder_management", "name": "Stakeholder Management", "category": "Product", "aliases": ["stakeholder communication"]},
+    {"id": "agile", "name": "Agile", "category": "Product", "aliases": ["agile methodology", "kanban"]},
+    {"id": "scrum", "name": "Scrum", "category": "Product", "aliases": []},
+
+    # Soft skills
+    {"id": "communication", "name": "Communication", "category": "Soft Skill", "aliases": ["communication skills", "verbal communication", "written communication"]},
+    {"id": "leadership", "name": "Leadership", "category": "Soft Skill", "aliases": ["team leadership"]},
+    {"id": "teamwork", "name": "Teamwork", "category": "Soft Skill", "aliases": ["team work", "collaboration"]},
+]
+
+# Names that are fine to look up but too ambiguous to spot in prose ("go", "r", "node"...)
+LOOKUP_ONLY_TERMS = {"r", "go", "ts", "py", "tf", "dl", "xd", "net", "rest", "node", "swift", "shell", "torch"}
+
+_SEPARATORS = re.compile(r"[\s\-_]+")
+
+
+def normalize_skill(name: str) -> str:
+    """Lowercase, drop dots and unify separators: 'React.js' -> 'reactjs'"""
+    name = name.lower().strip().replace(".", "")
+    return _SEPARATORS.sub(" ", name).strip()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "+#"
+
+
+class AhoCorasick:
+    """Multi-pattern automaton: finds every pattern occurrence in one pass over the text"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, str]]] = [[]]
+
+    def add(self, pattern: str, value: str):
+        state = 0
+        for ch in pattern:
+            nxt = self.goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][ch] = nxt
+            state = nxt
+        self.output[state].append((len(pattern), value))
+
+    def build(self):
+        """Compute failure links breadth-first"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, value) for every match, including overlaps"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for length, value in self.output[state]:
+                yield i - length + 1, i + 1, value
+
+
+class SkillOntology:
+    """Hash index + Aho–Corasick automaton over canonical skills"""
+
+    def __init__(self, entries: List[Dict]):
+        self.skills: Dict[str, Dict] = {}
+        self.index: Dict[str, str] = {}
+        self.automaton = AhoCorasick()
+
+        for entry in entries:
+            skill = {**entry, "aliases": list(entry.get("aliases", [])), "esco_uri": entry.get("esco_uri")}
+            self.skills[skill["id"]] = skill
+            for term in [skill["name"], *skill["aliases"]]:
+                self._add_term(term, skill["id"])
+        self.automaton.build()
+
+    def _add_term(self, term: str, skill_id: str):
+        key = normalize_skill(term)
+        if not key or key in self.index:
+            return
+        self.index[key] = skill_id
+        if key not in LOOKUP_ONLY_TERMS:
+            self.automaton.add(key, skill_id)
+
+    # ── Lookup ────────────────────────────────────────────────
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical skill id for a name or alias, or None if unknown"""
+        return self.index.get(normalize_skill(name)) if name else None
+
+    def get(self, skill_id: str) -> Optional[Dict]:
+        return self.skills.get(skill_id)
+
+    def name_of(self, skill_id: str) -> str:
+        return self.skills[skill_id]["name"]
+
+    def canonical_name(self, name: str) -> str:
+        """Display name for a skill, keeping unknown skills as written"""
+        skill_id = self.resolve(name)
+        return self.skills[skill_id]["name"] if skill_id else name.strip()
+
+    def skill_key(self, name: str) -> str:
+        """Comparable key: the canonical id, or the normalized text for unknown skills"""
+        return self.resolve(name) or f"~{normalize_skill(name)}"
+
+    def skill_keys(self, names: Iterable[str]) -> Set[str]:
+        return {self.skill_key(name) for name in names if name}
+
+    def canonicalize(self, names: Iterable[str]) -> List[str]:
+        """Canonical display names, de-duplicated in first-seen order"""
+        seen = {}
+        for name in names:
+            if name and name.strip():
+                seen.setdefault(self.skill_key(name), self.canonical_name(name))
+        return list(seen.values())
+
+    def by_category(self, category: str) -> List[Dict]:
+        return [skill for skill in self.skills.values() if skill["category"] == category]
+
+    def set_esco_uri(self, skill_id: str, uri: str):
+        if skill_id in self.skills:
+            self.skills[skill_id]["esco_uri"] = uri
+
+    def attach_esco_uris(self, find_uri: Callable[[str], Optional[str]]) -> int:
+        """Fill esco_uri from an ESCO label lookup, trying the name before aliases"""
+        linked = 0
+        for skill in self.skills.values():
+            for term in [skill["name"], *skill["aliases"]]:
+                uri = find_uri(term)
+                if uri:
+                    skill["esco_uri"] = uri
+                    linked += 1
+                    break
+        return linked
+
+    # ── Extraction ────────────────────────────────────────────
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Skill ids mentioned in free text, in order of first appearance.
+        One automaton pass; longest whole-word match wins where matches overlap.
+        """
+        if not text:
+            return []
+        normalized = normalize_skill(text)
+        matches = [
+            (start, end, skill_id)
+            for start, end, skill_id in self.automaton.iter(normalized)
+            if (start == 0 or not _is_word_char(normalized[start - 1]))
+            and (end == len(normalized) or not _is_word_char(normalized[end]))
+        ]
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+
+        found: Dict[str, None] = {}
+        covered_until = 0
+        for start, end, skill_id in matches:
+            if start < covered_until:
+                continue
+            found.setdefault(skill_id, None)
+            covered_until = end
+        return list(found)
+
+    def extract_names(self, text: str) -> List[str]:
+        return [self.name_of(skill_id) for skill_id in self.extract(text)]
+
+
+# Global singleton
+skill_ontology = SkillOntology(SKILL_ONTOLOGY)
@@ -1,58 +1,67 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
-from config import get_db, get_settings
+from config import get_async_db, get_settings
 from models.database import User, Profile
-from models.schemas import UserCreate, UserResponse, Token
+from models.schemas import UserCreate, UserResponse, Token, UserPrincipal
 from auth.jwt_handler import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
-    get_current_user
+    get_current_principal,
+    invalidate_principal,
+    password_hasher,
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 settings = get_settings()
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
+    result = await db.execute(select(User.id).where(User.email == user.email))
+    if result.first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     new_user = User(
         email=user.email,
         full_name=user.full_name,
         hashed_password=hashed_password
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.flush()
     
     # Create empty profile
     profile = Profile(user_id=new_user.id)
     db.add(profile)
-    db.commit()
+    await db.commit()
     
     return new_user
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(select(User).where(User.email == form_data.username))
+    user = result.scalars().first()
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade hashes made with an older cost factor while we have the plaintext
+    if password_hasher.needs_rehash(user.hashed_password):
+        user.hashed_password = await get_password_hash_async(form_data.password)
+        await db.commit()
+        invalidate_principal(user.email)
+    
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -60,5 +69,5 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(current_user: UserPrincipal = Depends(get_current_principal)):
     return current_user
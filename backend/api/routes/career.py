@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict
-from pydantic import BaseModel
-from config import get_db
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import List, Optional, Dict, Tuple
+from pydantic import BaseModel, ValidationError
+from config import AsyncSessionLocal
 from models.database import User
-from models.schemas import SkillGapAnalysis, CareerRecommendation
-from auth.jwt_handler import get_current_user
+from models.schemas import SkillGapAnalysis, CareerRecommendation, UserPrincipal
+from auth.jwt_handler import get_current_principal, get_current_user_aggregate, load_user_aggregate
 from ai.skill_gap_analyzer import SkillGapAnalyzer
 from ai.career_recommender import CareerRecommender
-from ai.orchestrator import chat_with_counselor, get_ai_career_recommendations, CareerCounselorOrchestrator
-from ai.ghost_job_detector import verify_job_posting
+from ai.career_catalog import career_catalog
+from ai.orchestrator import chat_with_counselor, stream_chat_with_counselor, get_ai_career_recommendations, parse_json_array, CareerCounselorOrchestrator
+from ai.ghost_job_detector import verify_job_posting, verify_job_postings_bulk
 from ai.project_recommender import get_project_recommendations
+from ai.llm_gateway import llm_gateway
+from utils.streaming import STREAM_INTERRUPTED, sse_error, sse_event, sse_response
+from utils.job_queue import job_queue, submit_job_response
 
 router = APIRouter(prefix="/career", tags=["Career Guidance"])
 
+# Response cache TTL (seconds) for interview questions per role/count/difficulty
+MOCK_INTERVIEW_CACHE_TTL = 6 * 3600
+
 skill_gap_analyzer = SkillGapAnalyzer()
 career_recommender = CareerRecommender()
 orchestrator = CareerCounselorOrchestrator()
@@ -72,8 +80,7 @@ class CareerCompareRequest(BaseModel):
 @router.post("/skill-gap", response_model=SkillGapAnalysis)
 def analyze_skill_gap(
     target_role: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Analyze skill gap between user's current skills and target role requirements"""
     # Get user's skills
@@ -88,8 +95,7 @@ def analyze_skill_gap(
 
 @router.get("/recommendations", response_model=List[CareerRecommendation])
 def get_career_recommendations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Get personalized career recommendations based on user profile"""
     # Get user data
@@ -107,13 +113,13 @@ def get_career_recommendations(
     return recommendations
 
 @router.post("/roadmap")
-def get_career_roadmap(
+async def get_career_roadmap(
     target_role: str,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Generate a step-by-step career roadmap"""
     user_skills = [skill.name for skill in current_user.skills]
-    roadmap_json = orchestrator.generate_career_roadmap(target_role, user_skills)
+    roadmap_json = await orchestrator.generate_career_roadmap(target_role, user_skills)
     
     # Try to parse JSON if AI returned it as markdown
     try:
@@ -144,16 +150,8 @@ def get_trending_skills():
     }
 
 
-@router.post("/chat", response_model=ChatResponse)
-def chat_with_ai_counselor(
-    chat_request: ChatMessage,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Chat with Atlas AI career counselor (powered by OpenAI + LangChain)"""
-    from datetime import datetime
-    
-    # Build Atlas Card context
+def _build_chat_atlas_card(current_user: User) -> Dict:
+    """Build the Atlas Card context used by the counselor chat"""
     atlas_card = {
         "full_name": current_user.full_name,
         "email": current_user.email,
@@ -170,10 +168,22 @@ def chat_with_ai_counselor(
             "interests": profile.interests or [],
             "target_roles": profile.target_roles or []
         })
+    return atlas_card
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_with_ai_counselor(
+    chat_request: ChatMessage,
+    current_user: User = Depends(get_current_user_aggregate)
+):
+    """Chat with Atlas AI career counselor (powered by OpenAI)"""
+    from datetime import datetime
+    
+    atlas_card = _build_chat_atlas_card(current_user)
     
     # Get AI response
     try:
-        response = chat_with_counselor(
+        response = await chat_with_counselor(
             chat_request.message, 
             atlas_card, 
             chat_request.history
@@ -190,11 +200,34 @@ def chat_with_ai_counselor(
         )
 
 
+@router.post("/chat/stream")
+async def stream_chat_with_ai_counselor(
+    chat_request: ChatMessage,
+    current_user: User = Depends(get_current_user_aggregate)
+):
+    """Streaming (SSE) variant of /chat — forwards tokens as they arrive"""
+    from datetime import datetime
+    
+    # Resolve profile data before streaming starts, while the session is open
+    atlas_card = _build_chat_atlas_card(current_user)
+    
+    async def events():
+        truncated = False
+        try:
+            async for chunk in stream_chat_with_counselor(chat_request.message, atlas_card, chat_request.history):
+                yield sse_event({"token": chunk})
+        except Exception:
+            truncated = True
+            yield sse_error(STREAM_INTERRUPTED)
+        yield sse_event({"timestamp": datetime.now().isoformat(), "truncated": truncated}, event="done")
+    
+    return sse_response(events())
+
+
 @router.post("/recommendations-ai", response_model=List[Dict])
-def get_ai_recommendations(
+async def get_ai_recommendations(
     preferences: Optional[Dict] = None,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Get AI-powered career recommendations (uses OpenAI)"""
     # Build Atlas Card context
@@ -213,26 +246,117 @@ def get_ai_recommendations(
         })
     
     # Get AI recommendations
-    recommendations = get_ai_career_recommendations(atlas_card, preferences)
+    recommendations = await get_ai_career_recommendations(atlas_card, preferences)
     return recommendations
 
 
 @router.post("/verify-job")
 def verify_job(
     job_data: JobPostingVerification,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """Verify job posting and detect ghost jobs/scams"""
     analysis = verify_job_posting(job_data.dict())
     return analysis
 
 
-@router.post("/project-recommendations")
-def recommend_projects(
-    request: ProjectRecommendationRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+MAX_BULK_JOB_POSTINGS = 50000
+
+
+def _parse_ndjson_postings(raw: bytes) -> List[Dict]:
+    """One JSON posting per line; blank lines are skipped"""
+    postings = []
+    for line_no, line in enumerate(raw.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            postings.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON on line {line_no}: {e.msg}")
+    return postings
+
+
+def _load_postings(raw: bytes, ndjson: bool) -> Tuple[int, List[Tuple[int, Dict]], Dict[int, str]]:
+    """
+    Decode and validate the postings; CPU-bound, so it runs on a worker thread.
+    Returns (total, [(index, posting)], {index: error}).
+    """
+    if ndjson:
+        postings = _parse_ndjson_postings(raw)
+    else:
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e.msg}")
+        postings = data.get("jobs", []) if isinstance(data, dict) else data
+    if not isinstance(postings, list):
+        raise HTTPException(status_code=400, detail="Expected a list of job postings")
+    if len(postings) > MAX_BULK_JOB_POSTINGS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_JOB_POSTINGS} postings per request")
+
+    valid, errors = [], {}
+    for index, posting in enumerate(postings):
+        if not isinstance(posting, dict):
+            errors[index] = "Posting must be a JSON object"
+            continue
+        try:
+            valid.append((index, JobPostingVerification(**posting).dict()))
+        except ValidationError as e:
+            errors[index] = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return len(postings), valid, errors
+
+
+async def _read_bulk_postings(request: Request) -> Tuple[int, List[Tuple[int, Dict]], Dict[int, str]]:
+    """
+    Accept a JSON body, an NDJSON body, or a multipart NDJSON/JSON file upload.
+    Body size is capped by BodySizeLimitMiddleware (VERIFY_JOBS_MAX_BODY_MB).
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "read"):
+            raise HTTPException(status_code=400, detail="Upload the postings as a 'file' field")
+        raw = await upload.read()
+        ndjson = not (upload.filename or "").endswith(".json")
+    else:
+        raw = await request.body()
+        ndjson = "ndjson" in content_type or "jsonl" in content_type
+    return await asyncio.to_thread(_load_postings, raw, ndjson)
+
+
+@router.post("/verify-jobs")
+async def verify_jobs(
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
+    """
+    Verify many job postings at once. Send {"jobs": [...]}, a JSON array,
+    an NDJSON body (application/x-ndjson), or an NDJSON file upload.
+    Results come back in input order; invalid postings get an "error" entry.
+    """
+    total, valid, errors = await _read_bulk_postings(request)
+
+    analyses = await verify_job_postings_bulk([job for _, job in valid])
+
+    results = [None] * total
+    summary = {"Safe": 0, "Caution": 0, "High Risk": 0}
+    for (index, job), analysis in zip(valid, analyses):
+        summary[analysis["risk_level"]] += 1
+        results[index] = {"index": index, "job_title": job["title"], "company": job["company"], **analysis}
+    for index, error in errors.items():
+        results[index] = {"index": index, "error": error}
+
+    return {
+        "total": total,
+        "analyzed": len(valid),
+        "invalid": len(errors),
+        "summary": summary,
+        "results": results,
+    }
+
+
+async def _project_recommendations(current_user: User, request: ProjectRecommendationRequest) -> Dict:
     """Get project recommendations based on skills and target role"""
     # Get user skills
     user_skills = [skill.name for skill in current_user.skills]
@@ -241,7 +365,7 @@ def recommend_projects(
         user_skills = ["Programming"]  # Default fallback
     
     # Get recommendations
-    projects = get_project_recommendations(
+    projects = await get_project_recommendations(
         skills=user_skills,
         target_role=request.target_role,
         difficulty=request.difficulty,
@@ -251,16 +375,31 @@ def recommend_projects(
     return {"projects": projects, "count": len(projects)}
 
 
+@router.post("/project-recommendations")
+async def recommend_projects(
+    request: ProjectRecommendationRequest,
+    background: bool = False,
+    current_user: User = Depends(get_current_user_aggregate)
+):
+    """
+    Get project recommendations based on skills and target role.
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return await submit_job_response(current_user.id, "project_recommendations", request.dict())
+    return await _project_recommendations(current_user, request)
+
+
 @router.post("/scholarships")
-def get_scholarships(
+async def get_scholarships(
     request: ScholarshipRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Find scholarships and financial aid"""
     major = request.major or (current_user.profile.major if current_user.profile else "General")
     location = request.location or (current_user.profile.location if current_user.profile else "Global")
     
-    raw_result = orchestrator.get_scholarships(major, location)
+    raw_result = await orchestrator.get_scholarships(major, location)
     # Ensure result is wrapped in object with 'scholarships' key
     if isinstance(raw_result, list):
         return {"scholarships": raw_result}
@@ -268,9 +407,9 @@ def get_scholarships(
 
 
 @router.post("/side-hustles")
-def get_side_hustles(
+async def get_side_hustles(
     request: SideHustleRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Incubate side hustle ideas"""
     skills = request.skills or [skill.name for skill in current_user.skills]
@@ -279,19 +418,14 @@ def get_side_hustles(
     if not skills:
         skills = ["Communication", "Basic Tech"]
     
-    raw_result = orchestrator.get_side_hustle_ideas(skills, interests)
+    raw_result = await orchestrator.get_side_hustle_ideas(skills, interests)
     # Ensure result is wrapped in object with 'side_hustles' key
     if isinstance(raw_result, list):
         return {"side_hustles": raw_result}
     return raw_result
 
 
-@router.post("/learning-path")
-def get_learning_path(
-    request: LearningPathRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
+async def _learning_path(current_user: User, request: LearningPathRequest) -> Dict:
     """Generate a personalized learning path for a target role"""
     from ai.learning_pathway import generate_learning_path
 
@@ -299,7 +433,7 @@ def get_learning_path(
     profile = current_user.profile
 
     # Get skill gap first to find missing skills
-    analysis = skill_gap_analyzer.analyze_gap(user_skills_list, request.target_role)
+    analysis = await asyncio.to_thread(skill_gap_analyzer.analyze_gap, user_skills_list, request.target_role)
     try:
         raw_missing = analysis.missing_skills if hasattr(analysis, 'missing_skills') else (analysis.get("missing_skills", []) if isinstance(analysis, dict) else [])
         missing = [s["name"] if isinstance(s, dict) else s for s in raw_missing]
@@ -316,7 +450,7 @@ def get_learning_path(
         elif profile.experience_years >= 1:
             current_level = "intermediate"
 
-    path = generate_learning_path(
+    path = await generate_learning_path(
         missing_skills=missing,
         target_role=request.target_role,
         current_level=current_level,
@@ -325,22 +459,30 @@ def get_learning_path(
     return {"target_role": request.target_role, "learning_path": path, "total_steps": len(path)}
 
 
-@router.post("/mock-interview")
-def mock_interview(
-    request: MockInterviewRequest,
-    current_user: User = Depends(get_current_user),
+@router.post("/learning-path")
+async def get_learning_path(
+    request: LearningPathRequest,
+    background: bool = False,
+    current_user: User = Depends(get_current_user_aggregate)
 ):
+    """
+    Generate a personalized learning path for a target role.
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return await submit_job_response(current_user.id, "learning_path", request.dict())
+    return await _learning_path(current_user, request)
+
+
+async def _mock_interview(current_user: User, request: MockInterviewRequest) -> Dict:
     """Generate mock interview questions and evaluate answers"""
-    from openai import OpenAI
-    from config import get_settings
     import json, re
 
-    settings = get_settings()
-
     user_skills_list = [skill.name for skill in current_user.skills]
-    prompt = f"""Generate {request.question_count} mock interview questions for a {request.role} position.
-Difficulty: {request.difficulty}
-Candidate skills: {', '.join(user_skills_list[:10])}
+    # Only role/count/difficulty go into the prompt, so every candidate for a role shares one cache entry
+    role = " ".join(request.role.split())
+    prompt = f"""Generate {request.question_count} mock interview questions for a {role} position.
+Difficulty: {request.difficulty.strip().lower()}
 
 Return ONLY a JSON array:
 [
@@ -352,7 +494,7 @@ Return ONLY a JSON array:
   }}
 ]"""
 
-    if not settings.openai_api_key:
+    if not llm_gateway.available:
         return {
             "role": request.role,
             "questions": [
@@ -372,18 +514,14 @@ Return ONLY a JSON array:
         }
 
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a professional career coach. Return only valid JSON."},
-                {"role": "user", "content": prompt},
-            ],
+        content = await llm_gateway.complete(
+            prompt,
+            system="You are a professional career coach. Return only valid JSON.",
             temperature=0.7,
+            cache_ttl=MOCK_INTERVIEW_CACHE_TTL,
+            validate=parse_json_array,
         )
-        content = response.choices[0].message.content
-        json_match = re.search(r'\[.*\]', content, re.DOTALL)
-        questions = json.loads(json_match.group()) if json_match else json.loads(content)
+        questions = parse_json_array(content)
         return {"role": request.role, "questions": questions}
     except Exception as e:
         print(f"Mock interview AI error: {e}")
@@ -399,18 +537,25 @@ Return ONLY a JSON array:
         }
 
 
-@router.post("/career-compare")
-def compare_careers(
-    request: CareerCompareRequest,
-    current_user: User = Depends(get_current_user),
+@router.post("/mock-interview")
+async def mock_interview(
+    request: MockInterviewRequest,
+    background: bool = False,
+    current_user: User = Depends(get_current_user_aggregate),
 ):
+    """
+    Generate mock interview questions and evaluate answers.
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return await submit_job_response(current_user.id, "mock_interview", request.dict())
+    return await _mock_interview(current_user, request)
+
+
+async def _career_compare(current_user: User, request: CareerCompareRequest) -> Dict:
     """Compare 2-3 career paths side by side"""
-    from openai import OpenAI
-    from config import get_settings
     import json, re
 
-    settings = get_settings()
-
     user_skills_list = [skill.name for skill in current_user.skills]
     prompt = f"""Compare these careers for a student with skills in {', '.join(user_skills_list[:8])}:
 Careers: {', '.join(request.careers[:3])}
@@ -430,20 +575,15 @@ Return ONLY a JSON array where each object represents one career:
   }}
 ]"""
 
-    if not settings.openai_api_key:
+    if not llm_gateway.available:
         return {"careers": _build_career_compare_fallback(request.careers, user_skills_list)}
 
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a career comparison analyst. Return only valid JSON."},
-                {"role": "user", "content": prompt},
-            ],
+        content = await llm_gateway.complete(
+            prompt,
+            system="You are a career comparison analyst. Return only valid JSON.",
             temperature=0.5,
         )
-        content = response.choices[0].message.content
         json_match = re.search(r'\[.*\]', content, re.DOTALL)
         careers = json.loads(json_match.group()) if json_match else json.loads(content)
         return {"careers": careers}
@@ -452,29 +592,28 @@ Return ONLY a JSON array where each object represents one career:
         return {"careers": _build_career_compare_fallback(request.careers, user_skills_list)}
 
 
+@router.post("/career-compare")
+async def compare_careers(
+    request: CareerCompareRequest,
+    background: bool = False,
+    current_user: User = Depends(get_current_user_aggregate),
+):
+    """
+    Compare 2-3 career paths side by side.
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return await submit_job_response(current_user.id, "career_compare", request.dict())
+    return await _career_compare(current_user, request)
+
+
 def _build_career_compare_fallback(careers: List[str], user_skills: List[str]) -> List[Dict]:
     """Build differentiated fallback career comparison data"""
-    career_data = {
-        "frontend": {"salary_range": "$65,000 - $140,000", "growth_outlook": "Strong", "skill_match": 78, "work_life_balance": 8, "entry_barrier": "Low", "pros": ["High demand for web apps", "Creative and visual work", "Large open-source ecosystem"], "cons": ["Rapidly changing frameworks", "Browser compatibility issues"], "time_to_entry": "3-6 months"},
-        "backend": {"salary_range": "$75,000 - $160,000", "growth_outlook": "Strong", "skill_match": 82, "work_life_balance": 7, "entry_barrier": "Medium", "pros": ["Higher average salary", "Scalable system design", "Strong job stability"], "cons": ["Less visual feedback", "Complex debugging"], "time_to_entry": "6-9 months"},
-        "full stack": {"salary_range": "$70,000 - $155,000", "growth_outlook": "Strong", "skill_match": 80, "work_life_balance": 7, "entry_barrier": "Medium", "pros": ["Versatile skill set", "Can build complete products", "Highly employable"], "cons": ["Jack of all trades concern", "Harder to master both ends"], "time_to_entry": "6-12 months"},
-        "data scientist": {"salary_range": "$85,000 - $170,000", "growth_outlook": "Strong", "skill_match": 72, "work_life_balance": 8, "entry_barrier": "High", "pros": ["Top-paying tech role", "Impactful insights", "Growing AI/ML demand"], "cons": ["Requires strong math background", "Data cleaning is tedious"], "time_to_entry": "9-18 months"},
-        "devops": {"salary_range": "$80,000 - $165,000", "growth_outlook": "Strong", "skill_match": 68, "work_life_balance": 6, "entry_barrier": "High", "pros": ["Critical infrastructure role", "High demand", "Automation-focused"], "cons": ["On-call responsibilities", "Steep learning curve"], "time_to_entry": "6-12 months"},
-        "product manager": {"salary_range": "$80,000 - $160,000", "growth_outlook": "Moderate", "skill_match": 65, "work_life_balance": 7, "entry_barrier": "Medium", "pros": ["Leadership opportunities", "Cross-functional impact", "No coding required"], "cons": ["Ambiguous success metrics", "High-pressure decisions"], "time_to_entry": "3-6 months"},
-        "ux": {"salary_range": "$60,000 - $135,000", "growth_outlook": "Strong", "skill_match": 70, "work_life_balance": 8, "entry_barrier": "Low", "pros": ["Creative and empathetic work", "Growing demand", "User-centered impact"], "cons": ["Subjective feedback", "Requires strong portfolio"], "time_to_entry": "3-6 months"},
-        "data analyst": {"salary_range": "$55,000 - $110,000", "growth_outlook": "Moderate", "skill_match": 75, "work_life_balance": 8, "entry_barrier": "Low", "pros": ["Great entry to data careers", "Business impact", "SQL-focused simplicity"], "cons": ["Can be repetitive", "Lower ceiling than data science"], "time_to_entry": "2-4 months"},
-        "software engineer": {"salary_range": "$80,000 - $170,000", "growth_outlook": "Strong", "skill_match": 85, "work_life_balance": 7, "entry_barrier": "Medium", "pros": ["Excellent pay progression", "Remote-friendly", "Diverse specializations"], "cons": ["Continuous learning required", "Whiteboard interview culture"], "time_to_entry": "6-12 months"},
-        "machine learning": {"salary_range": "$95,000 - $190,000", "growth_outlook": "Strong", "skill_match": 66, "work_life_balance": 7, "entry_barrier": "High", "pros": ["Cutting-edge technology", "Highest salary potential", "Research opportunities"], "cons": ["Heavy math prerequisites", "GPU costs for experimentation"], "time_to_entry": "12-24 months"},
-    }
+    snapshot = career_catalog.snapshot
     
     result = []
     for i, career in enumerate(careers):
-        career_lower = career.lower()
-        matched = None
-        for key, data in career_data.items():
-            if key in career_lower or career_lower in key:
-                matched = data
-                break
+        matched = snapshot.comparison_for(career)
         
         if not matched:
             # Generate unique fallback based on position
@@ -496,8 +635,7 @@ def _build_career_compare_fallback(careers: List[str], user_skills: List[str]) -
 
 @router.get("/career-map")
 def get_career_map(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_aggregate)
 ):
     """Get visual career map data — nodes and connections for career paths"""
     user_skills_list = [skill.name for skill in current_user.skills]
@@ -539,18 +677,24 @@ def get_career_map(
 
 def _get_related_roles(role: str) -> List[str]:
     """Get related career titles"""
-    role_map = {
-        "Software Engineer": ["Senior Engineer", "Tech Lead", "Solutions Architect"],
-        "Data Scientist": ["ML Engineer", "Data Engineering Lead", "AI Researcher"],
-        "Product Manager": ["Senior PM", "Director of Product", "VP Product"],
-        "UX Designer": ["Senior UX", "Design Lead", "Head of Design"],
-        "DevOps Engineer": ["SRE", "Platform Engineer", "Cloud Architect"],
-        "Full Stack Developer": ["Tech Lead", "Engineering Manager", "CTO"],
-        "Frontend Developer": ["Senior Frontend", "UI Architect", "Design Engineer"],
-        "Backend Developer": ["Senior Backend", "Systems Architect", "Principal Engineer"],
-    }
-    # Fuzzy match
-    for key, related in role_map.items():
-        if key.lower() in role.lower() or role.lower() in key.lower():
-            return related
+    related = career_catalog.snapshot.related_roles(role)
+    if related:
+        return related
     return ["Senior " + role, role + " Lead", "Director of " + role.split()[-1]]
+
+
+def _user_job(build, request_model):
+    """Job handler that reloads the submitting user and runs an endpoint body"""
+    async def handler(user_id: int, params: Dict) -> Dict:
+        async with AsyncSessionLocal() as db:
+            user = await load_user_aggregate(db, user_id=user_id)
+        if user is None:
+            raise ValueError("User not found")
+        return await build(user, request_model(**params))
+    return handler
+
+
+job_queue.register("project_recommendations", _user_job(_project_recommendations, ProjectRecommendationRequest))
+job_queue.register("learning_path", _user_job(_learning_path, LearningPathRequest))
+job_queue.register("mock_interview", _user_job(_mock_interview, MockInterviewRequest))
+job_queue.register("career_compare", _user_job(_career_compare, CareerCompareRequest))
@@ -4,19 +4,17 @@ Persistent chat interface with deep context awareness.
 Falls back gracefully when OpenAI quota is exhausted.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
-from typing import List, Optional, Dict
+from typing import AsyncIterator, List, Optional, Dict
 from datetime import datetime
-from config import get_db, get_settings
 from models.database import User
-from auth.jwt_handler import get_current_user
+from auth.jwt_handler import get_current_user_aggregate
+from ai.llm_gateway import llm_gateway
+from utils.streaming import STREAM_INTERRUPTED, sse_error, sse_event, sse_response
 
 router = APIRouter(prefix="/coach", tags=["Career Clarity Coach"])
 
-settings = get_settings()
-
 # ── Request / Response models ──────────────────────────────
 
 class CoachMessage(BaseModel):
@@ -153,17 +151,9 @@ def _detect_context(message: str) -> str:
     return "general"
 
 
-def _get_coach_response(message: str, user_context: Dict) -> Dict:
-    """Generate a coach response — tries LLM first, falls back to curated responses."""
-    context = _detect_context(message)
-
-    # Try LLM if available
-    try:
-        if settings.openai_api_key:
-            from openai import OpenAI
-            client = OpenAI(api_key=settings.openai_api_key)
-
-            system_prompt = f"""You are Atlas AI, a warm, knowledgeable 24/7 career clarity coach.
+def _build_coach_system_prompt(user_context: Dict) -> str:
+    """System prompt shared by the blocking and streaming coach paths."""
+    return f"""You are Atlas AI, a warm, knowledgeable 24/7 career clarity coach.
 User Profile: {user_context}
 
 Your style:
@@ -174,16 +164,20 @@ Your style:
 - If the student seems stressed, be supportive first, practical second
 - Never be preachy or generic — give specific, personalized advice"""
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message},
-                ],
+
+async def _get_coach_response(message: str, user_context: Dict) -> Dict:
+    """Generate a coach response — tries LLM first, falls back to curated responses."""
+    context = _detect_context(message)
+
+    # Try LLM if available
+    try:
+        if llm_gateway.available:
+            ai_text = await llm_gateway.complete(
+                message,
+                system=_build_coach_system_prompt(user_context),
                 temperature=0.7,
                 max_tokens=500,
             )
-            ai_text = response.choices[0].message.content
             fallback = COACH_RESPONSES.get(context, COACH_RESPONSES["general"])
             return {
                 "response": ai_text,
@@ -202,16 +196,36 @@ Your style:
     }
 
 
-# ── Endpoints ─────────────────────────────────────────────
+async def _stream_coach_response(message: str, user_context: Dict) -> AsyncIterator[str]:
+    """Streaming variant of _get_coach_response — yields text chunks."""
+    context = _detect_context(message)
+    fallback = COACH_RESPONSES.get(context, COACH_RESPONSES["general"])
 
-@router.post("/chat", response_model=CoachResponse)
-def coach_chat(
-    msg: CoachMessage,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """Chat with the Career Clarity Coach."""
-    # Build user context for personalization
+    if llm_gateway.available:
+        started = False
+        try:
+            async for chunk in llm_gateway.stream_chat(
+                [
+                    {"role": "system", "content": _build_coach_system_prompt(user_context)},
+                    {"role": "user", "content": message},
+                ],
+                temperature=0.7,
+                max_tokens=500,
+            ):
+                started = True
+                yield chunk
+            return
+        except Exception as e:
+            print(f"Coach LLM stream error: {e}")
+            if started:
+                raise  # tokens already went out; the route reports the truncation
+
+    # Fallback to curated responses
+    yield fallback["response"]
+
+
+def _build_user_context(current_user: User) -> Dict:
+    """Build user context for personalization."""
     user_context = {
         "name": current_user.full_name,
         "skills": [s.name for s in current_user.skills][:10],
@@ -224,8 +238,19 @@ def coach_chat(
             "interests": p.interests or [],
             "target_roles": p.target_roles or [],
         })
+    return user_context
 
-    result = _get_coach_response(msg.message, user_context)
+
+# ── Endpoints ─────────────────────────────────────────────
+
+@router.post("/chat", response_model=CoachResponse)
+async def coach_chat(
+    msg: CoachMessage,
+    current_user: User = Depends(get_current_user_aggregate)
+):
+    """Chat with the Career Clarity Coach."""
+    user_context = _build_user_context(current_user)
+    result = await _get_coach_response(msg.message, user_context)
 
     return CoachResponse(
         response=result["response"],
@@ -235,8 +260,36 @@ def coach_chat(
     )
 
 
+@router.post("/chat/stream")
+async def coach_chat_stream(
+    msg: CoachMessage,
+    current_user: User = Depends(get_current_user_aggregate)
+):
+    """Streaming (SSE) variant of /chat — forwards tokens as they arrive."""
+    user_context = _build_user_context(current_user)
+    context = _detect_context(msg.message)
+    suggestions = COACH_RESPONSES.get(context, COACH_RESPONSES["general"])["suggestions"]
+
+    async def events():
+        truncated = False
+        try:
+            async for chunk in _stream_coach_response(msg.message, user_context):
+                yield sse_event({"token": chunk})
+        except Exception:
+            truncated = True
+            yield sse_error(STREAM_INTERRUPTED)
+        yield sse_event({
+            "suggestions": suggestions,
+            "context": context,
+            "timestamp": datetime.now().isoformat(),
+            "truncated": truncated,
+        }, event="done")
+
+    return sse_response(events())
+
+
 @router.get("/welcome")
-def coach_welcome(current_user: User = Depends(get_current_user)):
+def coach_welcome(current_user: User = Depends(get_current_user_aggregate)):
     """Get a personalized welcome message."""
     name = current_user.full_name or "there"
     first = name.split()[0]
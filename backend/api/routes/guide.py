@@ -9,9 +9,11 @@ from typing import List, Dict, Optional
 from datetime import datetime
 from sqlalchemy.orm import Session
 from config import get_db
-from models.database import User
-from auth.jwt_handler import get_current_user
+from models.schemas import UserPrincipal
+from auth.jwt_handler import get_current_principal
 from ai.platform_guide import platform_guide
+from ai import embedding_store
+from utils.streaming import STREAM_INTERRUPTED, sse_error, sse_event, sse_response
 
 router = APIRouter(prefix="/guide", tags=["Platform Guide"])
 
@@ -34,6 +36,11 @@ class GuideResponse(BaseModel):
     timestamp: str
 
 
+class BatchSearchRequest(BaseModel):
+    queries: List[str]
+    top_k: int = 5
+
+
 class FeatureInfo(BaseModel):
     id: str
     name: str
@@ -63,9 +70,9 @@ def get_welcome_message():
 
 
 @router.post("/chat", response_model=GuideResponse)
-def chat_with_guide(
+async def chat_with_guide(
     payload: GuideMessage,
-    current_user: User = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_principal)
 ):
     """
     Chat with the platform guide chatbot.
@@ -85,7 +92,7 @@ def chat_with_guide(
         )
     
     # Use custom ML model to generate response
-    result = platform_guide.generate_response(message, history)
+    result = await platform_guide.generate_response(message, history)
     
     return GuideResponse(
         response=result["response"],
@@ -97,6 +104,36 @@ def chat_with_guide(
     )
 
 
+@router.post("/chat/stream")
+async def chat_with_guide_stream(
+    payload: GuideMessage,
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """
+    Streaming (SSE) variant of /chat.
+    Emits a `meta` event (intent, features, action), token frames, then `done`
+    (`truncated` with a preceding `error` frame if the LLM stream broke mid-answer).
+    """
+    message = payload.message.strip()
+    history = payload.history or []
+    
+    async def events():
+        truncated = False
+        if not message:
+            yield sse_event({"intent": "empty", "relevant_features": [], "confidence": 0.0, "action": None}, event="meta")
+            yield sse_event({"token": "I didn't catch that. What would you like to know?"})
+        else:
+            try:
+                async for kind, data in platform_guide.stream_response(message, history):
+                    yield sse_event(data, event="meta" if kind == "meta" else None)
+            except Exception:
+                truncated = True
+                yield sse_error(STREAM_INTERRUPTED)
+        yield sse_event({"timestamp": datetime.utcnow().isoformat(), "truncated": truncated}, event="done")
+    
+    return sse_response(events())
+
+
 @router.get("/features")
 def get_all_features():
     """Get all platform features organized by category"""
@@ -111,10 +148,7 @@ def get_all_features():
 @router.get("/feature/{feature_id}")
 def get_feature_detail(feature_id: str):
     """Get detailed information about a specific feature"""
-    feature = next(
-        (f for f in platform_guide.knowledge_base if f['id'] == feature_id),
-        None
-    )
+    feature = platform_guide.features_by_id.get(feature_id)
     
     if not feature:
         return {"error": "Feature not found"}
@@ -123,9 +157,9 @@ def get_feature_detail(feature_id: str):
 
 
 @router.post("/search")
-def search_features(query: str):
+async def search_features(query: str):
     """Search for features using semantic search"""
-    results = platform_guide.retrieve_relevant_features(query, top_k=5)
+    results = await platform_guide.aretrieve_relevant_features(query, top_k=5)
     
     return {
         "query": query,
@@ -143,13 +177,47 @@ def search_features(query: str):
     }
 
 
+@router.post("/search/batch")
+async def search_features_batch(request: BatchSearchRequest):
+    """Semantic search for many queries in a single pass"""
+    batches = await platform_guide.aretrieve_relevant_features_batch(request.queries, top_k=request.top_k)
+    
+    return {
+        "results": [
+            {
+                "query": query,
+                "results": [
+                    {
+                        "id": f["id"],
+                        "name": f["name"],
+                        "route": f["route"],
+                        "category": f["category"],
+                        "description": f["description"]
+                    }
+                    for f in results
+                ],
+                "count": len(results)
+            }
+            for query, results in zip(request.queries, batches)
+        ]
+    }
+
+
+def _ml_model_status() -> str:
+    """Summarize retrieval mode without forcing the query encoder to load"""
+    status = embedding_store.encoder_status()
+    if status == "failed" or (status == "loaded" and platform_guide.feature_index is None):
+        return "fallback_mode"
+    return "loaded" if status == "loaded" else "lazy"
+
+
 @router.get("/health")
 def guide_health_check():
     """Check if ML model is loaded and ready"""
     return {
         "status": "healthy",
-        "ml_model": "loaded" if platform_guide.embedder else "fallback_mode",
+        "ml_model": _ml_model_status(),
         "llm": "available" if platform_guide.llm_client else "unavailable",
         "knowledge_base_size": len(platform_guide.knowledge_base),
-        "embeddings_ready": platform_guide.feature_embeddings is not None
+        "embeddings_ready": platform_guide.feature_index is not None
     }
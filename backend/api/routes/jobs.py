@@ -0,0 +1,65 @@
+"""
+Background Job Routes
+Poll, stream and cancel jobs submitted with ?background=true
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from models.schemas import UserPrincipal
+from auth.jwt_handler import get_current_principal
+from config import get_settings
+from utils.job_queue import TERMINAL_STATUSES, job_queue
+from utils.streaming import sse_event, sse_response
+
+router = APIRouter(prefix="/jobs", tags=["Background Jobs"])
+
+settings = get_settings()
+
+
+@router.get("")
+async def list_jobs(current_user: UserPrincipal = Depends(get_current_principal)):
+    """Most recent jobs for the current user"""
+    return {"jobs": await job_queue.list_jobs(current_user.id)}
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, current_user: UserPrincipal = Depends(get_current_principal)):
+    """Job status, with the result once it has succeeded"""
+    job = await job_queue.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def stream_job(job_id: str, current_user: UserPrincipal = Depends(get_current_principal)):
+    """
+    Server-Sent Events: a "status" frame on every status change, ending
+    with the finished job (result or error included).
+    """
+    job = await job_queue.get(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        current = job
+        last_status = None
+        while True:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                yield sse_event(current, event="status")
+            if last_status in TERMINAL_STATUSES:
+                yield sse_event({"id": job_id}, event="done")
+                return
+            await job_queue.wait_for_change(job_id, settings.job_poll_interval_seconds)
+            current = await job_queue.get(job_id, current_user.id) or current
+
+    return sse_response(events())
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str, current_user: UserPrincipal = Depends(get_current_principal)):
+    """Cancel a queued or running job"""
+    job = await job_queue.cancel(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -8,8 +8,9 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from config import get_db
-from models.database import User, Profile, Skill, user_skills
-from auth.jwt_handler import get_current_user
+from models.database import User, Profile
+from auth.jwt_handler import get_current_user_sync, invalidate_principal
+from utils.skill_attach import attach_skills
 
 router = APIRouter(prefix="/onboarding", tags=["Onboarding"])
 
@@ -49,7 +50,7 @@ class OnboardingComplete(BaseModel):
 
 @router.get("/status")
 def get_onboarding_status(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db),
 ):
     """Check if user has completed onboarding"""
@@ -72,7 +73,7 @@ def get_onboarding_status(
 @router.post("/complete")
 def complete_onboarding(
     data: OnboardingComplete,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db),
 ):
     """Complete full onboarding in one step"""
@@ -102,31 +103,10 @@ def complete_onboarding(
         profile.level = max(profile.level or 1, 2)
 
     # Add skills
-    for skill_name in data.skills:
-        skill = db.query(Skill).filter(Skill.name == skill_name).first()
-        if not skill:
-            skill = Skill(name=skill_name, category="technical")
-            db.add(skill)
-            db.flush()
-
-        # Check if association already exists
-        existing = db.execute(
-            user_skills.select().where(
-                user_skills.c.user_id == current_user.id,
-                user_skills.c.skill_id == skill.id,
-            )
-        ).first()
-        if not existing:
-            db.execute(
-                user_skills.insert().values(
-                    user_id=current_user.id,
-                    skill_id=skill.id,
-                    proficiency=0.5,
-                    source="onboarding",
-                )
-            )
+    attach_skills(db, current_user.id, data.skills, proficiency=0.5, source="onboarding")
 
     db.commit()
+    invalidate_principal(current_user.email)
 
     return {
         "message": "Onboarding complete! Welcome to Atlas AI.",
@@ -138,7 +118,7 @@ def complete_onboarding(
 @router.post("/step1")
 def onboarding_step1(
     data: OnboardingStep1,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db),
 ):
     """Step 1: Basic info"""
@@ -155,13 +135,14 @@ def onboarding_step1(
     profile.graduation_year = data.graduation_year
 
     db.commit()
+    invalidate_principal(current_user.email)
     return {"message": "Step 1 complete", "step": 1}
 
 
 @router.post("/step2")
 def onboarding_step2(
     data: OnboardingStep2,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db),
 ):
     """Step 2: Interests and goals"""
@@ -179,32 +160,11 @@ def onboarding_step2(
 @router.post("/step3")
 def onboarding_step3(
     data: OnboardingStep3,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db),
 ):
     """Step 3: Skills"""
-    for skill_name in data.skills:
-        skill = db.query(Skill).filter(Skill.name == skill_name).first()
-        if not skill:
-            skill = Skill(name=skill_name, category="technical")
-            db.add(skill)
-            db.flush()
-
-        existing = db.execute(
-            user_skills.select().where(
-                user_skills.c.user_id == current_user.id,
-                user_skills.c.skill_id == skill.id,
-            )
-        ).first()
-        if not existing:
-            db.execute(
-                user_skills.insert().values(
-                    user_id=current_user.id,
-                    skill_id=skill.id,
-                    proficiency=0.5,
-                    source="onboarding",
-                )
-            )
+    attach_skills(db, current_user.id, data.skills, proficiency=0.5, source="onboarding")
 
     # Award XP
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
@@ -5,14 +5,13 @@ filters by anti-tags, scores via Ikigai engine, returns personalised
 stream recommendations with "Day in the Life" + "Reality Check".
 """
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-from config import get_db, get_settings
-from models.database import User
-from auth.jwt_handler import get_current_user
+from config import get_settings
+from models.schemas import UserPrincipal
+from auth.jwt_handler import get_current_principal
 
 router = APIRouter(prefix="/origin-story", tags=["Origin Story"])
 
@@ -289,6 +288,11 @@ class OriginStoryInput(BaseModel):
     location_pref: Optional[str] = ""
 
 
+class OriginStoryBatchInput(BaseModel):
+    # One entry per student, e.g. a whole classroom's quiz submissions
+    submissions: List[OriginStoryInput]
+
+
 class StreamRecommendation(BaseModel):
     rank: int
     stream_id: str
@@ -312,30 +316,6 @@ class StreamRecommendation(BaseModel):
 # 5. MATCHING ENGINE
 # ═══════════════════════════════════════════════════════════
 
-def _compute_match(user_tags: List[str], user_anti_tags: List[str], stream: Dict) -> int:
-    """Compute a 0-100 match score using weighted tag overlap."""
-    # Hard exclusion: if user anti-tags intersect stream required tags
-    anti_overlap = set(user_anti_tags) & set(stream.get("required_tags", []))
-    if len(anti_overlap) >= 2:
-        return 0  # strong disqualification
-
-    # Positive match: overlap between user tags and stream required tags
-    required = set(stream.get("required_tags", []))
-    positive_overlap = set(user_tags) & required
-    if not required:
-        return 50
-
-    base_score = (len(positive_overlap) / len(required)) * 80
-
-    # Penalty for partial anti-tag overlap
-    penalty = len(anti_overlap) * 15
-
-    # Bonus for strong interest alignment
-    bonus = min(len(positive_overlap), 3) * 5
-
-    return max(0, min(100, int(base_score - penalty + bonus)))
-
-
 def _generate_pitch(stream: Dict, user_interests: List[str]) -> str:
     """Generate a personalized 'Why this fits you' pitch."""
     name = stream["name"]
@@ -355,91 +335,129 @@ def _generate_pitch(stream: Dict, user_interests: List[str]) -> str:
     return pitches.get(stream.get("_id", ""), f"Based on your profile, {name} is a strong match! With careers like {careers_str} and your interest in {interests_str}, this path offers both growth and fulfilment.")
 
 
-def recommend_streams(input_data: OriginStoryInput) -> List[Dict]:
-    """Run the full matching engine and return ranked recommendations."""
+SUBJECT_TAG_MAP: Dict[str, List[str]] = {
+    "math": ["math", "logic", "statistics"],
+    "physics": ["physics", "building", "problem_solving"],
+    "chemistry": ["chemistry", "lab_work"],
+    "biology": ["biology", "research"],
+    "english": ["communication", "storytelling"],
+    "computer": ["technology", "logic", "coding_heavy"],
+    "art": ["creativity", "visual_thinking", "aesthetics"],
+    "economics": ["strategy", "math_basic"],
+}
 
-    # 1. Collect user anti-tags from anti-choice questions
-    user_anti_tags = []
-    for ac_id in input_data.anti_choices:
-        aq = next((q for q in ANTI_CHOICE_QUESTIONS if q["id"] == ac_id), None)
-        if aq:
-            user_anti_tags.extend(aq["anti_tags"])
-
-    # 2. Collect user positive tags from psychometric answers
-    user_tags = []
-    archetype_counts = {"Builder": 0, "Thinker": 0, "Communicator": 0, "Creator": 0}
-    for q_id_str, option_idx in input_data.psychometric_answers.items():
-        q_id = int(q_id_str) if q_id_str.isdigit() else 0
-        question = next((q for q in PSYCHOMETRIC_QUESTIONS if q["id"] == q_id), None)
-        if question and 0 <= option_idx < len(question["options"]):
-            option = question["options"][option_idx]
-            user_tags.extend(option.get("tags", []))
-            # Track anti-tags from psychometric stress question
-            if option.get("type") == "anti":
-                user_anti_tags.extend(option.get("anti_tags", []))
-            # Track archetype
-            archetype = option.get("type", "")
-            if archetype in archetype_counts:
-                archetype_counts[archetype] += 1
-
-    # 3. Add academic strengths as tags
-    subject_tag_map = {
-        "math": ["math", "logic", "statistics"],
-        "physics": ["physics", "building", "problem_solving"],
-        "chemistry": ["chemistry", "lab_work"],
-        "biology": ["biology", "research"],
-        "english": ["communication", "storytelling"],
-        "computer": ["technology", "logic", "coding_heavy"],
-        "art": ["creativity", "visual_thinking", "aesthetics"],
-        "economics": ["strategy", "math_basic"],
-    }
-    for subj in input_data.strong_subjects:
-        user_tags.extend(subject_tag_map.get(subj.lower(), [subj.lower()]))
-
-    # 4. Add interest tags
-    interest_tag_map = {
-        "robots": ["technology", "building", "hands_on"],
-        "ai": ["logic", "math", "technology"],
-        "money": ["strategy", "math_basic", "leadership"],
-        "writing": ["communication", "storytelling", "creativity"],
-        "gaming": ["technology", "logic", "creativity"],
-        "outdoors": ["outdoors", "physical_labor", "hands_on"],
-        "music": ["creativity", "aesthetics"],
-        "science": ["research", "curiosity", "lab_work"],
-        "sports": ["hands_on", "outdoors", "leadership"],
-        "helping": ["empathy", "helping_people"],
-    }
-    for interest in input_data.interests:
-        clean = interest.lower().strip("#").strip()
-        user_tags.extend(interest_tag_map.get(clean, [clean]))
-
-    # 5. Deduplicate
-    user_tags = list(set(user_tags))
-    user_anti_tags = list(set(user_anti_tags))
-
-    # 6. Score each stream
-    scored = []
-    for stream_id, stream in STREAMS.items():
-        stream_with_id = {**stream, "_id": stream_id}
-        score = _compute_match(user_tags, user_anti_tags, stream)
-        if score > 0:
-            scored.append((stream_id, stream, score))
-
-    # 7. Sort by score descending, take top 3
-    scored.sort(key=lambda x: x[2], reverse=True)
-    top = scored[:3]
-
-    # 8. Build results
-    results = []
-    for rank, (stream_id, stream, score) in enumerate(top, 1):
-        stream_with_id = {**stream, "_id": stream_id}
-        results.append({
+INTEREST_TAG_MAP: Dict[str, List[str]] = {
+    "robots": ["technology", "building", "hands_on"],
+    "ai": ["logic", "math", "technology"],
+    "money": ["strategy", "math_basic", "leadership"],
+    "writing": ["communication", "storytelling", "creativity"],
+    "gaming": ["technology", "logic", "creativity"],
+    "outdoors": ["outdoors", "physical_labor", "hands_on"],
+    "music": ["creativity", "aesthetics"],
+    "science": ["research", "curiosity", "lab_work"],
+    "sports": ["hands_on", "outdoors", "leadership"],
+    "helping": ["empathy", "helping_people"],
+}
+
+TOP_STREAMS = 3
+FALLBACK_MATCH_SCORE = 40
+MAX_BATCH_SUBMISSIONS = 1000
+
+
+class StreamMatcher:
+    """
+    Stream catalog compiled once: every tag a stream requires gets an integer
+    id, streams become rows of a 0/1 requirement matrix, and each answer maps
+    straight to its tag ids. Scoring a batch of users is two matrix products.
+    """
+
+    def __init__(self, streams: Dict[str, Dict], psychometric: List[Dict], anti_choices: List[Dict]):
+        self.stream_ids = list(streams)
+        self.streams = [{**streams[stream_id], "_id": stream_id} for stream_id in self.stream_ids]
+
+        # Only tags some stream requires can move a score; everything else is dropped on input
+        self.tag_ids: Dict[str, int] = {}
+        for stream in self.streams:
+            for tag in stream.get("required_tags", []):
+                self.tag_ids.setdefault(tag, len(self.tag_ids))
+
+        self.requirements = np.zeros((len(self.streams), len(self.tag_ids)), dtype=np.float64)
+        for row, stream in enumerate(self.streams):
+            for tag in set(stream.get("required_tags", [])):
+                self.requirements[row, self.tag_ids[tag]] = 1.0
+        self.required_counts = self.requirements.sum(axis=1)
+
+        self.anti_choice_tags = {q["id"]: self._ids(q["anti_tags"]) for q in anti_choices}
+        # question id -> per-option (tag ids, anti-tag ids)
+        self.answer_tags: Dict[int, List[tuple]] = {
+            q["id"]: [
+                (
+                    self._ids(option.get("tags", [])),
+                    self._ids(option.get("anti_tags", [])) if option.get("type") == "anti" else frozenset(),
+                )
+                for option in q["options"]
+            ]
+            for q in psychometric
+        }
+        self.subject_tags = {subject: self._ids(tags) for subject, tags in SUBJECT_TAG_MAP.items()}
+        self.interest_tags = {interest: self._ids(tags) for interest, tags in INTEREST_TAG_MAP.items()}
+
+    def _ids(self, tags: List[str]) -> frozenset:
+        return frozenset(self.tag_ids[tag] for tag in tags if tag in self.tag_ids)
+
+    def _free_text_tags(self, value: str, mapping: Dict[str, frozenset]) -> frozenset:
+        if value in mapping:
+            return mapping[value]
+        return frozenset((self.tag_ids[value],)) if value in self.tag_ids else frozenset()
+
+    def encode(self, input_data: OriginStoryInput) -> tuple:
+        """(tag ids, anti-tag ids) collected from every answer in a submission"""
+        tags, anti_tags = set(), set()
+        for ac_id in input_data.anti_choices:
+            anti_tags |= self.anti_choice_tags.get(ac_id, frozenset())
+
+        for q_id_str, option_idx in input_data.psychometric_answers.items():
+            options = self.answer_tags.get(int(q_id_str) if q_id_str.isdigit() else 0)
+            if options and 0 <= option_idx < len(options):
+                option_tags, option_anti_tags = options[option_idx]
+                tags |= option_tags
+                anti_tags |= option_anti_tags
+
+        for subject in input_data.strong_subjects:
+            tags |= self._free_text_tags(subject.lower(), self.subject_tags)
+        for interest in input_data.interests:
+            tags |= self._free_text_tags(interest.lower().strip("#").strip(), self.interest_tags)
+        return tags, anti_tags
+
+    def score_batch(self, submissions: List[OriginStoryInput]) -> np.ndarray:
+        """0-100 match scores, one row per submission and one column per stream"""
+        user_tags = np.zeros((len(submissions), len(self.tag_ids)), dtype=np.float64)
+        user_anti_tags = np.zeros_like(user_tags)
+        for row, submission in enumerate(submissions):
+            tags, anti_tags = self.encode(submission)
+            user_tags[row, list(tags)] = 1.0
+            user_anti_tags[row, list(anti_tags)] = 1.0
+
+        positive = user_tags @ self.requirements.T
+        anti = user_anti_tags @ self.requirements.T
+        counts = np.where(self.required_counts > 0, self.required_counts, 1.0)
+
+        raw = (positive / counts) * 80 - anti * 15 + np.minimum(positive, 3) * 5
+        scores = np.clip(np.trunc(raw), 0, 100)
+        scores = np.where(self.required_counts > 0, scores, 50)
+        # Two or more anti-tags hitting a stream's requirements disqualifies it
+        scores[anti >= 2] = 0
+        return scores.astype(np.int64)
+
+    def _result(self, rank: int, column: int, score: int, interests: List[str]) -> Dict:
+        stream = self.streams[column]
+        return {
             "rank": rank,
-            "stream_id": stream_id,
+            "stream_id": stream["_id"],
             "name": stream["name"],
             "emoji": stream["emoji"],
             "match_score": score,
-            "pitch": _generate_pitch(stream_with_id, input_data.interests),
+            "pitch": _generate_pitch(stream, interests),
             "salary_range": stream["salary_range"],
             "job_growth": stream["job_growth"],
             "difficulty": stream["difficulty"],
@@ -450,35 +468,41 @@ def recommend_streams(input_data: OriginStoryInput) -> List[Dict]:
             "bridge_courses": stream["bridge_courses"],
             "careers": stream["careers"],
             "subjects": stream["subjects"],
-        })
-
-    # If fewer than 3 results, pad with fallbacks
-    if len(results) < 3:
-        for stream_id, stream in STREAMS.items():
-            if stream_id not in [r["stream_id"] for r in results]:
-                stream_with_id = {**stream, "_id": stream_id}
-                results.append({
-                    "rank": len(results) + 1,
-                    "stream_id": stream_id,
-                    "name": stream["name"],
-                    "emoji": stream["emoji"],
-                    "match_score": 40,
-                    "pitch": _generate_pitch(stream_with_id, input_data.interests),
-                    "salary_range": stream["salary_range"],
-                    "job_growth": stream["job_growth"],
-                    "difficulty": stream["difficulty"],
-                    "work_life_balance": stream["work_life_balance"],
-                    "day_in_life": stream["day_in_life"],
-                    "reality_check": stream["reality_check"]["message"],
-                    "roadmap": stream["roadmap"],
-                    "bridge_courses": stream["bridge_courses"],
-                    "careers": stream["careers"],
-                    "subjects": stream["subjects"],
-                })
-                if len(results) >= 3:
+        }
+
+    def rank(self, scores: np.ndarray, interests: List[str]) -> List[Dict]:
+        """Top streams for one score row, padded with fallbacks in catalog order"""
+        # Stable sort keeps catalog order between equal scores
+        order = np.argsort(-scores, kind="stable")
+        top = [int(column) for column in order[:TOP_STREAMS] if scores[column] > 0]
+        results = [
+            self._result(rank, column, int(scores[column]), interests)
+            for rank, column in enumerate(top, 1)
+        ]
+        if len(results) < TOP_STREAMS:
+            chosen = set(top)
+            for column in range(len(self.streams)):
+                if column in chosen:
+                    continue
+                results.append(self._result(len(results) + 1, column, FALLBACK_MATCH_SCORE, interests))
+                if len(results) >= TOP_STREAMS:
                     break
+        return results
+
+    def recommend_batch(self, submissions: List[OriginStoryInput]) -> List[List[Dict]]:
+        if not submissions:
+            return []
+        scores = self.score_batch(submissions)
+        return [self.rank(row, submission.interests) for row, submission in zip(scores, submissions)]
+
+
+def recommend_streams(input_data: OriginStoryInput) -> List[Dict]:
+    """Run the full matching engine and return ranked recommendations."""
+    return stream_matcher.recommend_batch([input_data])[0]
 
-    return results
+
+# Global instance
+stream_matcher = StreamMatcher(STREAMS, PSYCHOMETRIC_QUESTIONS, ANTI_CHOICE_QUESTIONS)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -506,13 +530,31 @@ def get_origin_story_questions():
 @router.post("/recommend")
 def get_stream_recommendations(
     input_data: OriginStoryInput,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     """Run the matching engine and return top 3 stream recommendations."""
     results = recommend_streams(input_data)
     return {"recommendations": results, "total_streams_analyzed": len(STREAMS)}
 
 
+@router.post("/recommend/batch")
+def get_stream_recommendations_batch(
+    batch: OriginStoryBatchInput,
+    current_user: UserPrincipal = Depends(get_current_principal),
+):
+    """Score many quiz submissions in one pass; results come back in input order."""
+    if len(batch.submissions) > MAX_BATCH_SUBMISSIONS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SUBMISSIONS} submissions per request")
+    results = stream_matcher.recommend_batch(batch.submissions)
+    return {
+        "results": [
+            {"index": index, "recommendations": recommendations}
+            for index, recommendations in enumerate(results)
+        ],
+        "total_streams_analyzed": len(STREAMS),
+    }
+
+
 @router.get("/stream/{stream_id}")
 def get_stream_detail(stream_id: str):
     """Get detailed info about a specific stream."""
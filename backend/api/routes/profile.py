@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
@@ -10,15 +10,19 @@ from models.schemas import (
     SkillCreate,
     SkillResponse,
     ProjectCreate,
-    ProjectResponse
+    ProjectResponse,
+    UserPrincipal
 )
-from auth.jwt_handler import get_current_user
+from auth.jwt_handler import get_current_user_sync, get_current_principal, invalidate_principal
 from ai.resume_generator import export_resume_pdf
+from ai.resume_parser import ResumeTooLarge, file_kind, ingest_resume, spool_upload
+from ai.resume_batch import collect_uploads, parse_batch
+from utils.streaming import ndjson_line, ndjson_response
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
 @router.get("/", response_model=ProfileResponse)
-def get_profile(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_profile(current_user: User = Depends(get_current_user_sync), db: Session = Depends(get_db)):
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
@@ -27,7 +31,7 @@ def get_profile(current_user: User = Depends(get_current_user), db: Session = De
 @router.put("/", response_model=ProfileResponse)
 def update_profile(
     profile_data: ProfileUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
@@ -40,12 +44,13 @@ def update_profile(
     
     db.commit()
     db.refresh(profile)
+    invalidate_principal(current_user.email)
     return profile
 
 @router.post("/skills", response_model=SkillResponse)
 def add_skill(
     skill_data: SkillCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     # Check if skill exists
@@ -69,13 +74,13 @@ def add_skill(
     return skill
 
 @router.get("/skills", response_model=List[SkillResponse])
-def get_user_skills(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_user_skills(current_user: User = Depends(get_current_user_sync), db: Session = Depends(get_db)):
     return current_user.skills
 
 @router.delete("/skills/{skill_id}")
 def remove_skill(
     skill_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     stmt = user_skills.delete().where(
@@ -89,7 +94,7 @@ def remove_skill(
 @router.post("/projects", response_model=ProjectResponse)
 def add_project(
     project_data: ProjectCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     project = Project(**project_data.dict(), user_id=current_user.id)
@@ -99,13 +104,13 @@ def add_project(
     return project
 
 @router.get("/projects", response_model=List[ProjectResponse])
-def get_user_projects(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_user_projects(current_user: User = Depends(get_current_user_sync), db: Session = Depends(get_db)):
     return current_user.projects
 
 @router.delete("/projects/{project_id}")
 def delete_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     project = db.query(Project).filter(
@@ -120,7 +125,7 @@ def delete_project(
     return {"message": "Project deleted successfully"}
 
 @router.get("/export-resume")
-def export_resume(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+def export_resume(current_user: User = Depends(get_current_user_sync), db: Session = Depends(get_db)):
     """Export user's Atlas Card as a PDF resume"""
     # Get profile
     profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
@@ -176,3 +181,50 @@ def export_resume(current_user: User = Depends(get_current_user), db: Session =
             "Content-Disposition": f"attachment; filename={filename}"
         }
     )
+
+
+@router.post("/parse-resume")
+async def parse_resume(
+    file: UploadFile = File(...),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """
+    Extract structured profile data from an uploaded PDF/DOCX resume.
+    Nothing is saved; the client reviews the result before updating the profile.
+    """
+    try:
+        file_kind(file.filename)
+        spool = await spool_upload(file)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        return await ingest_resume(spool)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        spool.close()
+
+
+@router.post("/parse-resume/batch")
+async def parse_resume_batch(
+    files: List[UploadFile] = File(...),
+    current_user: UserPrincipal = Depends(get_current_principal)
+):
+    """
+    Parse a cohort of resumes (PDF/DOCX files and/or ZIP archives of them).
+    Streams NDJSON: one "result" line per file as it finishes (duplicates and
+    unreadable files included), then a "summary" line. Nothing is saved.
+    """
+    try:
+        spools, rejected = await collect_uploads(files)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    async def lines():
+        async for line in parse_batch(spools, rejected):
+            yield ndjson_line(line)
+
+    return ndjson_response(lines())
@@ -2,14 +2,21 @@
 Learning Roadmap API Routes
 """
 
-from fastapi import APIRouter, HTTPException, Body, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Body, Depends, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
-from ai.roadmap_generator import roadmap_generator
-from config import get_db
-from models.database import User, Profile
-from auth.jwt_handler import get_current_user
+from ai.roadmap_generator import ROADMAP_LATENCY_BUDGET, roadmap_generator
+from config import AsyncSessionLocal, get_async_db
+from models.database import Profile
+from models.schemas import UserPrincipal
+from auth.jwt_handler import get_current_principal
+from utils.job_queue import job_queue, submit_job_response
+from utils.roadmap_store import (
+    EMPTY_PROGRESS, find_milestone_id, load_progress, load_roadmap,
+    milestone_dict, replace_untouched_roadmap, roadmap_dict, save_roadmap, set_milestone,
+)
 
 router = APIRouter(prefix="/api/roadmap", tags=["roadmap"])
 
@@ -36,12 +43,19 @@ class GenerateRoadmapRequest(BaseModel):
 
 
 class UpdateMilestoneRequest(BaseModel):
-    roadmap: Dict[str, Any] = Field(..., description="Complete roadmap object")
+    roadmap: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Deprecated and ignored; the stored roadmap is updated (410 if there is none)",
+    )
     phase_number: int = Field(..., description="Phase number (1-indexed)")
     milestone_week: int = Field(..., description="Milestone week number")
     completed: bool = Field(..., description="Completion status")
 
 
+class MilestonePatch(BaseModel):
+    completed: bool = Field(..., description="Completion status")
+
+
 class RoadmapResponse(BaseModel):
     success: bool
     roadmap: Dict[str, Any]
@@ -53,37 +67,59 @@ class ProgressResponse(BaseModel):
     progress: Dict[str, Any]
 
 
-# Routes
+class MilestoneResponse(BaseModel):
+    success: bool
+    milestone: Dict[str, Any]
+    progress: Dict[str, Any]
+    message: Optional[str] = None
+
+
+async def _get_profile(db: AsyncSession, user_id: int) -> Optional[Profile]:
+    result = await db.execute(select(Profile).where(Profile.user_id == user_id))
+    return result.scalars().first()
+
+
+async def _update_milestone(db: AsyncSession, user_id: int, milestone_id: int, completed: bool) -> Dict[str, Any]:
+    """Toggle one milestone; XP is only awarded when it actually flips to completed"""
+    updated = await set_milestone(db, user_id, milestone_id, completed)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Milestone not found")
+    milestone, changed = updated
+    if changed and completed:
+        await db.execute(
+            update(Profile).where(Profile.user_id == user_id).values(xp=func.coalesce(Profile.xp, 0) + 50)
+        )
+    await db.commit()
+    return milestone_dict(milestone)
+
+
 # Routes
 @router.get("/", response_model=RoadmapResponse)
 async def get_user_roadmap(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's roadmap. Generates one if it doesn't exist.
     """
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    profile = await _get_profile(db, current_user.id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
         
-    if profile.roadmap:
-        return RoadmapResponse(success=True, roadmap=profile.roadmap)
+    stored = await load_roadmap(db, current_user.id)
+    if stored is not None:
+        return RoadmapResponse(success=True, roadmap=roadmap_dict(stored))
         
     # Generate default roadmap if none exists
     target_role = profile.target_roles[0] if profile.target_roles else "Full Stack Developer"
     
     try:
-        roadmap = roadmap_generator.generate_roadmap(
+        roadmap = await _generate_and_save(db, current_user.id, GenerateRoadmapRequest(
             career_goal=target_role,
             current_level="beginner", # Default, could be inferred from profile
             time_commitment="moderate",
             preferences={}
-        )
-        
-        # Save to profile
-        profile.roadmap = roadmap
-        db.commit()
+        ))
         
         return RoadmapResponse(
             success=True, 
@@ -94,28 +130,75 @@ async def get_user_roadmap(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _generate_and_save(
+    db: AsyncSession,
+    user_id: int,
+    request: GenerateRoadmapRequest,
+    budget_seconds: Optional[float] = ROADMAP_LATENCY_BUDGET,
+) -> Dict[str, Any]:
+    """
+    Generate within the latency budget and save for users with a profile.
+    A fallback roadmap served on a blown budget is replaced in the background
+    once the LLM structure arrives.
+    """
+    roadmap, upgrade = await roadmap_generator.generate_roadmap_within(
+        career_goal=request.career_goal,
+        current_level=request.current_level,
+        time_commitment=request.time_commitment,
+        preferences=request.preferences or {},
+        budget_seconds=budget_seconds,
+    )
+    
+    if await _get_profile(db, user_id):
+        stored = await save_roadmap(db, user_id, roadmap)
+        await db.commit()
+        if upgrade is not None:
+            roadmap_generator.run_in_background(_apply_upgrade(user_id, stored.id, upgrade))
+        roadmap = roadmap_dict(stored)
+    elif upgrade is not None:
+        upgrade.cancel()
+    return roadmap
+
+
+async def _apply_upgrade(user_id: int, roadmap_id: int, upgrade) -> None:
+    roadmap = await upgrade
+    if roadmap is None:
+        return
+    async with AsyncSessionLocal() as db:
+        # Leave it alone if the user regenerated or started completing milestones
+        if await replace_untouched_roadmap(db, user_id, roadmap_id, roadmap):
+            await db.commit()
+
+
+async def _roadmap_job(user_id: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    request = GenerateRoadmapRequest(**params)
+    async with AsyncSessionLocal() as db:
+        roadmap = await _generate_and_save(db, user_id, request, budget_seconds=None)
+    return RoadmapResponse(
+        success=True,
+        roadmap=roadmap,
+        message=f"Roadmap generated successfully for {request.career_goal}"
+    ).dict()
+
+
+job_queue.register("roadmap", _roadmap_job)
+
+
 @router.post("/generate", response_model=RoadmapResponse)
 async def generate_roadmap(
     request: GenerateRoadmapRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background: bool = False,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Generate and SAVE a personalized learning roadmap
+    Generate and SAVE a personalized learning roadmap.
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
     """
+    if background:
+        return await submit_job_response(current_user.id, "roadmap", request.dict())
     try:
-        roadmap = roadmap_generator.generate_roadmap(
-            career_goal=request.career_goal,
-            current_level=request.current_level,
-            time_commitment=request.time_commitment,
-            preferences=request.preferences or {}
-        )
-        
-        # Save to profile
-        profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-        if profile:
-            profile.roadmap = roadmap
-            db.commit()
+        roadmap = await _generate_and_save(db, current_user.id, request)
         
         return RoadmapResponse(
             success=True,
@@ -130,45 +213,66 @@ async def generate_roadmap(
         )
 
 
-@router.post("/update-milestone")
+@router.patch("/milestones/{milestone_id}", response_model=MilestoneResponse)
+async def patch_milestone(
+    milestone_id: int,
+    request: MilestonePatch,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Update one milestone by id; returns the milestone and fresh progress
+    """
+    milestone = await _update_milestone(db, current_user.id, milestone_id, request.completed)
+    return MilestoneResponse(
+        success=True,
+        milestone=milestone,
+        progress=await load_progress(db, current_user.id) or EMPTY_PROGRESS,
+        message="Milestone updated successfully"
+    )
+
+
+@router.post("/update-milestone", deprecated=True)
 async def update_milestone(
     request: UpdateMilestoneRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Update milestone completion status in stored roadmap
+    Update milestone completion status by phase number and week.
+    Deprecated: use PATCH /milestones/{id}, which doesn't send or return the whole roadmap.
+    A posted `roadmap` is no longer applied; only the stored roadmap is updated.
     """
+    response.headers["Deprecation"] = "true"
     try:
-        # We ignore request.roadmap and use the stored one to ensure security/consistency
-        profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-        if not profile or not profile.roadmap:
+        milestone_id = await find_milestone_id(db, current_user.id, request.phase_number, request.milestone_week)
+        if milestone_id is not None:
+            await _update_milestone(db, current_user.id, milestone_id, request.completed)
+
+        stored = await load_roadmap(db, current_user.id)
+        if stored is None:
+            if request.roadmap is not None:
+                # Old clients kept the roadmap client-side; applying it silently is no longer supported
+                raise HTTPException(
+                    status_code=410,
+                    detail="Posting a roadmap to update-milestone is no longer supported; "
+                           "generate a roadmap, then use PATCH /milestones/{id}",
+                    headers={"Deprecation": "true"},
+                )
             raise HTTPException(status_code=404, detail="Roadmap not found")
-            
-        current_roadmap = dict(profile.roadmap) # Ensure it's a dict
-        
-        updated_roadmap = roadmap_generator.update_milestone(
-            roadmap=current_roadmap,
-            phase_number=request.phase_number,
-            milestone_week=request.milestone_week,
-            completed=request.completed
-        )
-        
-        # Save updated roadmap
-        profile.roadmap = updated_roadmap
-        
-        # Award XP if completed
-        if request.completed:
-            profile.xp = (profile.xp or 0) + 50
-            
-        db.commit()
         
+        message = "Milestone updated successfully"
+        if request.roadmap is not None:
+            message += "; the posted roadmap was ignored in favour of the stored one"
         return RoadmapResponse(
             success=True,
-            roadmap=updated_roadmap,
-            message="Milestone updated successfully"
+            roadmap=roadmap_dict(stored),
+            message=message
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -178,22 +282,18 @@ async def update_milestone(
 
 @router.get("/progress", response_model=ProgressResponse)
 async def get_progress(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get progress for stored roadmap
     """
     try:
-        profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
-        if not profile or not profile.roadmap:
-            return ProgressResponse(success=True, progress={"percent_complete": 0, "completed_milestones": 0, "total_milestones": 0})
-            
-        progress = roadmap_generator.get_progress(profile.roadmap)
+        progress = await load_progress(db, current_user.id)
         
         return ProgressResponse(
             success=True,
-            progress=progress
+            progress=progress or EMPTY_PROGRESS
         )
     
     except Exception as e:
@@ -206,60 +306,9 @@ async def get_progress(
 @router.get("/templates")
 async def get_templates():
     """Get popular roadmap templates"""
-    templates = [
-        {
-            "id": "fullstack_web",
-            "title": "Full Stack Web Developer",
-            "description": "Master frontend and backend development",
-            "duration_weeks": 24,
-            "level": "beginner",
-            "popular": True
-        },
-        {
-            "id": "data_scientist",
-            "title": "Data Scientist",
-            "description": "Learn data analysis, ML, and statistics",
-            "duration_weeks": 28,
-            "level": "beginner",
-            "popular": True
-        },
-        {
-            "id": "ml_engineer",
-            "title": "Machine Learning Engineer",
-            "description": "Build and deploy ML models",
-            "duration_weeks": 32,
-            "level": "intermediate",
-            "popular": True
-        },
-        {
-            "id": "cloud_architect",
-            "title": "Cloud Solutions Architect",
-            "description": "Design and implement cloud infrastructure",
-            "duration_weeks": 20,
-            "level": "intermediate",
-            "popular": False
-        },
-        {
-            "id": "devops_engineer",
-            "title": "DevOps Engineer",
-            "description": "CI/CD, automation, and infrastructure",
-            "duration_weeks": 22,
-            "level": "intermediate",
-            "popular": False
-        },
-        {
-            "id": "mobile_dev",
-            "title": "Mobile App Developer",
-            "description": "Build iOS and Android applications",
-            "duration_weeks": 20,
-            "level": "beginner",
-            "popular": False
-        }
-    ]
-    
     return {
         "success": True,
-        "templates": templates
+        "templates": roadmap_generator.template_catalog()
     }
 
 
@@ -4,12 +4,16 @@ ESCO-powered skill search, soft-skills bootcamp, GitHub import
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional, Dict
-from config import get_db
-from models.database import User, Profile, Skill, user_skills
-from auth.jwt_handler import get_current_user
+from config import get_db, get_async_db
+from models.database import User, Profile
+from models.schemas import UserPrincipal
+from auth.jwt_handler import get_current_principal, get_current_user_sync
+from utils.skill_attach import attach_skills_async
 
 router = APIRouter(prefix="/skills", tags=["Skills"])
 
@@ -19,6 +23,10 @@ class SkillSearchRequest(BaseModel):
     limit: int = 10
 
 
+class RoleSkillsBulkRequest(BaseModel):
+    roles: List[str]
+
+
 class GitHubImportRequest(BaseModel):
     username: str
 
@@ -35,11 +43,11 @@ class SoftSkillAssessment(BaseModel):
 
 # ESCO skill search
 @router.post("/search")
-def search_skills(request: SkillSearchRequest):
+async def search_skills(request: SkillSearchRequest):
     """Search for skills using ESCO API"""
     try:
         from ai.esco_client import search_skills as esco_search
-        results = esco_search(request.query, limit=request.limit)
+        results = await esco_search(request.query, limit=request.limit)
         return {"skills": results}
     except Exception as e:
         # Fallback mock results
@@ -50,12 +58,22 @@ def search_skills(request: SkillSearchRequest):
         }
 
 
+@router.post("/esco/bulk")
+async def get_roles_skills(request: RoleSkillsBulkRequest):
+    """Get required skills for several roles from ESCO in one call"""
+    if len(request.roles) > 25:
+        raise HTTPException(status_code=400, detail="At most 25 roles per request")
+    from ai.esco_client import get_skills_for_roles
+    results = await get_skills_for_roles(request.roles)
+    return {"roles": [{"role": role, "skills": skills} for role, skills in results.items()]}
+
+
 @router.get("/esco/{role}")
-def get_role_skills(role: str):
+async def get_role_skills(role: str):
     """Get required skills for a role from ESCO"""
     try:
         from ai.esco_client import get_skills_for_role
-        skills = get_skills_for_role(role)
+        skills = await get_skills_for_role(role)
         return {"role": role, "skills": skills}
     except Exception as e:
         return {"role": role, "skills": [], "error": str(e)}
@@ -65,8 +83,8 @@ def get_role_skills(role: str):
 @router.post("/github-import")
 async def import_github_skills_route(
     request: GitHubImportRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Import skills from GitHub profile"""
     from ai.github_integration import import_github_skills
@@ -76,37 +94,16 @@ async def import_github_skills_route(
         raise HTTPException(status_code=404, detail=f"GitHub user '{request.username}' not found or API error")
 
     # Auto-add extracted skills to user profile
-    added_skills = []
-    for skill_name in result.get("skills", [])[:20]:
-        skill = db.query(Skill).filter(Skill.name == skill_name).first()
-        if not skill:
-            skill = Skill(name=skill_name, category="technical")
-            db.add(skill)
-            db.flush()
-
-        existing = db.execute(
-            user_skills.select().where(
-                user_skills.c.user_id == current_user.id,
-                user_skills.c.skill_id == skill.id,
-            )
-        ).first()
-        if not existing:
-            db.execute(
-                user_skills.insert().values(
-                    user_id=current_user.id,
-                    skill_id=skill.id,
-                    proficiency=0.6,
-                    source="github",
-                )
-            )
-            added_skills.append(skill_name)
+    added_skills = await attach_skills_async(
+        db, current_user.id, result.get("skills", [])[:20], proficiency=0.6, source="github"
+    )
 
     # Award XP
-    profile = db.query(Profile).filter(Profile.user_id == current_user.id).first()
+    profile = (await db.execute(select(Profile).where(Profile.user_id == current_user.id))).scalars().first()
     if profile:
         profile.xp = (profile.xp or 0) + 200
 
-    db.commit()
+    await db.commit()
 
     return {
         "github_profile": result.get("profile"),
@@ -120,18 +117,17 @@ async def import_github_skills_route(
 
 # Experience translator
 @router.post("/translate-experience")
-def translate_experience_route(
+async def translate_experience_route(
     request: ExperienceTranslateRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     """Translate non-traditional experience into professional skills"""
     from ai.experience_translator import translate_experience
 
-    result = translate_experience(
-        experience_type=request.experience_type,
-        description=request.description,
-        duration=request.duration,
-    )
+    raw_experience = f"{request.experience_type}: {request.description}"
+    if request.duration:
+        raw_experience += f" ({request.duration})"
+    result = await translate_experience(raw_experience)
 
     return result
 
@@ -214,7 +210,7 @@ def get_soft_skill_module(module_id: str):
 @router.post("/soft-skills/assess")
 def assess_soft_skills(
     assessment: SoftSkillAssessment,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_principal),
 ):
     """Assess user's soft skills based on self-evaluation"""
     scores = assessment.answers
@@ -243,7 +239,7 @@ def assess_soft_skills(
 # Gamification stats
 @router.get("/gamification")
 def get_gamification_stats(
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db),
 ):
     """Get gamification stats for current user"""
@@ -390,7 +386,7 @@ class AssessmentSubmission(BaseModel):
 def submit_assessment(
     assessment_id: int,
     submission: AssessmentSubmission,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_user_sync),
     db: Session = Depends(get_db)
 ):
     """Submit assessment and calculate score"""
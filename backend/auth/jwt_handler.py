@@ -1,27 +1,59 @@
-import bcrypt
 from datetime import datetime, timedelta
 from typing import Optional, Union
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from config import get_settings, get_db
-from models.database import User
-from models.schemas import TokenData
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+from config import get_settings, get_db, get_async_db
+from models.database import User, Skill, user_skills
+from models.schemas import TokenData, UserPrincipal
+from ai.llm_cache import MemoryLRUCache
+from auth.password_hasher import PasswordHasher, PasswordHasherBusy
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Global instance: token subject (email) -> UserPrincipal
+principal_cache = MemoryLRUCache(settings.auth_principal_cache_max_entries)
+
+# Global instance
+password_hasher = PasswordHasher(
+    rounds=settings.bcrypt_rounds,
+    max_workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'), 
-        hashed_password.encode('utf-8') if isinstance(hashed_password, str) else hashed_password
-    )
+    return password_hasher.verify_sync(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return password_hasher.hash_sync(password)
+
+def _hasher_busy_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": str(settings.password_hash_retry_after_seconds)},
+    )
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the bcrypt pool; 503 with Retry-After when saturated"""
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except PasswordHasherBusy:
+        raise _hasher_busy_exception()
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash on the bcrypt pool; 503 with Retry-After when saturated"""
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise _hasher_busy_exception()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None) -> str:
     to_encode = data.copy()
@@ -43,17 +75,92 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def invalidate_principal(email: str):
+    """Drop a cached principal; call after changing the user's name, email or password"""
+    principal_cache.delete(email)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserPrincipal:
+    """
+    id/email/name of the token's user, served from principal_cache when warm.
+    The session is only opened on a cache miss.
+    """
+    token_data = decode_access_token(token)
+    if token_data is None:
+        raise _credentials_exception()
+
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        result = await db.execute(
+            select(User.id, User.email, User.full_name, User.created_at)
+            .where(User.email == token_data.email)
+        )
+        row = result.first()
+        if row is None:
+            raise _credentials_exception()
+        principal = UserPrincipal(id=row.id, email=row.email, full_name=row.full_name, created_at=row.created_at)
+        principal_cache.set(token_data.email, principal, settings.auth_principal_cache_ttl_seconds)
+    return principal
+
+def get_current_user_sync(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """The token's User on the request's sync session, for def routes using get_db that mutate it"""
     token_data = decode_access_token(token)
     if token_data is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     user = db.query(User).filter(User.email == token_data.email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    return user
+
+async def load_user_aggregate(db: AsyncSession, email: Optional[str] = None, user_id: Optional[int] = None) -> Optional[User]:
+    """
+    Load a user with profile, projects and skills in two queries:
+    user + profile + projects via joins, then skills with their
+    user_skills proficiency/source. Accessing current_user.skills,
+    .profile or .projects afterwards never triggers a lazy load.
+    """
+    result = await db.execute(
+        select(User)
+        .options(joinedload(User.profile), joinedload(User.projects))
+        .where(User.email == email if user_id is None else User.id == user_id)
+    )
+    user = result.unique().scalars().first()
+    if user is None:
+        return None
+
+    result = await db.execute(
+        select(Skill, user_skills.c.proficiency, user_skills.c.source)
+        .join(user_skills, user_skills.c.skill_id == Skill.id)
+        .where(user_skills.c.user_id == user.id)
+    )
+    rows = result.all()
+    set_committed_value(user, "skills", [skill for skill, _, _ in rows])
+    user.skill_entries = [
+        {
+            "id": skill.id,
+            "name": skill.name,
+            "category": skill.category,
+            "proficiency": proficiency,
+            "source": source,
+        }
+        for skill, proficiency, source in rows
+    ]
+    return user
+
+async def get_current_user_aggregate(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    """The token's User with profile, skills and projects eagerly loaded, for async routes that read them"""
+    token_data = decode_access_token(token)
+    if token_data is None:
+        raise _credentials_exception()
+    
+    user = await load_user_aggregate(db, token_data.email)
+    if user is None:
+        raise _credentials_exception()
     return user
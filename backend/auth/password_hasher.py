@@ -0,0 +1,127 @@
+"""
+Password Hasher
+Runs bcrypt hash/verify on a small dedicated thread pool (bcrypt releases
+the GIL) so logins never block the event loop. Work beyond the pool plus a
+bounded queue is rejected so callers can answer 503 instead of piling up.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import bcrypt
+
+# bcrypt only reads the first 72 bytes of a password; bcrypt>=5 raises ValueError past that
+MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+def bcrypt_cost(hashed_password: str) -> Optional[int]:
+    """Cost factor of a $2b$ hash, or None if it can't be parsed"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Bounded bcrypt worker pool with queue-depth metrics"""
+
+    def __init__(self, rounds: int = 12, max_workers: int = 4, max_queue: int = 32):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._max_pending = 0
+        self._rejected = 0
+        self._completed = 0
+        self._busy_total = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _submit(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PasswordHasherBusy()
+            self._pending += 1
+            self._max_pending = max(self._max_pending, self._pending)
+
+        def run():
+            with self._lock:
+                self._running += 1
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._busy_total += time.perf_counter() - start
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), run)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def hash_sync(self, password: str) -> str:
+        """Raises ValueError for passwords over MAX_PASSWORD_BYTES"""
+        encoded = password.encode("utf-8")
+        if len(encoded) > MAX_PASSWORD_BYTES:
+            raise ValueError(f"Password must be at most {MAX_PASSWORD_BYTES} bytes")
+        return bcrypt.hashpw(encoded, bcrypt.gensalt(self.rounds)).decode("utf-8")
+
+    @staticmethod
+    def verify_sync(password: str, hashed_password: str) -> bool:
+        """False for passwords that could never have been hashed, or unreadable hashes"""
+        encoded = password.encode("utf-8")
+        if len(encoded) > MAX_PASSWORD_BYTES:
+            return False
+        try:
+            return bcrypt.checkpw(
+                encoded,
+                hashed_password.encode("utf-8") if isinstance(hashed_password, str) else hashed_password,
+            )
+        except ValueError:
+            return False
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit(self.verify_sync, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """True when a stored hash was made with a different cost factor"""
+        return bcrypt_cost(hashed_password) != self.rounds
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "rounds": self.rounds,
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "max_pending": self._max_pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_ms": round(self._busy_total / self._completed * 1000, 1) if self._completed else 0.0,
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
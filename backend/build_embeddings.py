@@ -0,0 +1,56 @@
+"""
+Precompute embedding artifacts for the platform guide and skill gap analyzer
+Run this at deploy/startup time against the real database so servers start
+without re-encoding anything (the skill vocabulary comes from the careers tables)
+"""
+import sys
+import config
+from config import SessionLocal, engine, Base, settings
+from models.database import CatalogVersion, Career, CareerRelation
+from ai import embedding_store
+from ai.career_catalog import ensure_career_columns, load_snapshot
+from ai.platform_guide import platform_guide, FEATURE_ARTIFACT
+from ai.skill_gap_analyzer import SKILL_ARTIFACT
+
+print(f"Building embedding artifacts in {embedding_store.ARTIFACT_DIR} ...")
+
+# config falls back to a local SQLite file when DATABASE_URL is unreachable; artifacts built
+# from that file would not match the real catalog, so fail the deploy instead
+if config._use_sqlite:
+    print(f"❌ Configured database is unreachable ({settings.database_url.split('@')[-1]}); not building from the SQLite fallback")
+    sys.exit(1)
+
+# Read the catalog directly: the shared catalog falls back to built-in careers when the DB fails
+Base.metadata.create_all(bind=engine, tables=[Career.__table__, CareerRelation.__table__, CatalogVersion.__table__])
+ensure_career_columns(engine)
+db = SessionLocal()
+try:
+    snapshot = load_snapshot(db)
+finally:
+    db.close()
+print(f"   Career catalog v{snapshot.version} from {snapshot.source} ({len(snapshot)} careers)")
+
+vocabulary = snapshot.skill_vocabulary
+artifacts = {
+    FEATURE_ARTIFACT: platform_guide.feature_artifact_source(),
+    SKILL_ARTIFACT: (vocabulary, vocabulary),
+}
+
+failed = False
+for name, (ids, texts) in artifacts.items():
+    try:
+        if embedding_store.load_artifact(name, ids, texts) is not None:
+            print(f"   - {name}: up to date ({len(ids)} items)")
+            continue
+        path = embedding_store.build_artifact(name, ids, texts)
+        if path is None:
+            print(f"❌ {name}: embedding model unavailable")
+            failed = True
+            continue
+        stale = embedding_store.prune_artifacts(name, keep=[path])
+        print(f"✅ {name}: wrote {path} ({len(ids)} items, pruned {len(stale)} stale files)")
+    except Exception as e:
+        print(f"❌ {name}: {e}")
+        failed = True
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,40 @@
+"""
+Precompile roadmap templates, one LLM structure per (career domain, level)
+Run this at deploy time so common roadmap goals never wait on the LLM
+Usage: python build_roadmap_templates.py [--refresh]
+"""
+import asyncio
+import sys
+from config import engine, async_engine, Base
+from models.database import RoadmapTemplate
+from ai.roadmap_generator import roadmap_generator
+
+refresh = "--refresh" in sys.argv[1:]
+
+if not roadmap_generator.llm:
+    print("❌ OPENAI_API_KEY is not configured; templates can't be compiled")
+    sys.exit(1)
+
+
+async def main() -> bool:
+    Base.metadata.create_all(bind=engine, tables=[RoadmapTemplate.__table__])
+    store = roadmap_generator.templates
+    await store.load()
+
+    failed = False
+    for domain, level in store.all_keys():
+        if store.cached(domain, level) is not None and not refresh:
+            print(f"   - {domain}/{level}: up to date")
+            continue
+        structure = await store.compile(domain, level)
+        if structure is None:
+            print(f"❌ {domain}/{level}: LLM returned no usable structure")
+            failed = True
+        else:
+            print(f"✅ {domain}/{level}: {len(structure['phases'])} phases")
+    await roadmap_generator.llm.aclose()
+    await async_engine.dispose()
+    return not failed
+
+
+sys.exit(0 if asyncio.run(main()) else 1)
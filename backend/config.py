@@ -1,24 +1,89 @@
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from utils.engine_factory import create_db_engine, create_async_db_engine, split_pool_budget, to_async_url
 
 class Settings(BaseSettings):
     database_url: str
+    async_database_url: str = ""  # empty derives asyncpg/aiosqlite from database_url
     supabase_url: str = ""
     supabase_anon_key: str = ""
     supabase_service_key: str = ""
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    auth_principal_cache_ttl_seconds: float = 60.0  # bounds staleness across workers
+    auth_principal_cache_max_entries: int = 10000
+
+    # Password hashing (bcrypt runs on its own bounded pool)
+    bcrypt_rounds: int = 12  # stored hashes with another cost are rehashed on login
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 32  # beyond workers + queue, requests get 503
+    password_hash_retry_after_seconds: int = 2
     openai_api_key: str = ""
     onet_api_key: str = ""
     github_token: str = ""
     esco_api_url: str = "https://ec.europa.eu/esco/api"
+    esco_mode: str = "auto"  # "api", "offline" (snapshot only) or "auto" (snapshot if present)
+    esco_snapshot_path: str = ""  # empty uses backend/data/esco_snapshot.db
+    esco_cache_ttl_seconds: float = 86400.0
+    esco_max_connections: int = 20
     environment: str = "development"
-    
+
+    # Database pool ("auto" picks transaction_pooler for pgbouncer on port 6543)
+    db_pool_mode: str = "auto"  # auto | queue | null | transaction_pooler
+    db_pool_size: int = 5  # per process, shared by the sync and async engines
+    db_max_overflow: int = 10  # per process, shared likewise
+    db_async_pool_share: float = 0.5  # fraction of the pool budget given to the async engine
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_connect_timeout: int = 15
+
+    # LLM gateway
+    llm_default_model: str = "gpt-4o-mini"
+    llm_timeout_seconds: float = 30.0
+    llm_max_retries: int = 3
+    llm_max_connections: int = 50
+    llm_model_concurrency: int = 16
+    llm_cache_max_entries: int = 1024
+    llm_cache_sqlite_path: str = ""  # empty disables the on-disk tier
+
+    # Resume ingestion
+    resume_max_upload_mb: int = 10
+    resume_max_pages: int = 40  # pages past this are ignored
+    resume_extract_timeout_seconds: float = 20.0  # parse whatever pages finished by then
+    resume_llm_max_chars: int = 12000  # section text sent to the LLM, split across sections
+    resume_batch_max_files: int = 500
+    resume_batch_max_upload_mb: int = 200  # total resume bytes per batch, after unzipping
+    resume_batch_llm_concurrency: int = 8  # LLM structuring calls in flight per batch
+
+    # Shared process pool for CPU-bound work (0 = one worker per CPU)
+    process_pool_workers: int = 0
+
+    # Bulk job-posting verification (/career/verify-jobs)
+    verify_jobs_max_body_mb: int = 50
+
+    # Roadmap generation (slower LLM structures arrive later as an upgrade)
+    roadmap_latency_budget_seconds: float = 3.0
+    roadmap_llm_timeout_seconds: float = 20.0
+
+    # Career catalog (seconds between version checks; 0 disables background refresh)
+    career_catalog_refresh_seconds: float = 60.0
+
+    # Background jobs (slow AI generations run on an in-process worker pool)
+    job_workers: int = 4
+    job_max_pending: int = 500  # beyond this, submissions get 503
+    job_timeout_seconds: float = 300.0  # handlers running longer than this are failed
+    job_heartbeat_seconds: float = 15.0  # running jobs silent for 3 beats are failed as orphans
+    job_poll_interval_seconds: float = 1.0  # SSE checks for jobs updated by other processes
+
+    # Embeddings
+    embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_artifact_dir: str = ""  # empty uses backend/artifacts/embeddings
+
     class Config:
         env_file = ".env"
 
@@ -29,25 +94,31 @@ def get_settings():
 settings = get_settings()
 
 # Database setup
-# Use NullPool for Supabase Transaction Pooler (Port 6543) to avoid connection pooling issues
-# This is recommended for serverless/transient connections
+# Pool mode and sizing come from settings; see utils/engine_factory.py
 import os as _os
 
 _use_sqlite = False
 
+# One connection budget per process, split so sync + async never exceed it
+_sync_pool, _async_pool = split_pool_budget(
+    settings.db_pool_size, settings.db_max_overflow, settings.db_async_pool_share
+)
+
+def _pool_options(budget: dict) -> dict:
+    return dict(
+        pool_mode=settings.db_pool_mode,
+        **budget,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_timeout=settings.db_connect_timeout,
+    )
+
+def _build_engine(url: str):
+    return create_db_engine(url, **_pool_options(_sync_pool))
+
 try:
-    if "supabase.com" in settings.database_url:
-        engine = create_engine(
-            settings.database_url,
-            poolclass=NullPool,
-            connect_args={
-                "connect_timeout": 15,  # 15 second connection timeout
-            },
-        )
-    elif settings.database_url.startswith("sqlite"):
-        engine = create_engine(settings.database_url, connect_args={"check_same_thread": False})
-    else:
-        engine = create_engine(settings.database_url)
+    engine = _build_engine(settings.database_url)
     
     # Quick connectivity test with timeout
     from sqlalchemy import text as _text
@@ -60,15 +131,29 @@ except Exception as e:
 
 if _use_sqlite:
     _db_path = _os.path.join(_os.path.dirname(__file__), "atlas_ai.db")
-    engine = create_engine(f"sqlite:///{_db_path}", connect_args={"check_same_thread": False})
+    engine = _build_engine(f"sqlite:///{_db_path}")
     print(f"📁 Using local SQLite: {_db_path}")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine for async def routes; follows the sync engine onto the SQLite fallback
+if settings.async_database_url and not _use_sqlite:
+    _async_url = settings.async_database_url
+else:
+    _async_url = to_async_url(engine.url.render_as_string(hide_password=False))
+async_engine = create_async_db_engine(_async_url, **_pool_options(_async_pool))
+
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,7 +3,7 @@ Create all database tables directly using SQLAlchemy
 Run this once to initialize your database schema
 """
 from config import engine, Base
-from models.database import User, Profile, Skill, Project, Career, Scholarship
+from models.database import User, Profile, Skill, Project, Roadmap, RoadmapPhase, RoadmapMilestone, RoadmapTemplate, Job, Career, CareerRelation, CatalogVersion, Scholarship
 
 print("Creating database tables...")
 
@@ -0,0 +1,8 @@
+#!/bin/sh
+# Build embedding artifacts against the configured database before starting the server.
+# Artifacts are keyed by a hash of the model and source texts, so this is a no-op when they are current.
+set -e
+
+python build_embeddings.py
+
+exec "$@"
@@ -0,0 +1,29 @@
+"""
+Import an ESCO download into the local snapshot used for offline lookups
+Usage: python import_esco.py <csv-directory | snapshot.json> [output.db]
+"""
+import os
+import sys
+from ai.esco_store import import_csv_dump, import_json_dump
+from ai.esco_client import ESCO_SNAPSHOT_PATH
+
+if len(sys.argv) < 2:
+    print(__doc__.strip())
+    sys.exit(1)
+
+source = sys.argv[1]
+target = sys.argv[2] if len(sys.argv) > 2 else ESCO_SNAPSHOT_PATH
+
+print(f"Importing ESCO data from {source} ...")
+
+try:
+    if os.path.isdir(source):
+        counts = import_csv_dump(source, target)
+    else:
+        counts = import_json_dump(source, target)
+    print(f"✅ Wrote {target}")
+    for name, count in counts.items():
+        print(f"   - {name}: {count}")
+except Exception as e:
+    print(f"❌ Error importing ESCO data: {e}")
+    sys.exit(1)
@@ -1,24 +1,81 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import auth, profile, career
 from api.routes import onboarding, skills
-from api.routes import coach, origin_story, guide, roadmap
+from api.routes import coach, origin_story, guide, roadmap, jobs
 from models.database import Base
-from config import engine
+from config import engine, async_engine, get_settings
+from utils.engine_factory import pool_metrics
+from utils.skill_attach import ensure_user_skill_index
+from ai.llm_gateway import llm_gateway
+from ai.llm_cache import llm_cache
+from ai.esco_client import esco_client
+from utils.process_pool import start_process_pool, shutdown_process_pool
+from utils.body_limit import MULTIPART_OVERHEAD_BYTES, BodySizeLimitMiddleware
+from auth.jwt_handler import password_hasher
+from ai.career_catalog import career_catalog, ensure_career_columns
+from utils.job_queue import job_queue
+from ai.roadmap_generator import roadmap_generator
+from ai.project_recommender import recommender
 
 # Create database tables (gracefully handle connection issues)
 try:
     Base.metadata.create_all(bind=engine)
+    ensure_user_skill_index(engine)
+    ensure_career_columns(engine)
     print("✅ Database tables ready")
 except Exception as e:
     print(f"⚠️  Table creation skipped: {type(e).__name__}: {e}")
 
+settings = get_settings()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: load the career catalog and roadmap templates, poll for version bumps,
+    start the process pool and the job workers. Shutdown: release pooled
+    LLM/ESCO/database connections and the worker pools.
+    """
+    start_process_pool()
+    career_catalog.start()
+    try:
+        compiled = await roadmap_generator.templates.load()
+        print(f"✅ Roadmap templates loaded ({compiled} compiled)")
+    except Exception as e:
+        print(f"⚠️  Roadmap templates not loaded: {type(e).__name__}: {e}")
+    try:
+        await job_queue.start()
+        print("✅ Job queue started")
+    except Exception as e:
+        # Background jobs retry the start on first submit; the rest of the API keeps serving
+        print(f"⚠️  Job queue not started: {type(e).__name__}: {e}")
+    yield
+    career_catalog.stop()
+    await job_queue.stop()
+    await roadmap_generator.aclose()
+    await llm_gateway.aclose()
+    await llm_cache.drain()
+    await esco_client.aclose()
+    await recommender.aclose()
+    shutdown_process_pool()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+
 app = FastAPI(
     title="ATLAS AI API",
     description="AI-Powered Career Guidance Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Body caps for bulk upload endpoints, enforced before the body is read or spooled
+app.add_middleware(BodySizeLimitMiddleware, limits={
+    "/api/career/verify-jobs": settings.verify_jobs_max_body_mb * 1024 * 1024,
+    "/api/profile/parse-resume": settings.resume_max_upload_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+    "/api/profile/parse-resume/batch": settings.resume_batch_max_upload_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES,
+})
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -38,6 +95,7 @@ app.include_router(coach.router, prefix="/api")
 app.include_router(origin_story.router, prefix="/api")
 app.include_router(guide.router, prefix="/api")
 app.include_router(roadmap.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
 
 @app.get("/")
 def root():
@@ -49,7 +107,17 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    catalog = career_catalog.snapshot
+    return {
+        "status": "healthy",
+        "llm_cache": llm_cache.stats(),
+        "db_pool": pool_metrics(engine),
+        "async_db_pool": pool_metrics(async_engine),
+        "password_hasher": password_hasher.stats(),
+        "jobs": job_queue.stats(),
+        "roadmaps": roadmap_generator.stats(),
+        "career_catalog": {"version": catalog.version, "source": catalog.source, "careers": len(catalog)},
+    }
 
 if __name__ == "__main__":
     import uvicorn
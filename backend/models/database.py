@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Table, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Table, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from config import Base
@@ -10,6 +10,8 @@ user_skills = Table('user_skills', Base.metadata,
     Column('proficiency', Float, default=0.5),  # 0-1 scale
     Column('source', String, default='self')  # 'self', 'github', 'esco'
 )
+# One link per (user, skill), so concurrent imports can insert with ON CONFLICT DO NOTHING
+Index('uq_user_skills_user_skill', user_skills.c.user_id, user_skills.c.skill_id, unique=True)
 
 class User(Base):
     __tablename__ = "users"
@@ -58,7 +60,7 @@ class Profile(Base):
     badges = Column(JSON)  # Array of earned badges
     
     # Roadmap
-    roadmap = Column(JSON)  # Stored roadmap object
+    roadmap = Column(JSON)  # Legacy roadmap blob; moved into the roadmaps tables on first read
     preferences = Column(JSON, default={})  # User settings (notifications, theme, etc.)
     
     # Timestamps
@@ -100,6 +102,89 @@ class Project(Base):
     # Relationships
     user = relationship("User", back_populates="projects")
 
+class Roadmap(Base):
+    __tablename__ = "roadmaps"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey('users.id'), unique=True, index=True)
+    career_goal = Column(String)
+    details = Column(JSON)  # Top-level roadmap fields other than phases (level, timeline, metadata, ...)
+    
+    # Progress counters, kept current on every milestone update
+    total_phases = Column(Integer, default=0, nullable=False)
+    total_milestones = Column(Integer, default=0, nullable=False)
+    completed_milestones = Column(Integer, default=0, nullable=False)
+    phases_completed = Column(Integer, default=0, nullable=False)
+    current_phase = Column(Integer, default=0, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    phases = relationship("RoadmapPhase", back_populates="roadmap", order_by="RoadmapPhase.phase_number",
+                          cascade="all, delete-orphan")
+
+class RoadmapPhase(Base):
+    __tablename__ = "roadmap_phases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    roadmap_id = Column(Integer, ForeignKey('roadmaps.id'), index=True, nullable=False)
+    phase_number = Column(Integer, nullable=False)
+    details = Column(JSON)  # Phase fields other than milestones (title, skills, resources, ...)
+    total_milestones = Column(Integer, default=0, nullable=False)
+    completed_milestones = Column(Integer, default=0, nullable=False)
+    
+    # Relationships
+    roadmap = relationship("Roadmap", back_populates="phases")
+    milestones = relationship("RoadmapMilestone", back_populates="phase", order_by="RoadmapMilestone.position",
+                              cascade="all, delete-orphan")
+
+class RoadmapMilestone(Base):
+    __tablename__ = "roadmap_milestones"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    roadmap_id = Column(Integer, ForeignKey('roadmaps.id'), index=True, nullable=False)
+    phase_id = Column(Integer, ForeignKey('roadmap_phases.id'), index=True, nullable=False)
+    position = Column(Integer, default=0, nullable=False)  # Order within the phase
+    week = Column(Integer)
+    type = Column(String)  # 'Learn', 'Practice'
+    title = Column(String)
+    description = Column(String)
+    completed = Column(Boolean, default=False, nullable=False)
+    
+    # Relationships
+    roadmap = relationship("Roadmap")
+    phase = relationship("RoadmapPhase", back_populates="milestones")
+
+class RoadmapTemplate(Base):
+    __tablename__ = "roadmap_templates"
+    
+    key = Column(String, primary_key=True)  # "{domain}:{level}"
+    domain = Column(String, nullable=False)
+    level = Column(String, nullable=False)
+    career_goal = Column(String)  # Goal the structure was generated for
+    structure = Column(JSON)  # {"phases": [...]} as returned by the LLM
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String, primary_key=True)  # uuid4 hex, returned to the client
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
+    kind = Column(String, nullable=False)  # e.g. 'learning_path', 'roadmap'
+    dedup_key = Column(String, index=True)  # hash of user, kind and params
+    status = Column(String, default="queued", index=True)  # queued, running, succeeded, failed, cancelled
+    params = Column(JSON)
+    result = Column(JSON)
+    error = Column(String)
+    
+    owner = Column(String)  # instance id of the process running it
+    heartbeat_at = Column(DateTime)  # refreshed by the owner while running
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
 class Career(Base):
     __tablename__ = "careers"
     
@@ -112,6 +197,27 @@ class Career(Base):
     average_salary = Column(Float)
     growth_rate = Column(Float)  # Percentage
     work_life_balance_score = Column(Float)  # 0-10
+    keywords = Column(JSON)  # Interest keywords for recommendations
+    skill_profile = Column(JSON)  # Detailed ordered skills for gap analysis (defaults to required_skills)
+    compare_terms = Column(JSON)  # Phrases that map free-text career names to this career
+    comparison = Column(JSON)  # salary_range, growth_outlook, pros, cons, ... for career compare
+    recommendable = Column(Boolean, default=True)
+    position = Column(Integer, default=0)  # Catalog order (ties in recommendations keep it)
+
+class CareerRelation(Base):
+    __tablename__ = "career_relations"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    career_id = Column(Integer, ForeignKey('careers.id'), index=True)
+    related_title = Column(String, nullable=False)  # Growth-path role, need not be a catalog career
+    position = Column(Integer, default=0)
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
     
 class Scholarship(Base):
     __tablename__ = "scholarships"
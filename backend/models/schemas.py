@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import List, Optional
 from datetime import datetime
+from auth.password_hasher import MAX_PASSWORD_BYTES
 
 # User Schemas
 class UserBase(BaseModel):
@@ -10,6 +11,14 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+    @field_validator("password")
+    @classmethod
+    def password_fits_bcrypt(cls, value: str) -> str:
+        # bcrypt only reads 72 bytes; longer passwords would fail (or silently truncate)
+        if len(value.encode("utf-8")) > MAX_PASSWORD_BYTES:
+            raise ValueError(f"Password must be at most {MAX_PASSWORD_BYTES} bytes")
+        return value
+
 class UserResponse(UserBase):
     id: int
     created_at: datetime
@@ -17,6 +26,17 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserPrincipal(BaseModel):
+    """Authenticated identity cached per token subject; no relationships"""
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
 # Profile Schemas
 class ProfileBase(BaseModel):
     bio: Optional[str] = None
@@ -101,6 +121,7 @@ class SkillGapAnalysis(BaseModel):
     current_skills: List[str]
     required_skills: List[str]
     missing_skills: List[dict]  # [{name, priority, time_to_learn}]
+    matched_skills: List[dict] = []  # [{name, matched_by, method, score}]
     match_percentage: float
     recommendations: List[str]
 
@@ -0,0 +1,56 @@
+"""
+Write the career catalog into the database and bump its version
+Running servers pick up the new snapshot on their next refresh check.
+Usage: python seed_careers.py [careers.json]   (defaults to the built-in catalog)
+"""
+import json
+import sys
+from config import SessionLocal, engine, Base
+from models.database import Career, CareerRelation
+from ai.career_catalog import BUILTIN_CAREERS, bump_catalog_version, ensure_career_columns
+
+CAREER_FIELDS = [
+    "description", "required_skills", "average_salary", "growth_rate", "keywords",
+    "skill_profile", "compare_terms", "comparison", "recommendable",
+]
+
+if len(sys.argv) > 1:
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        careers = json.load(f)
+    source = sys.argv[1]
+else:
+    careers = BUILTIN_CAREERS
+    source = "built-in catalog"
+
+print(f"Seeding {len(careers)} careers from {source} ...")
+
+Base.metadata.create_all(bind=engine)
+ensure_career_columns(engine)
+db = SessionLocal()
+try:
+    existing = {career.title: career for career in db.query(Career).all()}
+    for position, data in enumerate(careers):
+        career = existing.get(data["title"])
+        if career is None:
+            career = Career(title=data["title"])
+            db.add(career)
+        for field in CAREER_FIELDS:
+            setattr(career, field, data.get(field, True if field == "recommendable" else None))
+        career.position = position
+        db.flush()
+
+        db.query(CareerRelation).filter(CareerRelation.career_id == career.id).delete()
+        db.add_all([
+            CareerRelation(career_id=career.id, related_title=title, position=i)
+            for i, title in enumerate(data.get("related_roles", []))
+        ])
+
+    version = bump_catalog_version(db)
+    db.commit()
+    print(f"✅ Career catalog now at version {version}")
+except Exception as e:
+    db.rollback()
+    print(f"❌ Error seeding careers: {e}")
+    sys.exit(1)
+finally:
+    db.close()
@@ -4,8 +4,13 @@ Tests all major endpoints to verify the backend is working correctly
 """
 import requests
 import json
+import io
+import zipfile
 
 BASE_URL = "http://localhost:8000"
+API_URL = f"{BASE_URL}/api"
+ROADMAP_URL = f"{API_URL}/api/roadmap"  # the roadmap router carries its own /api prefix
+RESUME_MAX_UPLOAD_MB = 10  # backend default (RESUME_MAX_UPLOAD_MB)
 
 def print_section(title):
     print("\n" + "="*60)
@@ -33,7 +38,7 @@ def test_register():
     
     try:
         response = requests.post(
-            f"{BASE_URL}/auth/register",
+            f"{API_URL}/auth/register",
             json=user_data
         )
         print(f"Status: {response.status_code}")
@@ -58,7 +63,7 @@ def test_login(user_data):
     
     try:
         response = requests.post(
-            f"{BASE_URL}/auth/login",
+            f"{API_URL}/auth/login",
             data={
                 "username": user_data["email"],  # OAuth2 uses 'username' field
                 "password": user_data["password"]
@@ -85,7 +90,7 @@ def test_get_current_user(token):
     try:
         headers = {"Authorization": f"Bearer {token}"}
         response = requests.get(
-            f"{BASE_URL}/auth/me",
+            f"{API_URL}/auth/me",
             headers=headers
         )
         print(f"Status: {response.status_code}")
@@ -110,7 +115,7 @@ def test_get_profile(token):
     try:
         headers = {"Authorization": f"Bearer {token}"}
         response = requests.get(
-            f"{BASE_URL}/profile/me",
+            f"{API_URL}/profile/",
             headers=headers
         )
         print(f"Status: {response.status_code}")
@@ -142,7 +147,7 @@ def test_update_profile(token):
     try:
         headers = {"Authorization": f"Bearer {token}"}
         response = requests.put(
-            f"{BASE_URL}/profile/me",
+            f"{API_URL}/profile/",
             headers=headers,
             json=profile_data
         )
@@ -168,7 +173,7 @@ def test_career_recommendations(token):
     try:
         headers = {"Authorization": f"Bearer {token}"}
         response = requests.get(
-            f"{BASE_URL}/career/recommendations",
+            f"{API_URL}/career/recommendations",
             headers=headers
         )
         print(f"Status: {response.status_code}")
@@ -185,6 +190,237 @@ def test_career_recommendations(token):
         print(f"❌ Error: {e}")
         return False
 
+def test_verify_jobs(token):
+    print_section("8. Bulk Ghost Job Verification")
+    
+    postings = [
+        {"title": "Backend Engineer", "company": "Acme", "description": "Build APIs in Python. " * 20,
+         "salary": "$120k-$150k", "company_verified": True},
+        {"title": "Data Entry", "company": "Unknown", "description": "Earn $5000/week from home, pay a small fee to start!"},
+        {"title": "Missing company and description"},
+    ]
+    
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        response = requests.post(f"{API_URL}/career/verify-jobs", headers=headers, json={"jobs": postings})
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Verify failed: {response.text}")
+            return False
+        data = response.json()
+        in_order = [r["index"] for r in data["results"]] == list(range(len(postings)))
+        ok = (data["total"] == 3 and data["analyzed"] == 2 and data["invalid"] == 1
+              and in_order and "error" in data["results"][2] and sum(data["summary"].values()) == 2)
+        print(f"{'✅' if ok else '❌'} {data['analyzed']} analyzed, {data['invalid']} invalid, summary {data['summary']}")
+        
+        ndjson = "\n".join(json.dumps(p) for p in postings[:2])
+        streamed = requests.post(f"{API_URL}/career/verify-jobs", data=ndjson,
+                                 headers={**headers, "Content-Type": "application/x-ndjson"})
+        ndjson_ok = streamed.status_code == 200 and streamed.json()["analyzed"] == 2
+        print(f"{'✅' if ndjson_ok else '❌'} NDJSON body -> {streamed.status_code}")
+        return ok and ndjson_ok
+            
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_origin_story_batch_parity(token):
+    print_section("9. Origin Story Batch Scoring Parity")
+    
+    submissions = [
+        {"psychometric_answers": {"1": 1, "2": 3}, "interests": ["#AI", "#Coding"], "strong_subjects": ["Math"]},
+        {"anti_choices": ["ac1", "ac4"], "psychometric_answers": {"1": 3}, "interests": ["#Art"]},
+        {"anti_choices": ["ac2"], "psychometric_answers": {"1": 0, "2": 0}, "interests": ["#Helping", "#Health"]},
+        {},
+    ]
+    
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        response = requests.post(f"{API_URL}/origin-story/recommend/batch", headers=headers,
+                                 json={"submissions": submissions})
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Batch failed: {response.text}")
+            return False
+        batch = response.json()["results"]
+        
+        for index, submission in enumerate(submissions):
+            single = requests.post(f"{API_URL}/origin-story/recommend", headers=headers, json=submission)
+            expected = [(r["stream_id"], r["match_score"]) for r in single.json()["recommendations"]]
+            got = [(r["stream_id"], r["match_score"]) for r in batch[index]["recommendations"]]
+            if batch[index]["index"] != index or got != expected:
+                print(f"❌ Submission {index}: batch {got} != single {expected}")
+                return False
+        print(f"✅ Batch scores match single scores for {len(submissions)} submissions")
+        return True
+            
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_milestone_counters(token):
+    print_section("10. Roadmap Milestone Counters (PATCH milestones)")
+    
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        response = requests.post(
+            f"{ROADMAP_URL}/generate",
+            headers=headers,
+            json={"career_goal": "Software Engineer", "current_level": "beginner"}
+        )
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Roadmap generation failed: {response.text}")
+            return False
+        roadmap = response.json()["roadmap"]
+        milestones = [m for phase in roadmap["phases"] for m in phase["milestones"]]
+        if not milestones:
+            print("❌ Roadmap has no milestones")
+            return False
+        milestone_id = milestones[0]["id"]
+        
+        def patch(completed):
+            r = requests.patch(f"{ROADMAP_URL}/milestones/{milestone_id}", headers=headers,
+                               json={"completed": completed})
+            return r.status_code, r.json().get("progress", {})
+        
+        # Completing twice must count once; un-completing must go back to zero
+        steps = [(True, 1), (True, 1), (False, 0)]
+        for completed, expected in steps:
+            code, progress = patch(completed)
+            if code != 200 or progress.get("completed_milestones") != expected:
+                print(f"❌ completed={completed}: {code} {progress} (expected {expected} done)")
+                return False
+            if progress.get("total_milestones") != len(milestones):
+                print(f"❌ total_milestones {progress.get('total_milestones')} != {len(milestones)}")
+                return False
+        print(f"✅ Counters stay in step over {len(steps)} toggles ({len(milestones)} milestones)")
+        
+        progress = requests.get(f"{ROADMAP_URL}/progress", headers=headers).json()["progress"]
+        missing = requests.patch(f"{ROADMAP_URL}/milestones/999999999", headers=headers, json={"completed": True})
+        ok = progress.get("completed_milestones") == 0 and missing.status_code == 404
+        print(f"{'✅' if ok else '❌'} GET /progress agrees; unknown milestone -> {missing.status_code}")
+        return ok
+            
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def test_job_dedup_and_cancel(token):
+    print_section("11. Background Jobs (dedup + cancel)")
+    
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        body = {"career_goal": "Data Scientist", "current_level": "beginner"}
+        url = f"{ROADMAP_URL}/generate?background=true"
+        first = requests.post(url, headers=headers, json=body)
+        second = requests.post(url, headers=headers, json=body)
+        print(f"Status: {first.status_code}, {second.status_code}")
+        if first.status_code != 202 or second.status_code != 202:
+            print(f"❌ Expected 202: {first.text} {second.text}")
+            return False
+        first, second = first.json(), second.json()
+        
+        # Identical in-flight submissions share one job; a finished job may be followed by a new one
+        status = requests.get(f"{API_URL}/jobs/{first['id']}", headers=headers).json()["status"]
+        if second["id"] != first["id"] and first["status"] in ("queued", "running") and status in ("queued", "running"):
+            print(f"❌ Duplicate submission got a new job while {first['id']} is {status}")
+            return False
+        print(f"✅ Dedup ok (same job: {second['id'] == first['id']}, first job now {status})")
+        
+        cancelled = requests.delete(f"{API_URL}/jobs/{second['id']}", headers=headers)
+        job = cancelled.json()
+        if cancelled.status_code != 200 or job["status"] not in ("cancelled", "succeeded", "failed"):
+            print(f"❌ Cancel failed: {cancelled.status_code} {cancelled.text}")
+            return False
+        again = requests.get(f"{API_URL}/jobs/{second['id']}", headers=headers).json()
+        if again["status"] != job["status"]:
+            print(f"❌ Job changed after cancel: {job['status']} -> {again['status']}")
+            return False
+        print(f"✅ Cancel returned a terminal job ({job['status']})")
+        
+        missing = requests.delete(f"{API_URL}/jobs/does-not-exist", headers=headers)
+        listed = requests.get(f"{API_URL}/jobs", headers=headers).json()["jobs"]
+        ok = missing.status_code == 404 and any(j["id"] == first["id"] for j in listed)
+        print(f"{'✅' if ok else '❌'} Unknown job -> {missing.status_code}; {len(listed)} job(s) listed")
+        return ok
+            
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+def make_pdf(lines):
+    """Smallest valid one-page PDF with the given text lines (no PDF library needed)"""
+    ops = "BT /F1 12 Tf 14 TL 72 720 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+        f"<< /Length {len(ops)} >>\nstream\n{ops}\nendstream".encode(),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def test_resume_batch(token):
+    print_section("12. Bulk Resume Parsing (duplicates + ZIP limits)")
+    
+    resume = make_pdf(["Jane Doe", "jane@example.com", "Skills", "Python, SQL, Docker"])
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("cohort/jane_again.pdf", resume)  # same bytes as a loose upload
+        zf.writestr("cohort/other.pdf", make_pdf(["John Roe", "john@example.com"]))
+        zf.writestr("cohort/huge.pdf", b"0" * ((RESUME_MAX_UPLOAD_MB + 1) * 1024 * 1024))  # compresses to ~10 KB
+        zf.writestr("cohort/notes.txt", b"not a resume")
+    
+    try:
+        headers = {"Authorization": f"Bearer {token}"}
+        response = requests.post(
+            f"{API_URL}/profile/parse-resume/batch",
+            headers=headers,
+            files=[
+                ("files", ("jane.pdf", resume, "application/pdf")),
+                ("files", ("jane_copy.pdf", resume, "application/pdf")),
+                ("files", ("old.doc", b"legacy", "application/msword")),
+                ("files", ("cohort.zip", archive.getvalue(), "application/zip")),
+            ],
+        )
+        print(f"Status: {response.status_code}")
+        if response.status_code != 200:
+            print(f"❌ Batch failed: {response.text}")
+            return False
+        lines = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        results = {line["file"]: line for line in lines if line["type"] == "result"}
+        summary = lines[-1]
+        
+        checks = [
+            ("loose copy is a duplicate", results.get("jane_copy.pdf", {}).get("status") == "duplicate"),
+            ("zipped copy is a duplicate", results.get("cohort.zip/cohort/jane_again.pdf", {}).get("status") == "duplicate"),
+            ("oversized ZIP member rejected", "larger than" in (results.get("cohort.zip/cohort/huge.pdf", {}).get("error") or "")),
+            ("unsupported ZIP member rejected", results.get("cohort.zip/cohort/notes.txt", {}).get("status") == "failed"),
+            (".doc rejected", results.get("old.doc", {}).get("status") == "failed"),
+            ("unique resumes parsed", all(results.get(name, {}).get("status") == "parsed"
+                                          for name in ("jane.pdf", "cohort.zip/cohort/other.pdf"))),
+            ("summary counts", summary.get("type") == "summary" and summary.get("duplicate") == 2
+                               and summary.get("parsed") == 2 and summary.get("failed") == 3),
+        ]
+        for name, passed in checks:
+            print(f"{'✅' if passed else '❌'} {name}")
+        return all(passed for _, passed in checks)
+            
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
 def run_all_tests():
     print("\n" + "🚀 " + "="*56)
     print("  ATLAS AI BACKEND API TESTING")
@@ -223,6 +459,21 @@ def run_all_tests():
     # Test 7: Career Recommendations
     results.append(("Career Recommendations", test_career_recommendations(token)))
     
+    # Test 8: Bulk Job Verification
+    results.append(("Bulk Job Verification", test_verify_jobs(token)))
+    
+    # Test 9: Origin Story Batch Parity
+    results.append(("Origin Story Batch Parity", test_origin_story_batch_parity(token)))
+    
+    # Test 10: Milestone Counters
+    results.append(("Milestone Counters", test_milestone_counters(token)))
+    
+    # Test 11: Job Dedup + Cancel
+    results.append(("Job Dedup + Cancel", test_job_dedup_and_cancel(token)))
+    
+    # Test 12: Bulk Resume Parsing
+    results.append(("Bulk Resume Parsing", test_resume_batch(token)))
+    
     # Summary
     print_section("TEST SUMMARY")
     passed = sum(1 for _, result in results if result)
@@ -0,0 +1,71 @@
+"""
+Request body limits
+ASGI middleware that caps the body size of selected upload endpoints. It
+rejects oversized Content-Length up front and counts streamed bytes, so
+chunked bodies are cut off too, before Starlette spools them anywhere.
+"""
+
+from typing import Dict
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+# Slack for multipart boundaries and part headers (a few hundred parts) on top of a file-size limit
+MULTIPART_OVERHEAD_BYTES = 256 * 1024
+
+
+class BodyTooLarge(HTTPException):
+    """Raised from receive() once a body passes its limit; rendered as 413"""
+
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Request body is larger than {limit // (1024 * 1024)} MB")
+
+
+class BodySizeLimitMiddleware:
+    """limits: exact request path -> maximum body bytes; other paths are untouched"""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > limit:
+            error = BodyTooLarge(limit)
+            await JSONResponse({"detail": error.detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise BodyTooLarge(limit)
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except BodyTooLarge as error:
+            # Normally FastAPI turns it into a 413; this covers reads outside its handlers
+            if response_started:
+                raise
+            await JSONResponse({"detail": error.detail}, status_code=413)(scope, receive, send)
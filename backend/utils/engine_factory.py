@@ -0,0 +1,292 @@
+"""
+Database engine factory
+Builds sync and async SQLAlchemy engines with an explicit pool mode and
+records pool metrics (checked-out connections, overflow, checkout wait time).
+"""
+
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+POOL_MODES = ("auto", "queue", "null", "transaction_pooler")
+
+# Supabase's transaction-mode pgbouncer listens on 6543, session mode on 5432
+TRANSACTION_POOLER_PORTS = {6543}
+
+_engine_metrics: "weakref.WeakKeyDictionary[Engine, PoolMetrics]" = weakref.WeakKeyDictionary()
+
+
+class PoolMetrics:
+    """Counters updated from pool events; snapshot() adds live pool state"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.pool = None
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict:
+        pool = self.pool
+        stats = {
+            "mode": self.mode,
+            "pool_class": type(pool).__name__ if pool is not None else None,
+            "connections_opened": self.connections_opened,
+            "checkouts": self.checkouts,
+            "checkout_timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 3),
+        }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return stats
+
+
+class _CheckoutTimingMixin:
+    """Times how long each checkout waits for a connection"""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        if self.metrics:
+            self.metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics:
+            self.metrics.pool = pool
+        return pool
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to its asyncio driver (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver configured for '{backend}' URLs")
+    parsed = parsed.set(drivername=f"{backend}+{driver}")
+    if driver == "asyncpg" and "sslmode" in parsed.query:
+        # asyncpg spells libpq's sslmode as ssl
+        sslmode = parsed.query["sslmode"]
+        parsed = parsed.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return parsed.render_as_string(hide_password=False)
+
+
+def resolve_pool_mode(url: str, mode: str = "auto") -> str:
+    """Pick a concrete pool mode; "auto" detects transaction poolers by port"""
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown pool mode '{mode}', expected one of {POOL_MODES}")
+    if mode != "auto":
+        return mode
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return "queue"
+    if parsed.port in TRANSACTION_POOLER_PORTS or "pgbouncer=true" in url:
+        return "transaction_pooler"
+    return "queue"
+
+
+def _transaction_pooler_connect_args(url: str) -> Dict:
+    """Disable server-side prepared statements, which break under pgbouncer transaction mode"""
+    driver = make_url(url).get_driver_name()
+    if driver == "asyncpg":
+        # SQLAlchemy's asyncpg dialect still prepares named statements; unique names keep
+        # them from colliding when the pooler hands a server connection to another client
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    if driver == "psycopg":
+        return {"prepare_threshold": None}
+    # psycopg2 never prepares server-side
+    return {}
+
+
+def split_pool_budget(pool_size: int, max_overflow: int, async_share: float) -> Tuple[Dict, Dict]:
+    """
+    Split one per-process connection budget between the sync and async engines,
+    so running both never exceeds pool_size + max_overflow connections
+    (each engine keeps at least one pooled connection).
+    Returns ({pool_size, max_overflow} for sync, the same for async).
+    """
+    async_share = min(max(async_share, 0.0), 1.0)
+    async_size = min(pool_size - 1, max(1, round(pool_size * async_share))) if pool_size > 1 else 1
+    async_overflow = round(max_overflow * async_share)
+    sync = {"pool_size": max(1, pool_size - async_size), "max_overflow": max_overflow - async_overflow}
+    return sync, {"pool_size": async_size, "max_overflow": async_overflow}
+
+
+def _tune_sqlite(engine: Engine):
+    """WAL + busy timeout so concurrent workers don't trip over each other"""
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+
+def _engine_options(
+    url: str,
+    mode: str,
+    queue_pool_class,
+    pool_size: int,
+    max_overflow: int,
+    pool_timeout: float,
+    pool_recycle: int,
+    pool_pre_ping: bool,
+    connect_timeout: int,
+    engine_kwargs: Dict,
+) -> Dict:
+    """create_engine / create_async_engine kwargs for a resolved pool mode"""
+    parsed = make_url(url)
+    backend, driver = parsed.get_backend_name(), parsed.get_driver_name()
+
+    connect_args: Dict = dict(engine_kwargs.pop("connect_args", {}))
+    if driver == "pysqlite":
+        connect_args.setdefault("check_same_thread", False)
+    elif driver in ("psycopg2", "psycopg"):
+        connect_args.setdefault("connect_timeout", connect_timeout)
+    elif driver == "asyncpg":
+        connect_args.setdefault("timeout", connect_timeout)
+    if mode == "transaction_pooler":
+        connect_args.update(_transaction_pooler_connect_args(url))
+
+    kwargs = dict(engine_kwargs, connect_args=connect_args)
+    if mode == "null":
+        kwargs["poolclass"] = NullPool
+    elif backend == "sqlite" and parsed.database in (None, "", ":memory:"):
+        pass  # in-memory SQLite keeps SQLAlchemy's single-connection pool
+    else:
+        kwargs.update(
+            poolclass=queue_pool_class,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping,
+        )
+    return kwargs
+
+
+def _instrument(engine: Engine, url: str, mode: str):
+    metrics = PoolMetrics(mode)
+    if isinstance(engine.pool, _CheckoutTimingMixin):
+        engine.pool.metrics = metrics
+    metrics.pool = engine.pool
+
+    event.listen(engine, "connect", lambda *_: metrics.record_connect())
+    event.listen(engine, "checkout", lambda *_: metrics.record_checkout())
+    if make_url(url).get_backend_name() == "sqlite":
+        _tune_sqlite(engine)
+
+    _engine_metrics[engine] = metrics
+
+
+def create_db_engine(
+    url: str,
+    pool_mode: str = "auto",
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+    connect_timeout: int = 15,
+    **engine_kwargs,
+) -> Engine:
+    """
+    Create an engine for one of the pool modes:
+      queue              - QueuePool with size/overflow/recycle/pre-ping
+      null               - NullPool, a fresh connection per checkout
+      transaction_pooler - QueuePool in front of pgbouncer, prepared statements off
+    """
+    mode = resolve_pool_mode(url, pool_mode)
+    engine = create_engine(url, **_engine_options(
+        url, mode, InstrumentedQueuePool, pool_size, max_overflow,
+        pool_timeout, pool_recycle, pool_pre_ping, connect_timeout, engine_kwargs,
+    ))
+    _instrument(engine, url, mode)
+    return engine
+
+
+def create_async_db_engine(
+    url: str,
+    pool_mode: str = "auto",
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = 1800,
+    pool_pre_ping: bool = True,
+    connect_timeout: int = 15,
+    **engine_kwargs,
+) -> AsyncEngine:
+    """Async counterpart of create_db_engine; url must use an asyncio driver"""
+    mode = resolve_pool_mode(url, pool_mode)
+    engine = create_async_engine(url, **_engine_options(
+        url, mode, InstrumentedAsyncQueuePool, pool_size, max_overflow,
+        pool_timeout, pool_recycle, pool_pre_ping, connect_timeout, engine_kwargs,
+    ))
+    _instrument(engine.sync_engine, url, mode)
+    return engine
+
+
+def pool_metrics(engine) -> Dict:
+    """Current pool metrics for an engine built by create_db_engine / create_async_db_engine"""
+    metrics = _engine_metrics.get(getattr(engine, "sync_engine", engine))
+    return metrics.snapshot() if metrics else {}
@@ -0,0 +1,335 @@
+"""
+Background job queue
+Runs slow AI generations on a bounded pool of asyncio workers. Job state
+lives in the jobs table so any process can answer polls; identical
+in-flight submissions share one job, and queued or running jobs can be cancelled.
+"""
+
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, or_, select, update
+
+from config import AsyncSessionLocal, get_settings
+from models.database import Job
+
+settings = get_settings()
+
+ACTIVE_STATUSES = ("queued", "running")
+TERMINAL_STATUSES = ("succeeded", "failed", "cancelled")
+JOB_RETENTION = timedelta(days=7)
+
+JobHandler = Callable[[int, Dict[str, Any]], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised when max_pending jobs are already waiting"""
+
+
+class UnknownJobKind(Exception):
+    """Raised when no handler is registered for a job kind"""
+
+
+def job_dict(job: Job) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def dedup_key(user_id: int, kind: str, params: Dict[str, Any]) -> str:
+    payload = json.dumps([user_id, kind, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """In-process worker pool over DB-persisted jobs"""
+
+    def __init__(self, workers: int = 4, max_pending: int = 500, timeout: float = 300.0,
+                 heartbeat: float = 15.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.heartbeat = heartbeat
+        self.instance_id = uuid.uuid4().hex  # marks the jobs this process claimed
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}  # job id -> handler task in this process
+        self._changed: Dict[str, asyncio.Event] = {}  # job id -> set on the next status change
+        self._submit_lock = asyncio.Lock()
+        self._stopping = False
+        self._completed = 0
+        self._failed = 0
+
+    def register(self, kind: str, handler: JobHandler):
+        """handler(user_id, params) -> JSON-serializable result"""
+        self._handlers[kind] = handler
+
+    # ── lifecycle ────────────────────────────────────────────
+
+    async def start(self):
+        """Start the workers and pick up jobs a previous process left behind"""
+        if self._worker_tasks:
+            return
+        self._stopping = False
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            # This process owns nothing yet, so any running job without a live owner is an orphan
+            orphans = await self._fail_orphans(db)
+            await db.execute(delete(Job).where(
+                Job.status.in_(TERMINAL_STATUSES), Job.finished_at < now - JOB_RETENTION
+            ))
+            queued = (await db.execute(
+                select(Job.id).where(Job.status == "queued").order_by(Job.created_at)
+            )).scalars().all()
+            await db.commit()
+        # Only mark the queue started once recovery succeeded, so submit() retries a failed start
+        self._queue = asyncio.Queue()
+        for job_id in queued:
+            self._queue.put_nowait(job_id)
+        loop = asyncio.get_running_loop()
+        self._worker_tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._heartbeat_task = loop.create_task(self._beat())
+        if orphans:
+            print(f"⚠️  Job queue failed {orphans} job(s) interrupted by a previous process")
+        if queued:
+            print(f"✅ Job queue resumed {len(queued)} queued job(s)")
+
+    async def stop(self):
+        """Stop the workers; jobs they were running go back to queued for the next start"""
+        self._stopping = True
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        if self._heartbeat_task is not None:
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        self._worker_tasks = []
+
+    # ── client API ───────────────────────────────────────────
+
+    async def submit(self, user_id: int, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job, or return the identical job that is already queued or running"""
+        if kind not in self._handlers:
+            raise UnknownJobKind(kind)
+        if self._queue is None:
+            await self.start()
+        params = jsonable_encoder(params)
+        key = dedup_key(user_id, kind, params)
+
+        async with self._submit_lock:
+            async with AsyncSessionLocal() as db:
+                existing = (await db.execute(
+                    select(Job).where(Job.dedup_key == key, Job.status.in_(ACTIVE_STATUSES))
+                )).scalars().first()
+                if existing is not None:
+                    return job_dict(existing)
+                if self._queue.qsize() >= self.max_pending:
+                    raise JobQueueFull()
+
+                job = Job(id=uuid.uuid4().hex, user_id=user_id, kind=kind, dedup_key=key,
+                          status="queued", params=params, created_at=datetime.utcnow())
+                db.add(job)
+                await db.commit()
+
+        self._queue.put_nowait(job.id)
+        return job_dict(job)
+
+    async def get(self, job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        async with AsyncSessionLocal() as db:
+            job = (await db.execute(
+                select(Job).where(Job.id == job_id, Job.user_id == user_id)
+            )).scalars().first()
+        return job_dict(job) if job is not None else None
+
+    async def list_jobs(self, user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
+        async with AsyncSessionLocal() as db:
+            jobs = (await db.execute(
+                select(Job).where(Job.user_id == user_id).order_by(Job.created_at.desc()).limit(limit)
+            )).scalars().all()
+        return [job_dict(job) for job in jobs]
+
+    async def cancel(self, job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.user_id == user_id, Job.status.in_(ACTIVE_STATUSES))
+                .values(status="cancelled", finished_at=datetime.utcnow())
+            )
+            await db.commit()
+        if result.rowcount:
+            task = self._running.get(job_id)
+            if task is not None:
+                task.cancel()
+            self._notify(job_id)
+        return await self.get(job_id, user_id)
+
+    async def wait_for_change(self, job_id: str, timeout: float):
+        """Return on this process's next status change for the job, or after timeout"""
+        event = self._changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._worker_tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": len(self._running),
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+    # ── workers ──────────────────────────────────────────────
+
+    def _notify(self, job_id: str):
+        event = self._changed.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _finish(self, job_id: str, status: str, **values):
+        # Guarded on "running" so a cancellation that landed first wins
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "running")
+                .values(status=status, finished_at=datetime.utcnow(), **values)
+            )
+            await db.commit()
+
+    async def _claim(self, job_id: str) -> Optional[Job]:
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(status="running", owner=self.instance_id, started_at=now, heartbeat_at=now)
+            )
+            if not result.rowcount:
+                return None  # cancelled, or claimed by another process
+            job = (await db.execute(select(Job).where(Job.id == job_id))).scalars().first()
+            await db.commit()
+        return job
+
+    async def _fail_orphans(self, db) -> int:
+        """Fail running jobs whose owner stopped heartbeating (crashed or killed). Does not commit."""
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(Job)
+            .where(
+                Job.status == "running",
+                or_(Job.owner.is_(None), Job.owner != self.instance_id),
+                or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < now - timedelta(seconds=3 * self.heartbeat)),
+            )
+            .values(status="failed", error="Interrupted", finished_at=now)
+        )
+        return result.rowcount
+
+    async def _beat(self):
+        """Refresh this process's running jobs and fail other processes' orphans"""
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            try:
+                async with AsyncSessionLocal() as db:
+                    if self._running:
+                        await db.execute(
+                            update(Job)
+                            .where(Job.id.in_(list(self._running)), Job.owner == self.instance_id)
+                            .values(heartbeat_at=datetime.utcnow())
+                        )
+                    await self._fail_orphans(db)
+                    await db.commit()
+            except Exception as e:
+                print(f"⚠️  Job heartbeat failed: {type(e).__name__}: {e}")
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self._claim(job_id)
+            except Exception as e:
+                # Database hiccup: keep the worker alive and retry the job shortly
+                print(f"⚠️  Job {job_id} could not be claimed: {type(e).__name__}: {e}")
+                await asyncio.sleep(1.0)
+                self._queue.put_nowait(job_id)
+                continue
+            if job is None:
+                continue
+            self._notify(job_id)
+
+            task = asyncio.ensure_future(
+                asyncio.wait_for(self._handlers[job.kind](job.user_id, job.params or {}), self.timeout)
+            )
+            self._running[job_id] = task
+            try:
+                result = await task
+                await self._finish(job_id, "succeeded", result=jsonable_encoder(result))
+                self._completed += 1
+            except asyncio.CancelledError:
+                if self._stopping:
+                    # Shutting down: leave it for the next start instead of losing it
+                    await asyncio.shield(self._requeue(job_id))
+                    raise
+                # Cancelled through cancel(), which already recorded the status
+            except asyncio.TimeoutError:
+                await self._finish(job_id, "failed", error=f"Timed out after {self.timeout:.0f}s")
+                self._failed += 1
+            except Exception as e:
+                print(f"⚠️  Job {job.kind} {job_id} failed: {type(e).__name__}: {e}")
+                await self._finish(job_id, "failed", error=str(e) or type(e).__name__)
+                self._failed += 1
+            finally:
+                self._running.pop(job_id, None)
+                self._notify(job_id)
+
+    async def _requeue(self, job_id: str):
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Job).where(Job.id == job_id, Job.status == "running")
+                .values(status="queued", owner=None, started_at=None, heartbeat_at=None)
+            )
+            await db.commit()
+
+
+# Global instance
+job_queue = JobQueue(
+    workers=settings.job_workers,
+    max_pending=settings.job_max_pending,
+    timeout=settings.job_timeout_seconds,
+    heartbeat=settings.job_heartbeat_seconds,
+)
+
+
+async def submit_job_response(user_id: int, kind: str, params: Dict[str, Any]) -> JSONResponse:
+    """202 with the job (new or deduplicated) for endpoints called with ?background=true"""
+    try:
+        job = await job_queue.submit(user_id, kind, params)
+    except JobQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many background jobs queued, try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    return JSONResponse(
+        status_code=202,
+        content={**job, "status_url": f"/api/jobs/{job['id']}", "events_url": f"/api/jobs/{job['id']}/events"},
+    )
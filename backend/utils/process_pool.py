@@ -0,0 +1,42 @@
+"""
+Shared process pool
+One ProcessPoolExecutor for CPU-bound work (bulk ghost-job scoring, resume
+extraction), started with the app. Workers come from a forkserver, because
+forking a server process that already runs threads can deadlock the child.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from config import get_settings
+
+settings = get_settings()
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def pool_size() -> int:
+    return settings.process_pool_workers or os.cpu_count() or 1
+
+
+def start_process_pool() -> ProcessPoolExecutor:
+    """Create the pool; call once at startup (later calls return the running pool)"""
+    global _pool
+    if _pool is None:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _pool = ProcessPoolExecutor(max_workers=pool_size(), mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The shared pool; scripts that never ran startup get one on first use"""
+    return _pool if _pool is not None else start_process_pool()
+
+
+def shutdown_process_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
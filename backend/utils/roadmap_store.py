@@ -0,0 +1,240 @@
+"""
+Roadmap store
+Keeps each user's roadmap as roadmap/phase/milestone rows with progress
+counters on the parent rows, so a milestone toggle touches three small rows
+and progress is read straight off the roadmap row.
+"""
+
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from models.database import Profile, Roadmap, RoadmapMilestone, RoadmapPhase
+
+EMPTY_PROGRESS = {"percent_complete": 0, "completed_milestones": 0, "total_milestones": 0}
+
+
+def milestone_dict(milestone: RoadmapMilestone) -> Dict[str, Any]:
+    return {
+        "id": milestone.id,
+        "week": milestone.week,
+        "type": milestone.type,
+        "title": milestone.title,
+        "description": milestone.description,
+        "completed": milestone.completed,
+    }
+
+
+def roadmap_dict(roadmap: Roadmap) -> Dict[str, Any]:
+    """The roadmap in the generator's shape, plus ids for addressing milestones"""
+    return {
+        **(roadmap.details or {}),
+        "id": roadmap.id,
+        "career_goal": roadmap.career_goal,
+        "phases": [
+            {
+                **(phase.details or {}),
+                "phase_number": phase.phase_number,
+                "milestones": [milestone_dict(m) for m in phase.milestones],
+            }
+            for phase in roadmap.phases
+        ],
+    }
+
+
+def progress_dict(roadmap: Roadmap) -> Dict[str, Any]:
+    total = roadmap.total_milestones
+    return {
+        "total_milestones": total,
+        "completed_milestones": roadmap.completed_milestones,
+        "progress_percent": round(roadmap.completed_milestones / total * 100, 1) if total else 0,
+        "phases_completed": roadmap.phases_completed,
+        "current_phase": roadmap.current_phase,
+    }
+
+
+async def save_roadmap(db: AsyncSession, user_id: int, roadmap: Dict[str, Any]) -> Roadmap:
+    """Replace the user's roadmap with a generated (or legacy) roadmap dict. Does not commit."""
+    await db.execute(delete(RoadmapMilestone).where(
+        RoadmapMilestone.roadmap_id.in_(select(Roadmap.id).where(Roadmap.user_id == user_id))
+    ))
+    await db.execute(delete(RoadmapPhase).where(
+        RoadmapPhase.roadmap_id.in_(select(Roadmap.id).where(Roadmap.user_id == user_id))
+    ))
+    await db.execute(delete(Roadmap).where(Roadmap.user_id == user_id))
+    # The tables are the source of truth from here on
+    await db.execute(update(Profile).where(Profile.user_id == user_id).values(roadmap=None))
+
+    row = Roadmap(user_id=user_id)
+    _fill_roadmap(row, roadmap)
+    db.add(row)
+    await db.flush()
+    return row
+
+
+def _fill_roadmap(row: Roadmap, roadmap: Dict[str, Any]):
+    """
+    Write a roadmap dict onto row and its loaded phases/milestones, reusing
+    existing child rows position by position so their ids survive; surplus
+    children are dropped and missing ones added.
+    """
+    phases_data = roadmap.get("phases", [])
+    row.career_goal = roadmap.get("career_goal")
+    row.details = {k: v for k, v in roadmap.items() if k not in ("id", "career_goal", "phases")}
+    row.total_phases = len(phases_data)
+    del row.phases[len(phases_data):]
+
+    total = done = phases_completed = 0
+    current_phase = None
+    for idx, phase_data in enumerate(phases_data):
+        if idx < len(row.phases):
+            phase = row.phases[idx]
+        else:
+            phase = RoadmapPhase()
+            row.phases.append(phase)
+        milestones = phase_data.get("milestones", [])
+        phase_done = sum(1 for m in milestones if m.get("completed", False))
+        phase.phase_number = phase_data.get("phase_number", idx + 1)
+        phase.details = {k: v for k, v in phase_data.items() if k not in ("phase_number", "milestones")}
+        phase.total_milestones = len(milestones)
+        phase.completed_milestones = phase_done
+
+        del phase.milestones[len(milestones):]
+        for position, m in enumerate(milestones):
+            if position < len(phase.milestones):
+                milestone = phase.milestones[position]
+            else:
+                milestone = RoadmapMilestone(roadmap=row)
+                phase.milestones.append(milestone)
+            milestone.position = position
+            milestone.week = m.get("week")
+            milestone.type = m.get("type")
+            milestone.title = m.get("title")
+            milestone.description = m.get("description")
+            milestone.completed = bool(m.get("completed", False))
+
+        total += len(milestones)
+        done += phase_done
+        if phase_done >= len(milestones):
+            phases_completed += 1
+        elif current_phase is None:
+            current_phase = phase.phase_number
+
+    row.total_milestones = total
+    row.completed_milestones = done
+    row.phases_completed = phases_completed
+    row.current_phase = current_phase if current_phase is not None else len(phases_data)
+
+
+async def replace_untouched_roadmap(
+    db: AsyncSession, user_id: int, roadmap_id: int, roadmap: Dict[str, Any]
+) -> bool:
+    """
+    Rewrite the roadmap in place only while roadmap_id is still the user's
+    roadmap and none of its milestones has been completed. The roadmap id and
+    the ids of milestones at surviving positions stay valid for clients
+    holding the earlier response. Does not commit.
+    """
+    row = (await db.execute(
+        select(Roadmap)
+        .where(Roadmap.id == roadmap_id, Roadmap.user_id == user_id, Roadmap.completed_milestones == 0)
+        .options(selectinload(Roadmap.phases).selectinload(RoadmapPhase.milestones))
+        .with_for_update()
+    )).scalars().first()
+    if row is None:
+        return False
+    _fill_roadmap(row, roadmap)
+    await db.flush()
+    return True
+
+
+async def load_roadmap(db: AsyncSession, user_id: int, with_phases: bool = True) -> Optional[Roadmap]:
+    """The user's roadmap row, moving a legacy Profile.roadmap blob into the tables if needed"""
+    query = select(Roadmap).where(Roadmap.user_id == user_id)
+    if with_phases:
+        query = query.options(selectinload(Roadmap.phases).selectinload(RoadmapPhase.milestones))
+    roadmap = (await db.execute(query)).scalars().first()
+    if roadmap is not None:
+        return roadmap
+
+    legacy = (await db.execute(select(Profile.roadmap).where(Profile.user_id == user_id))).scalar()
+    if not legacy:
+        return None
+    await save_roadmap(db, user_id, dict(legacy))
+    await db.commit()
+    return (await db.execute(query)).scalars().first()
+
+
+async def load_progress(db: AsyncSession, user_id: int) -> Optional[Dict[str, Any]]:
+    """Progress from the roadmap row's counters, without touching phases or milestones"""
+    await load_roadmap(db, user_id, with_phases=False)
+    roadmap = (await db.execute(
+        select(Roadmap).where(Roadmap.user_id == user_id).execution_options(populate_existing=True)
+    )).scalars().first()
+    return progress_dict(roadmap) if roadmap is not None else None
+
+
+async def find_milestone_id(db: AsyncSession, user_id: int, phase_number: int, week: int) -> Optional[int]:
+    """Id of the first milestone in a phase due in the given week"""
+    await load_roadmap(db, user_id, with_phases=False)
+    return (await db.execute(
+        select(RoadmapMilestone.id)
+        .join(RoadmapPhase, RoadmapPhase.id == RoadmapMilestone.phase_id)
+        .join(Roadmap, Roadmap.id == RoadmapMilestone.roadmap_id)
+        .where(Roadmap.user_id == user_id, RoadmapPhase.phase_number == phase_number,
+               RoadmapMilestone.week == week)
+        .order_by(RoadmapMilestone.position)
+        .limit(1)
+    )).scalar()
+
+
+async def set_milestone(
+    db: AsyncSession, user_id: int, milestone_id: int, completed: bool
+) -> Optional[tuple]:
+    """
+    Mark one milestone and adjust the phase and roadmap counters. Does not commit.
+    Returns (milestone, changed), or None if the user has no such milestone.
+    """
+    milestone = (await db.execute(
+        select(RoadmapMilestone)
+        .join(Roadmap, Roadmap.id == RoadmapMilestone.roadmap_id)
+        .where(RoadmapMilestone.id == milestone_id, Roadmap.user_id == user_id)
+    )).scalars().first()
+    if milestone is None:
+        return None
+
+    # Guarded on the old value so concurrent toggles count once
+    result = await db.execute(
+        update(RoadmapMilestone)
+        .where(RoadmapMilestone.id == milestone_id, RoadmapMilestone.completed != completed)
+        .values(completed=completed)
+    )
+    if result.rowcount == 0:
+        return milestone, False
+
+    delta = 1 if completed else -1
+    await db.execute(
+        update(RoadmapPhase)
+        .where(RoadmapPhase.id == milestone.phase_id)
+        .values(completed_milestones=RoadmapPhase.completed_milestones + delta)
+    )
+    done, total = (await db.execute(
+        select(RoadmapPhase.completed_milestones, RoadmapPhase.total_milestones)
+        .where(RoadmapPhase.id == milestone.phase_id)
+    )).one()
+
+    values = {"completed_milestones": Roadmap.completed_milestones + delta}
+    was_complete, now_complete = done - delta >= total, done >= total
+    if was_complete != now_complete:
+        values["phases_completed"] = Roadmap.phases_completed + (1 if now_complete else -1)
+        first_open = (
+            select(func.min(RoadmapPhase.phase_number))
+            .where(RoadmapPhase.roadmap_id == milestone.roadmap_id,
+                   RoadmapPhase.completed_milestones < RoadmapPhase.total_milestones)
+            .scalar_subquery()
+        )
+        values["current_phase"] = func.coalesce(first_open, Roadmap.total_phases)
+    await db.execute(update(Roadmap).where(Roadmap.id == milestone.roadmap_id).values(**values))
+    return milestone, True
@@ -0,0 +1,28 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight task
+instead of each issuing an identical upstream call.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Deduplicates concurrent async calls by key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key at a time; every concurrent caller gets its result"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller being cancelled doesn't cancel the shared call
+        return await asyncio.shield(task)
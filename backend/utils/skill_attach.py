@@ -0,0 +1,132 @@
+"""
+Bulk skill attach
+Links a list of skill names to a user in a fixed number of round trips:
+one IN query resolving names and existing links, one multi-row
+INSERT ... ON CONFLICT DO NOTHING for unknown skills, one bulk user_skills
+insert that skips links created concurrently. Names are canonicalized
+through the skill ontology first, so "ReactJS" and "React" share a row.
+"""
+
+from typing import Dict, Iterable, List
+
+from sqlalchemy import and_, insert, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.database import Skill, user_skills
+from ai.skill_ontology import skill_ontology
+
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+USER_SKILL_INDEX = "uq_user_skills_user_skill"
+
+# Keeps the first link of each (user_id, skill_id) pair
+_DEDUPE_LINKS = {
+    "sqlite": "DELETE FROM user_skills WHERE rowid NOT IN "
+              "(SELECT MIN(rowid) FROM user_skills GROUP BY user_id, skill_id)",
+    "postgresql": "DELETE FROM user_skills a USING user_skills b "
+                  "WHERE a.ctid > b.ctid AND a.user_id = b.user_id AND a.skill_id = b.skill_id",
+}
+
+
+def _clean_names(names: Iterable[str]) -> List[str]:
+    """Canonical ontology names (unknown skills as written), without blanks or duplicates"""
+    return skill_ontology.canonicalize(names)
+
+
+def _resolve(db: Session, user_id: int, names: List[str]) -> Dict[str, tuple]:
+    """name -> (skill_id, already_linked) for every name that exists in skills"""
+    rows = db.execute(
+        select(Skill.id, Skill.name, user_skills.c.skill_id)
+        .outerjoin(user_skills, and_(
+            user_skills.c.skill_id == Skill.id,
+            user_skills.c.user_id == user_id,
+        ))
+        .where(Skill.name.in_(names))
+    ).all()
+    return {name: (skill_id, linked is not None) for skill_id, name, linked in rows}
+
+
+def _insert_missing_skills(db: Session, names: List[str], category: str):
+    """Create skills in one statement; rows created concurrently are skipped, not errors"""
+    rows = [{"name": name, "category": category} for name in names]
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        db.execute(dialect_insert(Skill).values(rows).on_conflict_do_nothing(index_elements=["name"]))
+    else:
+        db.execute(insert(Skill), rows)
+
+
+def attach_skills(
+    db: Session,
+    user_id: int,
+    names: Iterable[str],
+    proficiency: float = 0.5,
+    source: str = "self",
+    category: str = "technical",
+) -> List[str]:
+    """
+    Link skills to a user, creating unknown skills. Does not commit.
+    Returns the names that were newly linked, in input order.
+    """
+    names = _clean_names(names)
+    if not names:
+        return []
+
+    resolved = _resolve(db, user_id, names)
+    missing = [name for name in names if name not in resolved]
+    if missing:
+        _insert_missing_skills(db, missing, category)
+        resolved.update(_resolve(db, user_id, missing))
+
+    added = [name for name in names if name in resolved and not resolved[name][1]]
+    if added:
+        rows = [
+            {"user_id": user_id, "skill_id": resolved[name][0], "proficiency": proficiency, "source": source}
+            for name in added
+        ]
+        dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        if dialect_insert is not None:
+            # A concurrent import may have linked the same skill since _resolve
+            db.execute(dialect_insert(user_skills).values(rows)
+                       .on_conflict_do_nothing(index_elements=["user_id", "skill_id"]))
+        else:
+            db.execute(user_skills.insert(), rows)
+    return added
+
+
+def ensure_user_skill_index(engine: Engine):
+    """
+    Add the unique (user_id, skill_id) index to databases created before it
+    existed, dropping duplicate links first; create_all skips existing tables.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("user_skills"):
+        return
+    if any(index["name"] == USER_SKILL_INDEX for index in inspector.get_indexes("user_skills")):
+        return
+    with engine.begin() as conn:
+        dedupe = _DEDUPE_LINKS.get(engine.dialect.name)
+        if dedupe is not None:
+            conn.execute(text(dedupe))
+        conn.execute(text(f"CREATE UNIQUE INDEX {USER_SKILL_INDEX} ON user_skills (user_id, skill_id)"))
+    print("✅ Added unique index on user_skills (user_id, skill_id)")
+
+
+async def attach_skills_async(
+    db: AsyncSession,
+    user_id: int,
+    names: Iterable[str],
+    proficiency: float = 0.5,
+    source: str = "self",
+    category: str = "technical",
+) -> List[str]:
+    """attach_skills on an AsyncSession"""
+    names = list(names)
+    return await db.run_sync(
+        lambda session: attach_skills(session, user_id, names, proficiency, source, category)
+    )
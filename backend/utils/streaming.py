@@ -0,0 +1,51 @@
+"""
+Streaming Utilities
+Server-Sent Events helpers for token-streaming chat endpoints, and NDJSON
+for endpoints that stream one result per line
+"""
+
+import json
+from typing import Any, AsyncIterator, Optional
+from fastapi.responses import StreamingResponse
+
+STREAM_INTERRUPTED = "The response was interrupted. Please try again."
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Format a single SSE frame with a JSON payload"""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+
+def sse_error(detail: str) -> str:
+    """`error` frame for a stream that failed after tokens were already sent"""
+    return sse_event({"detail": detail}, event="error")
+
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async iterator of SSE frames in a non-buffered response"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # disable proxy buffering (nginx)
+        },
+    )
+
+
+def ndjson_line(data: Any) -> str:
+    """One newline-delimited JSON record"""
+    return json.dumps(data) + "\n"
+
+
+def ndjson_response(lines: AsyncIterator[str]) -> StreamingResponse:
+    """Wrap an async iterator of NDJSON records in a non-buffered response"""
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )